@@ -0,0 +1,51 @@
+"""Benchmark of consecutive calls to :meth:`YamlParser.parse_waveform`.
+
+The time per call should stay flat, regardless of the number of waveforms that were
+parsed before. The script prints the time per block of calls, and exits with a non-zero
+status when the last blocks are considerably slower than the first blocks.
+
+Usage:
+    python benchmarks/parse_waveform.py [NUM_CALLS]
+"""
+
+import statistics
+import sys
+import time
+
+from waveform_editor.configuration import WaveformConfiguration
+
+YAML_STR = """\
+waveform:
+- {type: linear, from: 1.5e2, to: 3, duration: 2}
+- {type: constant, value: 1e-3, duration: 1}
+"""
+BLOCK_SIZE = 1000
+# Maximum allowed ratio of the time of the last blocks to the time of the first blocks
+MAX_SLOWDOWN = 1.5
+
+
+def main(num_calls=10_000):
+    parser = WaveformConfiguration().parser
+    # Reuse the tendencies of the previous waveform, as the editor does while typing,
+    # such that the benchmark is dominated by parsing the YAML
+    waveform = None
+    block_times = []
+    for _ in range(max(num_calls // BLOCK_SIZE, 2)):
+        start = time.perf_counter()
+        for _ in range(BLOCK_SIZE):
+            waveform = parser.parse_waveform(YAML_STR, previous=waveform)
+        block_times.append(time.perf_counter() - start)
+
+    for i, block_time in enumerate(block_times):
+        print(
+            f"calls {i * BLOCK_SIZE:>6}-{(i + 1) * BLOCK_SIZE:>6}: {block_time:.3f} s"
+        )
+    num_blocks = max(len(block_times) // 3, 1)
+    first = statistics.median(block_times[:num_blocks])
+    last = statistics.median(block_times[-num_blocks:])
+    print(f"Slowdown of the last blocks: {last / first:.2f}x")
+    return 0 if last / first <= MAX_SLOWDOWN else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*map(int, sys.argv[1:])))
@@ -60,3 +60,30 @@ def test_generate():
     assert np.allclose(time, [0, 0.25, 0.25, 1])
     assert np.allclose(values, [4.5, 6, 0, 4.5])
     assert not tendency.annotations
+
+
+def test_sample_max_points():
+    """
+    Check the envelope of the generated values when there are too many points.
+    """
+    tendency = SawtoothWaveTendency(
+        user_start=0,
+        user_duration=100,
+        user_base=2,
+        user_amplitude=3,
+        user_frequency=1000,
+    )
+    time, values = tendency.get_value()
+    assert len(time) == 20_000
+    assert time[0] == 0 and time[-1] == 100
+    assert np.all(np.diff(time) > 0)
+    assert values[0] == tendency.start_value
+    assert values[-1] == tendency.end_value
+    assert np.all(values[1:-1:2] == 5)
+    assert np.all(values[2:-1:2] == -1)
+
+    time, values = tendency.sample(1_000_000)
+    assert len(time) == 200_002
+    assert np.all(np.diff(time) > 0)
+    assert np.all(values[1:-1:2] == 5)
+    assert np.all(values[2:-1:2] == -1)
@@ -52,8 +52,13 @@ def test_generate():
         user_start=0, user_duration=1, user_base=2, user_amplitude=3, user_phase=1
     )
     time, values = tendency.get_value()
-    assert np.all(time == np.linspace(0, 1, 32 + 1))
+    assert time[0] == 0 and time[-1] == 1
+    assert np.all(np.diff(time) > 0)
     assert np.allclose(values, 2 + 3 * np.sin(2 * np.pi * time + 1))
+    # Linear interpolation between the samples meets the relative tolerance
+    fine_time = np.linspace(0, 1, 10001)
+    error = np.interp(fine_time, time, values) - tendency._calc_sine(fine_time)
+    assert np.max(np.abs(error)) < 2 * 1e-3 * 6
     assert not tendency.annotations
 
 
@@ -1,6 +1,9 @@
+import os
+
 import numpy as np
 from pytest import approx
 
+from waveform_editor.tendencies import piecewise
 from waveform_editor.tendencies.piecewise import PiecewiseLinearTendency
 
 
@@ -185,3 +188,107 @@ def test_get_derivative_interpolate():
     expected_derivatives = [2, 2, -1, -1, -0.5, -0.5, -0.5, -0.5, 2, 2, 2, 2, 2]
     assert np.allclose(derivatives, expected_derivatives)
     assert not tendency.annotations
+
+
+def test_file(tmp_path):
+    """Test a piecewise tendency which is loaded from a data file."""
+    path = tmp_path / "data.npy"
+    np.save(path, np.array([[1, 2, 3, 5], [2, 4, 3, 2]], dtype=float))
+    tendency = PiecewiseLinearTendency(user_file=str(path))
+    assert not tendency.annotations
+    assert tendency.file == str(path)
+    assert isinstance(tendency.time.base, np.memmap)
+    assert np.array_equal(tendency.time, [1, 2, 3, 5])
+    assert np.array_equal(tendency.value, [2, 4, 3, 2])
+    assert tendency.start == 1
+    assert tendency.end == 5
+    assert tendency.value_at(4) == approx(2.5)
+
+    # Integer data is converted to floats
+    np.save(path, np.array([[1, 2], [3, 4]]))
+    tendency = PiecewiseLinearTendency(user_file=str(path))
+    assert not tendency.annotations
+    assert tendency.value.dtype == float
+
+
+def test_file_invalid(tmp_path):
+    """Test invalid data files."""
+    path = tmp_path / "data.npy"
+    tendency = PiecewiseLinearTendency(user_file=str(path))
+    assert tendency.annotations
+
+    np.save(path, np.array([1.0, 2.0, 3.0]))
+    tendency = PiecewiseLinearTendency(user_file=str(path))
+    assert tendency.annotations
+
+    np.save(path, np.array([[3.0, 2.0, 1.0], [1.0, 2.0, 3.0]]))
+    tendency = PiecewiseLinearTendency(user_file=str(path))
+    assert tendency.annotations
+
+    np.save(path, np.array([[1.0, 2.0, np.inf], [1.0, 2.0, 3.0]]))
+    tendency = PiecewiseLinearTendency(user_file=str(path))
+    assert tendency.annotations
+
+    np.save(path, np.array([[1.0, 2.0, 3.0], [1.0, 2.0, 3.0]]))
+    tendency = PiecewiseLinearTendency(
+        user_file=str(path), user_time=[1, 2, 3], user_value=[1, 2, 3]
+    )
+    assert tendency.annotations
+
+
+def test_file_validation_cache(tmp_path, monkeypatch):
+    """Test that a data file is only validated once, until it is changed."""
+    path = tmp_path / "data.npy"
+    np.save(path, np.array([[1.0, 2.0, 3.0], [1.0, 2.0, 3.0]]))
+    calls = []
+    validate = piecewise._validate_file_data
+
+    def _validate_file_data(time, value):
+        calls.append(path)
+        return validate(time, value)
+
+    monkeypatch.setattr(piecewise, "_validate_file_data", _validate_file_data)
+    for _ in range(3):
+        assert not PiecewiseLinearTendency(user_file=str(path)).annotations
+    assert len(calls) == 1
+
+    np.save(path, np.array([[1.0, 2.0, 3.0, 2.5], [1.0, 2.0, 3.0, 4.0]]))
+    assert PiecewiseLinearTendency(user_file=str(path)).annotations
+    assert PiecewiseLinearTendency(user_file=str(path)).annotations
+    assert len(calls) == 2
+
+
+def test_file_validation_cache_bounded(tmp_path, monkeypatch):
+    """Test that only the validation results of the most recent files are cached."""
+    monkeypatch.setattr(piecewise, "_file_validation_cache", {})
+    monkeypatch.setattr(piecewise, "_MAX_CACHED_FILES", 2)
+    paths = [tmp_path / f"data{i}.npy" for i in range(3)]
+    for path in paths:
+        np.save(path, np.array([[1.0, 2.0, 3.0], [1.0, 2.0, 3.0]]))
+        assert not PiecewiseLinearTendency(user_file=str(path)).annotations
+    cached = [key[0] for key in piecewise._file_validation_cache]
+    assert cached == [os.path.realpath(path) for path in paths[1:]]
+
+
+def test_get_value_and_derivative():
+    """Test if the values and derivatives are evaluated together correctly."""
+    tendency = PiecewiseLinearTendency(
+        user_time=np.array([1, 2, 3, 5, 7]), user_value=np.array([2, 4, 3, 2, 6])
+    )
+    time = np.array([0.5, 1, 1.5, 2, 2.5, 3, 3.5, 4, 4.5, 5, 5.5, 6, 6.5, 7, 7.5])
+    values, derivatives = tendency.get_value_and_derivative(time)
+    assert np.array_equal(values, tendency.get_value(time)[1])
+    assert np.array_equal(derivatives, tendency.get_derivative(time))
+
+    tendency = PiecewiseLinearTendency(user_time=[1.1], user_value=[9.9])
+    values, derivatives = tendency.get_value_and_derivative(time)
+    assert np.all(values == 9.9)
+    assert np.all(derivatives == 0)
+
+
+def test_slopes_update():
+    """Test if the cached slopes are updated when the values change."""
+    tendency = PiecewiseLinearTendency(user_time=[1, 2, 3], user_value=[2, 4, 6])
+    assert np.array_equal(tendency.get_derivative(np.array([1.5, 2.5])), [2, 2])
+    tendency.value = np.array([2.0, 3.0, 6.0])
+    assert np.array_equal(tendency.get_derivative(np.array([1.5, 2.5])), [1, 3])
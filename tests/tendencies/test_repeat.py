@@ -190,3 +190,53 @@ def test_period(repeat_waveform):
     check_values_at_times(
         np.arange(0.75, 8, 1), times, values, 2 - np.sin(np.pi * 3 / 16)
     )
+
+
+@pytest.fixture
+def linear_repeat_waveform():
+    return {
+        "user_duration": 10,
+        "user_waveform": [
+            {
+                "user_type": "piecewise",
+                "user_time": [0, 1, 1.5, 3],
+                "user_value": [0, 2, -1, 0],
+            },
+            {"user_type": "linear", "user_to": 3, "user_duration": 1},
+            {"user_type": "constant", "user_duration": 0.5},
+        ],
+    }
+
+
+def test_period_table(linear_repeat_waveform):
+    """Check if the period table of a piecewise linear waveform evaluates to the same
+    values as the repeated waveform."""
+    repeat_tendency = RepeatTendency(**linear_repeat_waveform)
+    assert repeat_tendency._get_period_table() is not None
+    times = np.linspace(-1, 12, 1001)
+    _, values = repeat_tendency.get_value(times)
+    derivatives = repeat_tendency.get_derivative(times)
+
+    repeat_tendency._period_table = False
+    _, expected_values = repeat_tendency.get_value(times)
+    assert values == approx(expected_values)
+    assert np.array_equal(derivatives, repeat_tendency.get_derivative(times))
+
+
+def test_no_period_table(repeat_waveform):
+    """Check that no period table is used for waveforms which are not linear."""
+    repeat_tendency = RepeatTendency(**repeat_waveform)
+    assert not repeat_tendency._get_period_table()
+
+
+def test_sample_repetitions(linear_repeat_waveform):
+    """Check if the samples of a single period are repeated within the tendency."""
+    repeat_tendency = RepeatTendency(**linear_repeat_waveform)
+    times, values = repeat_tendency.sample(100 * 3)
+    assert times[0] == repeat_tendency.start
+    assert times[-1] == repeat_tendency.end
+    assert np.all(np.diff(times) >= 0)
+    # Jumps at the end of a period are sampled as two points at the same time
+    unique = np.concatenate([np.diff(times) > 0, [True]])
+    _, expected_values = repeat_tendency.get_value(times[unique])
+    assert values[unique] == approx(expected_values)
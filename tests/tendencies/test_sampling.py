@@ -0,0 +1,116 @@
+import numpy as np
+
+from waveform_editor.tendencies.periodic.sine_wave import SineWaveTendency
+from waveform_editor.tendencies.piecewise import PiecewiseLinearTendency
+from waveform_editor.tendencies.repeat import RepeatTendency
+from waveform_editor.tendencies.sampling import adaptive_sample, sampling_settings
+from waveform_editor.tendencies.smooth import SmoothTendency
+from waveform_editor.waveform import Waveform
+
+
+def max_interpolation_error(func, time, values):
+    fine_time = np.linspace(time[0], time[-1], 100_001)
+    return np.max(np.abs(np.interp(fine_time, time, values) - func(fine_time)))
+
+
+def test_adaptive_sample():
+    time, values = adaptive_sample(np.exp, 0, 5)
+    assert time[0] == 0 and time[-1] == 5
+    assert np.all(np.diff(time) > 0)
+    assert np.array_equal(values, np.exp(time))
+    value_range = np.exp(5) - 1
+    assert max_interpolation_error(np.exp, time, values) < 2e-3 * value_range
+
+    # Stricter tolerances require more points
+    with sampling_settings.param.update(rtol=1e-5):
+        fine_time, _ = adaptive_sample(np.exp, 0, 5)
+    assert len(fine_time) > 5 * len(time)
+    # Linear functions are not refined
+    time, _ = adaptive_sample(lambda t: 2 * t, 0, 5, num_initial=3)
+    assert len(time) == 3
+
+
+def test_sample_tolerance():
+    """The linear interpolation of the samples of tendencies is within the tolerance,
+    also for intervals which contain an inflection point."""
+    tendencies = [
+        SineWaveTendency(user_duration=d, user_frequency=f, user_amplitude=2)
+        for d, f in [(1, 3.3), (2, 3.3), (3, 3.3), (2, 7.1), (5, 0.7)]
+    ]
+    tendencies += [
+        SineWaveTendency(user_duration=2, user_frequency=1.3, user_phase=1),
+        SmoothTendency(user_duration=3600, user_from=0, user_to=10),
+        SmoothTendency(user_duration=1, user_from=-3, user_to=2),
+        PiecewiseLinearTendency(user_time=[0, 1, 1.5, 4], user_value=[0, 2, -1, 3]),
+    ]
+    for tendency in tendencies:
+        time, values = tendency.get_value()
+        fine_time = np.linspace(time[0], time[-1], 200_001)
+        _, fine_values = tendency.get_value(fine_time)
+        value_range = np.max(fine_values) - np.min(fine_values)
+        tolerance = sampling_settings.atol + sampling_settings.rtol * value_range
+        error = np.abs(np.interp(fine_time, time, values) - fine_values)
+        assert np.max(error) <= tolerance
+
+
+def test_adaptive_sample_max_points():
+    time, values = adaptive_sample(np.sin, 0, 1000, num_initial=100, max_points=500)
+    assert len(time) == 500
+    assert np.all(np.diff(time) > 0)
+    assert np.array_equal(values, np.sin(time))
+
+
+def test_long_sine():
+    """An hour-long sine wave remains within the point budget."""
+    tendency = SineWaveTendency(user_duration=3600, user_frequency=1)
+    time, values = tendency.get_value()
+    assert len(time) <= sampling_settings.max_points
+    assert time[0] == 0 and time[-1] == 3600
+    assert np.allclose(values, tendency._calc_sine(time))
+
+
+def test_long_smooth():
+    """A long smooth tendency only needs a few points."""
+    tendency = SmoothTendency(user_duration=3600, user_from=0, user_to=10)
+    time, values = tendency.get_value()
+    assert len(time) < 100
+    assert max_interpolation_error(tendency.spline, time, values) < 2e-3 * 10
+
+
+def test_repeat_many_repetitions():
+    repeat_waveform = [
+        {"type": "linear", "from": 0, "to": 1, "duration": 1},
+        {"type": "smooth", "to": 0, "duration": 1},
+    ]
+    tendency = RepeatTendency(user_duration=1e5, user_waveform=repeat_waveform)
+    time, values = tendency.get_value()
+    assert len(time) <= sampling_settings.max_points
+    assert time[0] == 0 and time[-1] == 1e5
+    _, expected = tendency.get_value(time)
+    assert np.array_equal(values, expected)
+
+
+def test_waveform_budget():
+    waveform = Waveform(
+        waveform=[
+            {"user_type": "sine", "user_duration": 3000, "user_frequency": 2},
+            {"user_type": "smooth", "user_duration": 1000, "user_to": 3},
+        ]
+    )
+    with sampling_settings.param.update(max_points=4000):
+        time, _ = waveform.get_value()
+    assert len(time) <= 4000
+
+
+def test_waveform_budget_many_tendencies():
+    """The budget is not exceeded by the minimum number of points of many tendencies."""
+    waveform = Waveform(
+        waveform=[
+            {"user_type": "sine", "user_duration": 1, "user_frequency": 10},
+            {"user_type": "smooth", "user_duration": 1, "user_to": 3},
+        ]
+        * 100
+    )
+    for max_points in [400, 1000, 5000]:
+        time, _ = waveform.sample(max_points)
+        assert len(time) <= max_points
@@ -1,5 +1,9 @@
+import numpy as np
+import pytest
+from pytest import approx
+
 from waveform_editor.tendencies.linear import LinearTendency
-from waveform_editor.tendencies.smooth import SmoothTendency
+from waveform_editor.tendencies.smooth import HermiteCubic, SmoothTendency
 
 
 def test_empty():
@@ -95,3 +99,34 @@ def test_get_value_no_start():
     assert values[0] == 3
     assert values[-1] == 6
     assert not tendency.annotations
+
+
+def test_hermite_cubic():
+    """Check if the cubic Hermite polynomial matches its boundary conditions."""
+    cubic = HermiteCubic(2, 5, 1.5, -3, 0.5, 2)
+    values, derivatives = cubic.value_and_derivative(np.array([2, 5]))
+    assert values == approx([1.5, -3])
+    assert derivatives == approx([0.5, 2])
+
+    time = np.linspace(2, 5, 31)
+    values, derivatives = cubic.value_and_derivative(time)
+    assert np.array_equal(values, cubic(time))
+    assert np.array_equal(derivatives, cubic.derivative(time))
+    # Compare the derivatives with a finite difference of the values
+    midpoints = (time[1:] + time[:-1]) / 2
+    assert cubic.derivative(midpoints) == approx(
+        np.diff(values) / np.diff(time), abs=1e-2
+    )
+
+
+def test_get_derivative():
+    """Check the derivatives at the boundaries of the tendency."""
+    prev_tendency = LinearTendency(user_start=0, user_duration=1, user_rate=5)
+    tendency = SmoothTendency(user_duration=2, user_to=1)
+    tendency.set_previous_tendency(prev_tendency)
+    derivatives = tendency.get_derivative(np.array([1, 2, 3]))
+    assert derivatives[0] == approx(5)
+    assert derivatives[2] == approx(0)
+    assert tendency.value_at(2) == approx(tendency.get_value(np.array([2]))[1][0])
+    with pytest.raises(ValueError):
+        tendency.value_at(3.5)
@@ -98,6 +98,44 @@ def test_export_csv(runner, tmp_path, test_yaml_file, test_csv_file):
     assert output_csv.exists()
 
 
+def test_export_csv_profile_watchers(runner, tmp_path, test_yaml_file):
+    output_csv = tmp_path / "test.csv"
+    result = runner.invoke(
+        waveform_cli.cli,
+        [
+            "--profile-watchers",
+            "export-csv",
+            str(test_yaml_file),
+            str(output_csv),
+            "--linspace",
+            "0,60,7",
+        ],
+    )
+    assert result.exit_code == 0
+    assert output_csv.exists()
+    assert "Waveform 'ec_launchers/beam(4)/power_launched/data'" in result.output
+    assert "LinearTendency._calc_values" in result.output
+
+
+def test_export_csv_workers(runner, tmp_path, test_yaml_file):
+    expected_csv = tmp_path / "expected.csv"
+    output_csv = tmp_path / "test.csv"
+    for args, path in [([], expected_csv), (["--workers", "2"], output_csv)]:
+        result = runner.invoke(
+            waveform_cli.cli,
+            [
+                *args,
+                "export-csv",
+                str(test_yaml_file),
+                str(path),
+                "--linspace",
+                "0,60,7",
+            ],
+        )
+        assert result.exit_code == 0
+    assert output_csv.read_text() == expected_csv.read_text()
+
+
 def test_export_xml(runner, tmp_path, test_yaml_file, test_csv_file):
     csv_path, _ = test_csv_file
     output_xml = tmp_path / "test.xml"
@@ -1,5 +1,6 @@
 from textwrap import dedent
 
+import numpy as np
 import pytest
 
 from waveform_editor.configuration import WaveformConfiguration
@@ -80,6 +81,38 @@ def test_add_waveform_duplicate(config):
         config.add_waveform(waveform1, path2)
 
 
+def test_add_waveforms(config):
+    """Test if multiple waveforms are added at once, or not at all."""
+    yaml_str = """
+    waveform/1:
+    - {start: 5, end: 15}
+    """
+    waveform1 = config.parse_waveform(dedent(yaml_str))
+    waveform2 = config.parse_waveform("waveform/2: |\n  'waveform/1' + 1")
+    path1 = ["ec_launchers", "beams", "steering_angles"]
+    path2 = ["ec_launchers"]
+    config.add_waveforms([(waveform1, path1), (waveform2, path2)])
+    assert list(config.waveform_map) == ["waveform/1", "waveform/2"]
+    assert config.traverse(path1).waveforms["waveform/1"] is waveform1
+    assert config.traverse(path2).waveforms["waveform/2"] is waveform2
+    assert (config.start, config.end) == (5, 15)
+    assert config.dependency_graph.graph["waveform/2"] == {"waveform/1"}
+
+    # A duplicate waveform, or a cycle, doesn't add any of the waveforms
+    waveform3 = Waveform(name="waveform/3")
+    with pytest.raises(ValueError):
+        config.add_waveforms([(waveform3, path1), (waveform1, path2)])
+    waveform4 = config.parse_waveform("waveform/4: |\n  'waveform/5' + 1")
+    waveform5 = config.parse_waveform("waveform/5: |\n  'waveform/4' + 1")
+    with pytest.raises(RuntimeError, match="'waveform/4' -> 'waveform/5'"):
+        config.add_waveforms(
+            [(waveform3, path1), (waveform4, path1), (waveform5, path2)]
+        )
+    assert list(config.waveform_map) == ["waveform/1", "waveform/2"]
+    assert "waveform/3" not in config.traverse(path1)
+    assert "waveform/4" not in config.dependency_graph
+
+
 def test_add_group_duplicate():
     """Test if error is raised when group that already exists at a path is added."""
     config = WaveformConfiguration()
@@ -249,6 +282,66 @@ def test_dump():
     assert new_dump == dump
 
 
+def test_dump_piecewise_file(tmp_path):
+    """Check if a piecewise tendency loaded from a data file is dumped as a reference
+    to the file."""
+    path = tmp_path / "data.npy"
+    np.save(path, np.array([[0.0, 1.0, 3.0], [1.0, 2.0, 0.0]]))
+    yaml_str = f"""
+    ec_launchers:
+      ec_launchers/beam(0)/power_launched:
+      - {{type: piecewise, file: {path}}}
+      - {{type: linear, to: 3, duration: 1}}
+    """
+    config = WaveformConfiguration()
+    config.load_yaml(yaml_str)
+    dump = config.dump()
+    assert "file:" in dump
+    assert "data.npy" in dump
+    assert "value" not in dump
+
+    new_config = WaveformConfiguration()
+    new_config.load_yaml(dump)
+    waveform = new_config["ec_launchers/beam(0)/power_launched"]
+    assert not waveform.annotations
+    times = np.linspace(0, 4, 9)
+    _, values = waveform.get_value(times)
+    assert np.allclose(values, [1, 1.5, 2, 1.5, 1, 0.5, 0, 1.5, 3])
+    assert new_config.dump() == dump
+
+
+def test_piecewise_file_relative(tmp_path, monkeypatch):
+    """Check if relative paths of data files are resolved against the directory of the
+    YAML file, also when a waveform is parsed again."""
+    np.save(tmp_path / "data.npy", np.array([[0.0, 1.0, 3.0], [1.0, 2.0, 0.0]]))
+    yaml_str = """
+    ec_launchers:
+      ec_launchers/beam(0)/power_launched:
+      - {type: piecewise, file: data.npy}
+      ec_launchers/beam(1)/power_launched:
+      - type: repeat
+        duration: 6
+        waveform:
+        - {type: piecewise, file: data.npy}
+    """
+    monkeypatch.chdir(tmp_path.parent)
+    config = WaveformConfiguration()
+    config.load_yaml(yaml_str, base_path=tmp_path)
+    for name in config.waveform_names:
+        assert not config[name].annotations
+    waveform = config["ec_launchers/beam(0)/power_launched"]
+    assert waveform.tendencies[0].value_at(2) == pytest.approx(1)
+
+    waveform = config.parse_waveform(
+        "ec_launchers/beam(0)/power_launched:\n- {type: piecewise, file: data.npy}"
+    )
+    assert not waveform.annotations
+    assert "data.npy" in config.dump()
+
+    config.load_yaml(yaml_str)
+    assert config["ec_launchers/beam(0)/power_launched"].annotations
+
+
 def test_dump_comments():
     """Check if comments for waveforms are preserved."""
 
@@ -400,3 +493,116 @@ def test_duplicates_group_waveform():
         config.add_group("waveform_name", ["root"])
     with pytest.raises(ValueError):
         config.rename_waveform("waveform_name", "group_name")
+
+
+def test_evaluate():
+    """Check if evaluate returns the values of all waveforms in a single array."""
+    yaml_str = """
+    ec_launchers:
+      ec_launchers/beam(1)/phase/angle:
+      - {from: 0, to: 4, duration: 4}
+      ec_launchers/beam(2)/phase/angle: 2
+      ec_launchers/beam(3)/phase/angle: |
+        "ec_launchers/beam(1)/phase/angle" * 2
+    """
+    config = WaveformConfiguration()
+    config.load_yaml(yaml_str)
+    times = np.array([0, 1, 2, 3, 4])
+
+    values = config.evaluate(times)
+    assert values.shape == (3, 5)
+    assert values.flags.c_contiguous
+    assert np.allclose(values[0], [0, 1, 2, 3, 4])
+    assert np.allclose(values[1], [2, 2, 2, 2, 2])
+    assert np.allclose(values[2], [0, 2, 4, 6, 8])
+
+    names = ["ec_launchers/beam(3)/phase/angle", "ec_launchers/beam(1)/phase/angle"]
+    values = config.evaluate(times[::-1], names, dtype=np.float32)
+    assert values.dtype == np.float32
+    assert np.allclose(values, [[8, 6, 4, 2, 0], [4, 3, 2, 1, 0]])
+
+    with pytest.raises(KeyError):
+        config.evaluate(times, ["ec_launchers"])
+
+
+def test_values_at():
+    """Check if values_at gives the same values as evaluate."""
+    yaml_str = """
+    ec_launchers:
+      ec_launchers/beam(1)/phase/angle:
+      - {type: sine, amplitude: 2, frequency: 0.3, duration: 4}
+      - {type: smooth, to: 1, duration: 3}
+      ec_launchers/beam(2)/phase/angle: |
+        ("ec_launchers/beam(1)/phase/angle" / 7) ** 2.5 + 2
+      ec_launchers/beam(3)/phase/angle: |
+        "ec_launchers/beam(2)/phase/angle" / ("ec_launchers/beam(1)/phase/angle")
+    """
+    config = WaveformConfiguration()
+    config.load_yaml(yaml_str)
+    times = np.linspace(-1, 8, 91)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = config.evaluate(times)
+        for i, time in enumerate(times):
+            values = config.values_at(time)
+            assert np.array_equal(values, expected[:, i], equal_nan=True)
+            # Single time points are evaluated by values_at
+            values = config.evaluate([time])[:, 0]
+            assert np.array_equal(values, expected[:, i], equal_nan=True)
+
+        names = ["ec_launchers/beam(3)/phase/angle"]
+        assert config.values_at(0, names) == [np.inf]
+    waveform = config["ec_launchers/beam(3)/phase/angle"]
+    assert waveform.value_at(times[15]) == expected[2, 15]
+
+
+def test_reload_dependencies():
+    """Check if the dependencies of derived waveforms are removed when a configuration
+    is loaded again."""
+    config = WaveformConfiguration()
+    config.load_yaml("""
+    group:
+      x/1:
+      - {type: constant, value: 1, duration: 2}
+      y/1: |
+        "x/1" * 2
+    """)
+    assert np.array_equal(config.values_at(1.0), [1, 2])
+
+    config.load_yaml("""
+    group:
+      y/1:
+      - {type: constant, value: 3, duration: 2}
+    """)
+    assert "y/1" not in config.dependency_graph
+    assert np.array_equal(config.values_at(1.0), [3])
+    assert np.array_equal(config.evaluate(np.array([1.0])), [[3]])
+    assert np.array_equal(config.evaluate(np.array([1.0, 1.5])), [[3, 3]])
+
+
+def test_iter_evaluate():
+    """Check if chunked evaluation gives the same values as a single evaluation."""
+    yaml_str = """
+    ec_launchers:
+      ec_launchers/beam(1)/phase/angle:
+      - {type: sine, amplitude: 2, frequency: 0.3, duration: 4}
+      - {type: smooth, to: 1, duration: 3}
+      ec_launchers/beam(3)/phase/angle: |
+        "ec_launchers/beam(1)/phase/angle" * 2
+    """
+    config = WaveformConfiguration()
+    config.load_yaml(yaml_str)
+    times = np.linspace(-1, 8, 103)
+    expected = config.evaluate(times)
+
+    with config.evaluation_session() as session:
+        chunks = list(config.iter_evaluate(times, chunk_size=10))
+        # The values of the chunks are not kept in the session
+        assert len(session) == 0
+    assert [len(chunk) for chunk, _ in chunks] == [10] * 10 + [3]
+    assert np.array_equal(np.concatenate([chunk for chunk, _ in chunks]), times)
+    assert np.array_equal(np.hstack([values for _, values in chunks]), expected)
+
+    for i, name in enumerate(config.waveform_map):
+        waveform = config[name]
+        values = [values for _, values in waveform.iter_values(times, chunk_size=7)]
+        assert np.array_equal(np.concatenate(values), expected[i])
@@ -87,3 +87,133 @@ def test_detect_cycles_with_start_node():
     dg.graph["C"] = {"A"}
     with pytest.raises(RuntimeError):
         dg.detect_cycles("A")
+
+
+def test_levels():
+    dg = DependencyGraph()
+    dg.add_node("A", ["X"])
+    dg.add_node("B", ["A", "Y"])
+    dg.add_node("C", ["A"])
+    dg.add_node("D", ["B", "C"])
+    dg.add_node("E", [])
+    levels = dg.levels()
+    assert [sorted(level) for level in levels] == [["A", "E"], ["B", "C"], ["D"]]
+    assert dg.levels() is levels  # cached
+
+    order = dg.topological_order()
+    assert sorted(order) == ["A", "B", "C", "D", "E"]
+    assert order.index("A") < order.index("B") < order.index("D")
+    assert order.index("C") < order.index("D")
+
+    dg.replace_node("E", ["D"])
+    assert [sorted(level) for level in dg.levels()] == [["A"], ["B", "C"], ["D"], ["E"]]
+    dg.remove_node("E")
+    dg.rename_node("D", "F")
+    assert dg.levels()[-1] == ["F"]
+
+
+def test_levels_for():
+    dg = DependencyGraph()
+    dg.add_node("A", ["X"])
+    dg.add_node("B", ["A", "Y"])
+    dg.add_node("C", ["A"])
+    levels = dg.levels_for(["B"])
+    assert [sorted(level) for level in levels] == [["X", "Y"], ["A"], ["B"]]
+
+    # Dependencies which don't exist are skipped
+    levels = dg.levels_for(["B", "Z"], known={"A", "B", "Y"})
+    assert [sorted(level) for level in levels] == [["Y", "Z"], ["A"], ["B"]]
+
+
+def test_deep_chain():
+    dg = DependencyGraph()
+    depth = 1500
+    for i in range(depth):
+        dg.add_node(f"n{i}", [f"n{i + 1}"] if i + 1 < depth else [])
+    dg.detect_cycles()
+    assert dg.topological_order() == [f"n{i}" for i in reversed(range(depth))]
+    with pytest.raises(RuntimeError):
+        dg.replace_node(f"n{depth - 1}", ["n0"])
+
+
+def test_add_nodes():
+    dg = DependencyGraph()
+    dg.add_node("A", [])
+    dg.add_nodes({"B": ["A"], "C": ["B", "X"], "A": ["X"]})
+    assert dg.graph == {"A": {"X"}, "B": {"A"}, "C": {"B", "X"}}
+    assert dg.topological_order() == ["A", "B", "C"]
+
+    # All cycles are reported, and the graph is restored
+    with pytest.raises(RuntimeError) as excinfo:
+        dg.add_nodes({"A": ["C"], "D": ["E"], "E": ["D"], "F": ["F"], "G": ["D"]})
+    message = str(excinfo.value)
+    assert "'A' -> 'C' -> 'B' -> 'A'" in message
+    assert "'D' -> 'E' -> 'D'" in message
+    assert "'F' -> 'F'" in message
+    assert "'G'" not in message
+    assert dg.graph == {"A": {"X"}, "B": {"A"}, "C": {"B", "X"}}
+    assert dg.topological_order() == ["A", "B", "C"]
+
+
+def test_find_cycles():
+    dg = DependencyGraph()
+    depth = 1500
+    dg.add_nodes({f"n{i}": [f"n{i + 1}"] for i in range(depth)})
+    assert dg.find_cycles() == []
+    dg.graph[f"n{depth}"] = {"n0"}
+    assert dg.find_cycles() == [[f"n{i}" for i in range(depth + 1)]]
+    # Two cycles which are connected to each other
+    dg.graph = {"A": {"B"}, "B": {"A", "C"}, "C": {"D"}, "D": {"C"}}
+    assert dg.find_cycles() == [["C", "D"], ["A", "B"]]
+
+
+def assert_dependents(dg):
+    """Check if the index of dependents matches the dependencies."""
+    expected = {}
+    for node, deps in dg.graph.items():
+        for dep in deps:
+            expected.setdefault(dep, set()).add(node)
+    assert dg.dependents == expected
+
+
+def test_dependents():
+    dg = DependencyGraph()
+    dg.add_node("A", ["X"])
+    dg.add_node("B", ["A", "X"])
+    dg.add_nodes({"C": ["A"], "D": ["B", "C"]})
+    assert_dependents(dg)
+    assert dg.dependents["A"] == {"B", "C"}
+
+    dg.replace_node("D", ["C"])
+    assert_dependents(dg)
+    assert dg.rename_node("A", "E") == ["B", "C"]
+    assert_dependents(dg)
+    dg.rename_node("X", "Y")
+    assert dg.graph["E"] == {"Y"}
+    assert_dependents(dg)
+    dg.remove_node("D")
+    assert_dependents(dg)
+    dg.check_safe_to_remove("C")
+    with pytest.raises(RuntimeError, match="'B'"):
+        dg.check_safe_to_remove("E")
+
+    copy = dg.copy()
+    copy.remove_node("B")
+    assert_dependents(copy)
+    assert "B" in dg.dependents["E"]
+
+
+def test_replace_node_cycle_path():
+    dg = DependencyGraph()
+    dg.add_nodes({"A": ["B"], "B": ["C"], "C": ["X"], "D": ["C"]})
+    dg.check_safe_to_replace("C", ["X", "Y"])
+    with pytest.raises(RuntimeError, match="'C' -> 'D' -> 'C'"):
+        dg.check_safe_to_replace("C", ["D"])
+    with pytest.raises(RuntimeError, match="'C' -> 'A' -> 'B' -> 'C'"):
+        dg.replace_node("C", ["X", "A"])
+    assert dg.graph["C"] == {"X"}
+    assert_dependents(dg)
+    with pytest.raises(RuntimeError, match="'E' -> 'E'"):
+        dg.add_node("E", ["E"])
+    assert "E" not in dg
+    assert_dependents(dg)
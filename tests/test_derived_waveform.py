@@ -1,8 +1,13 @@
+import ast
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pytest
 
 from waveform_editor.configuration import WaveformConfiguration
 from waveform_editor.derived_waveform import DerivedWaveform
+from waveform_editor.evaluation import PARALLEL_MIN_SAMPLES, run_concurrently
+from waveform_editor.expression_optimizer import ExpressionOptimizer
 from waveform_editor.waveform import Waveform
 
 
@@ -151,3 +156,165 @@ def test_function_access_control(filled_config):
         else:
             with pytest.raises(NameError):
                 waveform.get_value(time_ret)
+
+
+def test_evaluation_session(filled_config):
+    """Check that shared dependencies are only evaluated once per session."""
+    expressions = {
+        "waveform/2": "'waveform/1' * 2",
+        "waveform/3": "'waveform/1' + 1",
+        "waveform/4": "'waveform/2' + 'waveform/3'",
+        "waveform/5": "'waveform/4' * 'waveform/2' - 'waveform/3'",
+    }
+    for name, expr in expressions.items():
+        waveform = DerivedWaveform(f"{name}: |\n  {expr}", name, filled_config)
+        filled_config.add_waveform(waveform, ["root_group"])
+
+    base_waveform = filled_config["waveform/1"]
+    num_calls = 0
+    get_value = base_waveform.get_value
+
+    def counting_get_value(time=None):
+        nonlocal num_calls
+        num_calls += 1
+        return get_value(time)
+
+    base_waveform.get_value = counting_get_value
+    time = np.array([5.0, 10.0, 15.0])
+    with filled_config.evaluation_session() as session:
+        _, values = filled_config["waveform/5"].get_value(time)
+        assert filled_config.session is session
+    assert filled_config.session is None
+    w1 = np.array([10, 15, 20])
+    w2, w3 = w1 * 2, w1 + 1
+    assert np.allclose(values, (w2 + w3) * w2 - w3)
+    assert num_calls == 1
+    # waveform/1 to waveform/4 are evaluated once, and then served from the cache
+    assert session.misses == 4
+    assert session.hits == 3
+    assert session.statistics()["cached"] == 4
+
+
+def test_evaluation_session_threads(filled_config):
+    """Check that sessions are only active in their own thread, and in the thread
+    pools which evaluate waveforms for them."""
+    with filled_config.evaluation_session() as session:
+        with ThreadPoolExecutor(1) as executor:
+            assert executor.submit(lambda: filled_config.session).result() is None
+        sessions = run_concurrently(lambda _: filled_config.session, [0, 1], 2)
+        assert sessions == [session, session]
+    assert filled_config.session is None
+
+
+def test_evaluation_session_isolated(filled_config):
+    """Check that changing evaluated values doesn't change the cached values."""
+    name = "waveform/2"
+    waveform = DerivedWaveform(f"{name}: |\n  'waveform/1'", name, filled_config)
+    filled_config.add_waveform(waveform, ["root_group"])
+    time = np.array([5.0, 10.0, 15.0])
+    expected = np.array([[10, 15, 20], [10, 15, 20]])
+    with filled_config.evaluation_session():
+        values = filled_config.evaluate(time)
+        values[:] = 0
+        _, derived = waveform.get_value(time)
+        derived[:] = 0
+        assert np.allclose(filled_config.evaluate(time), expected)
+
+
+def test_evaluate_deep_chain(filled_config):
+    """Check that long chains of derived waveforms are evaluated level by level."""
+    depth = 300
+    for i in range(2, depth + 2):
+        name = f"waveform/{i}"
+        yaml_str = f"{name}: |\n  'waveform/{i - 1}' + 1"
+        waveform = DerivedWaveform(yaml_str, name, filled_config)
+        filled_config.add_waveform(waveform, ["root_group"])
+
+    time = np.linspace(0, 20, PARALLEL_MIN_SAMPLES)
+    names = [f"waveform/{depth + 1}", "waveform/2", "waveform/1"]
+    values = filled_config.evaluate(time, names, max_workers=4)
+    _, base_values = filled_config["waveform/1"].get_value(time)
+    assert np.allclose(values, [base_values + depth, base_values + 1, base_values])
+
+
+def test_expression_compiled_once(filled_config):
+    name = "waveform/2"
+    yaml_str = f"{name}: |\n  'waveform/1' ** 2 + sin('waveform/1')"
+    waveform = DerivedWaveform(yaml_str, name, filled_config)
+    evaluator = waveform._evaluator
+    time = np.array([5.0, 10.0, 15.0])
+    for _ in range(3):
+        _, values = waveform.get_value(time)
+        assert waveform._evaluator is evaluator
+    w1 = np.array([10, 15, 20])
+    assert np.allclose(values, w1**2 + np.sin(w1))
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        "sin.__class__",
+        "'waveform/1'.ctypes",
+        "(lambda x: x)('waveform/1')",
+        "'waveform/1' if 1 else 0",
+        "[x for x in 'waveform/1']",
+        "__import__('os')",
+    ],
+)
+def test_expression_not_allowed(filled_config, expr):
+    name = "waveform/2"
+    yaml_str = f"{name}: |\n  {expr}"
+    waveform = DerivedWaveform(yaml_str, name, filled_config)
+    assert waveform.annotations
+    _, values = waveform.get_value(np.array([5.0, 10.0]))
+    assert np.all(values == 0)
+
+
+def test_expression_large_exponent(filled_config):
+    name = "waveform/2"
+    yaml_str = f"{name}: |\n  'waveform/1' * 10 ** 100000"
+    waveform = DerivedWaveform(yaml_str, name, filled_config)
+    with pytest.raises(RuntimeError):
+        waveform.get_value(np.array([5.0, 10.0]))
+
+
+@pytest.fixture
+def derived_config(filled_config):
+    expressions = {
+        "waveform/2": "('waveform/1' / 870e3) ** 2.5 * 2",
+        "waveform/3": "('waveform/1' / 870e3) ** 2.5 + 10 * 2",
+        "waveform/4": "sin('waveform/2') + sin('waveform/2') * ('waveform/3' - 1)",
+        "waveform/5": "2 ** 3 + exp(1.5)",
+    }
+    for name, expr in expressions.items():
+        waveform = DerivedWaveform(f"{name}: |\n  {expr}", name, filled_config)
+        filled_config.add_waveform(waveform, ["root_group"])
+    return filled_config
+
+
+def test_optimizer(derived_config):
+    names = ["waveform/2", "waveform/3", "waveform/4", "waveform/5"]
+    optimizer = ExpressionOptimizer([derived_config[name] for name in names])
+    # ('waveform/1' / 870e3) ** 2.5, its numerator and sin('waveform/2') are shared
+    assert len(optimizer.subexpressions) == 3
+    # 10 * 2, 2 ** 3, exp(1.5) and their sum are folded
+    assert optimizer.num_folded == 4
+    evaluator, dependencies = optimizer.expressions["waveform/5"]
+    assert not dependencies
+    assert evaluator({}) == 2**3 + np.exp(1.5)
+    # The expressions of the waveforms themselves are not modified
+    assert ast.unparse(derived_config["waveform/5"].expression_tree) == (
+        "2 ** 3 + exp(1.5)"
+    )
+
+
+def test_evaluate_optimized(derived_config):
+    time = np.linspace(0, 20, 101)
+    expected = derived_config.evaluate(time)
+    with derived_config.evaluation_session() as session:
+        values = derived_config.evaluate(time, optimize=True)
+        names = ["waveform/2", "waveform/3", "waveform/4", "waveform/5"]
+        optimizer = ExpressionOptimizer([derived_config[name] for name in names])
+        for name in optimizer.subexpressions:
+            assert session.lookup(name, time) is not None
+    assert np.array_equal(values, expected)
@@ -1,9 +1,14 @@
+import io
+import xml.etree.ElementTree as ET
+
 import imas
 import numpy as np
+import pandas as pd
 import pytest
 
 from waveform_editor.configuration import WaveformConfiguration
 from waveform_editor.exporter import ConfigurationExporter
+from waveform_editor.pcssp_exporter import PCSSPExporter
 
 
 @pytest.fixture
@@ -90,6 +95,25 @@ def test_to_ids(tmp_path):
         assert ids.time_slice[2].global_quantities.ip == 1
 
 
+def test_generate_idss_session():
+    """Check that no evaluation session is left active when the IDSs are not all
+    generated."""
+    yaml_str = """
+    equilibrium:
+      equilibrium/time_slice/global_quantities/ip: 1
+    ec_launchers:
+      ec_launchers/beam(1)/phase/angle: 2
+    """
+    config = WaveformConfiguration()
+    config.load_yaml(yaml_str)
+    exporter = ConfigurationExporter(config, np.array([0, 0.5, 1]))
+    generator = exporter._generate_idss(imas.IDSFactory("4.0.0"))
+    next(generator)
+    assert config.session is None
+    generator.close()
+    assert config.session is None
+
+
 def test_to_ids_inverted(tmp_path):
     """Check if to_ids fills the correct quantities, if the indices are in decreasing
     order."""
@@ -707,3 +731,165 @@ def test_example_yaml(tmp_path):
         nbi.unit[0].power_launched.data == 16.5e6 * (values**2.5) / (870e3**2.5)
     )
     assert np.all(nbi.unit[0].energy.data == values)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1000])
+def test_export_streaming(tmp_path, chunk_size):
+    """Check if the streaming exporters give the same output for any chunk size."""
+    with open("tests/test_yaml/example.yaml") as file:
+        yaml_str = file.read()
+    config = WaveformConfiguration()
+    config.load_yaml(yaml_str)
+    times = np.linspace(0, 600, 11)
+
+    reference = ConfigurationExporter(config, times)
+    reference.to_csv(tmp_path / "reference.csv")
+    reference.to_pcssp_xml(tmp_path / "reference.xml")
+    exporter = ConfigurationExporter(config, times, chunk_size=chunk_size)
+    exporter.to_csv(tmp_path / "chunked.csv")
+    exporter.to_pcssp_xml(tmp_path / "chunked.xml")
+
+    for suffix in ["csv", "xml"]:
+        reference_text = (tmp_path / f"reference.{suffix}").read_text()
+        assert (tmp_path / f"chunked.{suffix}").read_text() == reference_text
+
+    df = pd.read_csv(tmp_path / "chunked.csv")
+    assert np.allclose(df["time"], times)
+    assert np.allclose(
+        df["core_profiles/global_quantities/ip"],
+        config.evaluate(times, ["core_profiles/global_quantities/ip"])[0],
+    )
+
+
+def test_export_empty_waveform(tmp_path, caplog):
+    """Check if waveforms without tendencies are skipped by all exporters."""
+    yaml_str = """
+    ec_launchers:
+      ec_launchers/beam(1)/phase/angle: []
+      ec_launchers/beam(2)/phase/angle:
+      - {type: linear, from: 1, to: 3, duration: 2}
+    """
+    config = WaveformConfiguration()
+    config.load_yaml(yaml_str)
+    times = np.linspace(0, 2, 5)
+    exporter = ConfigurationExporter(config, times)
+    empty = "ec_launchers/beam(1)/phase/angle"
+
+    exporter.to_csv(tmp_path / "test.csv")
+    df = pd.read_csv(tmp_path / "test.csv")
+    assert list(df.columns) == ["time", "ec_launchers/beam(2)/phase/angle"]
+
+    exporter.to_pcssp_xml(tmp_path / "test.xml")
+    xml = (tmp_path / "test.xml").read_text()
+    assert empty not in xml
+    assert "ec_launchers/beam(2)/phase/angle" in xml
+
+    ids = exporter.to_ids_dict()["ec_launchers"]
+    assert len(ids.beam) == 2
+    assert len(ids.beam[0].phase.angle) == 0
+    assert np.array_equal(ids.beam[1].phase.angle, np.linspace(1, 3, 5))
+    assert f"{empty} has no tendencies, and is not exported." in caplog.text
+
+
+def test_pcssp_shared_dependencies(tmp_path):
+    """Check if the PCSSP exporter evaluates shared dependencies once per chunk, and
+    writes empty trajectories for waveforms without values."""
+    yaml_str = """
+    ec_launchers:
+      ec_launchers/beam(1)/phase/angle: []
+      ec_launchers/beam(2)/phase/angle:
+      - {type: linear, from: 1, to: 3, duration: 2}
+      ec_launchers/beam(3)/phase/angle: |
+        'ec_launchers/beam(2)/phase/angle' * 2
+      ec_launchers/beam(4)/phase/angle: |
+        'ec_launchers/beam(2)/phase/angle' + 1
+    """
+    config = WaveformConfiguration()
+    config.load_yaml(yaml_str)
+    waveform = config["ec_launchers/beam(2)/phase/angle"]
+    num_calls = 0
+    fill_values = waveform.fill_values
+
+    def counting_fill_values(time, out):
+        nonlocal num_calls
+        num_calls += 1
+        fill_values(time, out)
+
+    waveform.fill_values = counting_fill_values
+    times = np.linspace(0, 2, 5)
+    PCSSPExporter(config, times, chunk_size=3).export(tmp_path / "test.xml")
+    # Once for each of the two chunks
+    assert num_calls == 2
+
+    root = ET.parse(tmp_path / "test.xml").getroot()
+    trajectories = root.iter("SIGNAL_TRAJECTORY")
+    expected = [[], np.linspace(1, 3, 5), np.linspace(2, 6, 5), np.linspace(2, 4, 5)]
+    for trajectory, values in zip(trajectories, expected, strict=True):
+        points = trajectory.findall("REFERENCE/POINT")
+        assert np.allclose([float(p.get("time")) for p in points], times[: len(values)])
+        assert np.allclose([float(p.get("value")) for p in points], values)
+
+
+def test_export_shared_subexpressions():
+    """Check if shared subexpressions of different IDSs are evaluated separately."""
+    yaml_str = """
+    ec_launchers:
+      ec_launchers/beam(1)/phase/angle:
+      - {type: linear, from: 0, to: 1, duration: 2}
+      ec_launchers/beam(2)/phase/angle: |
+        exp('ec_launchers/beam(1)/phase/angle') + 1
+      ec_launchers/beam(3)/phase/angle: |
+        exp('ec_launchers/beam(1)/phase/angle') * 2
+    nbi:
+      nbi/unit(1)/power_launched/data:
+      - {type: linear, from: 0, to: 2, duration: 2}
+      nbi/unit(2)/power_launched/data: |
+        exp('nbi/unit(1)/power_launched/data') + 1
+      nbi/unit(3)/power_launched/data: |
+        exp('nbi/unit(1)/power_launched/data') * 2
+    """
+    config = WaveformConfiguration()
+    config.load_yaml(yaml_str)
+    times = np.linspace(0, 2, 5)
+    idss = ConfigurationExporter(config, times).to_ids_dict()
+
+    angle = np.exp(np.linspace(0, 1, 5))
+    beams = idss["ec_launchers"].beam
+    assert np.allclose(beams[1].phase.angle, angle + 1)
+    assert np.allclose(beams[2].phase.angle, angle * 2)
+    power = np.exp(np.linspace(0, 2, 5))
+    units = idss["nbi"].unit
+    assert np.allclose(units[1].power_launched.data, power + 1)
+    assert np.allclose(units[2].power_launched.data, power * 2)
+
+
+def test_pcssp_integer_times(tmp_path):
+    """Check if the PCSSP exporter formats the times as they are given."""
+    yaml_str = """
+    ec_launchers:
+      ec_launchers/beam(1)/phase/angle:
+      - {type: linear, from: 1, to: 3, duration: 2}
+      ec_launchers/beam(2)/phase/angle: |
+        'ec_launchers/beam(1)/phase/angle' * 2
+    """
+    config = WaveformConfiguration()
+    config.load_yaml(yaml_str)
+    times = np.arange(0, 3)
+    PCSSPExporter(config, times, chunk_size=2).export(tmp_path / "test.xml")
+
+    root = ET.parse(tmp_path / "test.xml").getroot()
+    trajectories = list(root.iter("SIGNAL_TRAJECTORY"))
+    assert len(trajectories) == 2
+    for trajectory, factor in zip(trajectories, [1, 2], strict=True):
+        points = trajectory.findall("REFERENCE/POINT")
+        assert [p.get("time") for p in points] == ["0", "1", "2"]
+        values = [float(p.get("value")) for p in points]
+        assert np.allclose(values, factor * np.array([1, 2, 3]))
+
+    # Without time points, every trajectory is empty
+    exporter = PCSSPExporter(config, np.array([]))
+    file = io.StringIO()
+    exporter._write_trajectories(file, level=0)
+    root = ET.fromstring(f"<ROOT>{file.getvalue()}</ROOT>")
+    assert len(root.findall("SIGNAL_TRAJECTORY")) == 2
+    assert not root.findall(".//POINT")
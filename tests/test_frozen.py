@@ -0,0 +1,197 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from waveform_editor.configuration import WaveformConfiguration
+from waveform_editor.frozen import (
+    FrozenConfiguration,
+    FrozenDerivedWaveform,
+    FrozenWaveform,
+)
+from waveform_editor.waveform import Waveform
+
+
+@pytest.fixture
+def config():
+    yaml_str = """
+    ec_launchers:
+      ec_launchers/beam(1)/phase/angle:
+      - {type: linear, from: 1, to: 3, duration: 2}
+      - {type: sine, amplitude: 2, frequency: 0.7, duration: 3}
+      - {type: smooth, to: 1, duration: 1.5}
+      - {type: square, base: 1, amplitude: 0.5, frequency: 2, duration: 2}
+      - {type: sawtooth, amplitude: 1, frequency: 1.5, phase: 1, duration: 2}
+      - {type: triangle, min: -1, max: 2, frequency: 0.5, duration: 2}
+      - {type: constant, duration: 1}
+      - {type: piecewise, time: [14, 15, 17], value: [0, 4, -2]}
+      - type: repeat
+        duration: 4
+        period: 1.5
+        waveform:
+        - {type: linear, from: 0, to: 1, duration: 1}
+        - {type: smooth, duration: 1}
+      - {start: 22, type: linear, to: 0, duration: 1}
+      ec_launchers/beam(2)/phase/angle: 2
+      ec_launchers/beam(3)/phase/angle: |
+        "ec_launchers/beam(1)/phase/angle" * "ec_launchers/beam(2)/phase/angle"
+      ec_launchers/beam(4)/phase/angle: |
+        "ec_launchers/beam(3)/phase/angle" / 2 + 1
+    """
+    config = WaveformConfiguration()
+    config.load_yaml(yaml_str)
+    return config
+
+
+def test_freeze_waveform(config):
+    """Check if a frozen waveform evaluates to the same values as the waveform."""
+    waveform = config["ec_launchers/beam(1)/phase/angle"]
+    frozen = waveform.freeze()
+    assert isinstance(frozen, FrozenWaveform)
+    assert len(frozen.tendencies) == len(waveform.tendencies)
+
+    times = np.linspace(-1, 25, 1001)
+    assert np.array_equal(frozen.get_value(times)[1], waveform.get_value(times)[1])
+    assert np.array_equal(
+        frozen.get_value(times[::-1])[1], waveform.get_value(times[::-1])[1]
+    )
+    assert np.array_equal(frozen.get_derivative(times), waveform.get_derivative(times))
+    for time in times[::37]:
+        assert frozen.value_at(time) == waveform.value_at(time)
+
+    sampled_time, sampled_values = frozen.get_value()
+    expected_time, expected_values = waveform.get_value()
+    assert np.array_equal(sampled_time, expected_time)
+    assert np.array_equal(sampled_values, expected_values)
+
+
+def test_freeze_immutable(config):
+    """Check if frozen waveforms and tendencies can't be changed."""
+    frozen = config.freeze()
+    waveform = frozen["ec_launchers/beam(1)/phase/angle"]
+    with pytest.raises(AttributeError):
+        waveform.name = "other"
+    with pytest.raises(AttributeError):
+        waveform.tendencies[0].start = 1
+    assert not hasattr(waveform.tendencies[0], "prev_tendency")
+    with pytest.raises(TypeError):
+        frozen.waveforms["other"] = waveform
+    with pytest.raises(AttributeError):
+        frozen.start = 3
+
+    piecewise = waveform.tendencies[7]
+    with pytest.raises(ValueError):
+        piecewise.time[0] = 1
+
+
+def test_freeze_configuration(config):
+    """Check if a frozen configuration evaluates to the same values as the
+    configuration."""
+    frozen = config.freeze()
+    assert isinstance(frozen, FrozenConfiguration)
+    assert frozen.waveform_names == config.waveform_names
+    assert (frozen.start, frozen.end) == (config.start, config.end)
+    assert frozen.globals.dd_version == config.globals.dd_version
+    derived = frozen["ec_launchers/beam(4)/phase/angle"]
+    assert isinstance(derived, FrozenDerivedWaveform)
+    assert derived.config is frozen
+    with pytest.raises(KeyError):
+        frozen["ec_launchers"]
+
+    times = np.linspace(-1, 25, 20_001)
+    expected = config.evaluate(times)
+    assert np.array_equal(frozen.evaluate(times), expected)
+    assert np.array_equal(frozen.evaluate(times, optimize=True), expected)
+    chunks = [values for _, values in frozen.iter_evaluate(times, chunk_size=999)]
+    assert np.array_equal(np.hstack(chunks), expected)
+    for time in times[::1001]:
+        assert np.array_equal(frozen.values_at(time), config.values_at(time))
+    assert frozen.session is None
+
+    # The frozen configuration does not change with the configuration
+    config.remove_waveform("ec_launchers/beam(4)/phase/angle")
+    assert "ec_launchers/beam(4)/phase/angle" in frozen.dependency_graph
+    assert np.array_equal(frozen.evaluate(times), expected)
+
+
+def test_freeze_piecewise_file(tmp_path):
+    """Check if the memory-mapped data of a piecewise tendency is not copied."""
+    path = tmp_path / "data.npy"
+    np.save(path, np.array([[0.0, 1.0, 3.0], [1.0, 2.0, 0.0]]))
+    waveform = Waveform(waveform=[{"user_type": "piecewise", "user_file": str(path)}])
+    frozen = waveform.freeze()
+    assert frozen.tendencies[0].time is waveform.tendencies[0].time
+    times = np.linspace(0, 3, 7)
+    assert np.array_equal(frozen.get_value(times)[1], waveform.get_value(times)[1])
+
+
+def test_pickle_frozen_tendencies(config):
+    """Check if frozen tendencies can be sent to other processes."""
+    waveform = config["ec_launchers/beam(1)/phase/angle"].freeze()
+    tendencies = pickle.loads(pickle.dumps(waveform.tendencies))
+    frozen = FrozenWaveform.from_tendencies(
+        waveform.name, tendencies, config.globals.dd_version
+    )
+    assert frozen.units == waveform.units
+    times = np.linspace(-1, 25, 1001)
+    assert np.array_equal(frozen.get_value(times)[1], waveform.get_value(times)[1])
+    with pytest.raises(ValueError):
+        frozen.tendencies[7].time[0] = 1
+    with pytest.raises(AttributeError):
+        frozen.tendencies[0].start = 1
+
+
+def test_from_yaml_parallel():
+    """Check if loading waveforms in worker processes gives the same configuration as
+    loading them serially."""
+    yaml_str = """
+    ec_launchers:
+      ec_launchers/beam(1)/phase/angle:
+      - {type: sine, amplitude: 2, frequency: 0.3, duration: 4}
+      - {type: smooth, to: 1, duration: 3}
+      ec_launchers/beam(2)/phase/angle: 3
+      beams:
+        ec_launchers/beam(3)/phase/angle: |
+          "ec_launchers/beam(1)/phase/angle" * 2
+        ec_launchers/beam(4)/phase/angle:
+        - {type: linear, frm: 1, to: 2, duration: 2}
+        - type: repeat
+          duration: 5
+          waveform:
+          - {type: linear, from: 0, to: 1, duration: 1}
+          - {type: smooth, duration: 1}
+    """
+    expected = WaveformConfiguration()
+    expected.load_yaml(yaml_str)
+    frozen = FrozenConfiguration.from_yaml(yaml_str, max_workers=2)
+    assert frozen.waveform_names == expected.waveform_names
+    assert (frozen.start, frozen.end) == (expected.start, expected.end)
+    assert frozen.dependency_graph.graph == expected.dependency_graph.graph
+
+    for name in expected.waveform_names:
+        assert frozen[name].units == expected[name].units
+        assert list(frozen[name].annotations) == list(expected[name].annotations)
+    waveform = frozen["ec_launchers/beam(4)/phase/angle"]
+    assert isinstance(waveform, FrozenWaveform)
+    assert waveform.units == "rad"
+    assert frozen["ec_launchers/beam(3)/phase/angle"].config is frozen
+
+    times = np.linspace(-1, 12, 131)
+    assert np.array_equal(frozen.evaluate(times), expected.evaluate(times))
+    serial = FrozenConfiguration.from_yaml(yaml_str)
+    assert np.array_equal(serial.evaluate(times), expected.evaluate(times))
+
+
+def test_from_yaml_invalid():
+    """Check if loading an invalid configuration raises an error."""
+    yaml_str = """
+    ec_launchers:
+      waveform: 1
+    other:
+      waveform: 2
+    """
+    for max_workers in [None, 2]:
+        with pytest.raises(ValueError):
+            FrozenConfiguration.from_yaml(yaml_str, max_workers=max_workers)
+        with pytest.raises(ValueError):
+            FrozenConfiguration.from_yaml("waveform: 1", max_workers=max_workers)
@@ -0,0 +1,62 @@
+import pytest
+from param.parameterized import Parameters
+
+from waveform_editor.watcher_profiler import UNKNOWN_WAVEFORM, WatcherProfiler
+from waveform_editor.waveform import Waveform
+
+
+@pytest.fixture
+def waveform_list():
+    return [
+        {"user_type": "linear", "user_from": 1, "user_to": 3, "user_duration": 2},
+        {"user_type": "smooth", "user_duration": 1.5},
+        {"user_type": "linear", "user_to": 0, "user_duration": 1},
+    ]
+
+
+def test_profile_waveform(waveform_list):
+    """Test if watcher calls are recorded per waveform."""
+    execute_watcher = Parameters._execute_watcher
+    with WatcherProfiler() as profiler:
+        assert profiler.is_active
+        waveform = Waveform(waveform=waveform_list, name="my_waveform")
+    assert not profiler.is_active
+    assert Parameters._execute_watcher is execute_watcher
+
+    assert profiler.load_counts == {"my_waveform": 1}
+    rows = profiler.statistics("my_waveform")
+    assert rows
+    assert all(row["waveform"] == "my_waveform" for row in rows)
+    assert all(row["count"] > 0 for row in rows)
+    assert "Waveform 'my_waveform'" in profiler.report()
+
+    # Watcher calls of edits are attributed to the waveform of the tendency
+    profiler.reset()
+    with profiler:
+        waveform.tendencies[0].user_to = 5
+    rows = profiler.statistics()
+    assert {row["waveform"] for row in rows} == {"my_waveform"}
+    triggers = {(row["tendency"], row["method"], row["trigger"]) for row in rows}
+    assert ("LinearTendency", "_calc_values", "user_to") in triggers
+    assert (
+        "SmoothTendency",
+        "_trigger1",
+        "prev_tendency.end_value, prev_tendency.end_derivative",
+    ) in triggers
+    smooth = [row for row in rows if row["tendency"] == "SmoothTendency"]
+    assert min(row["max_depth"] for row in smooth) > 1
+
+
+def test_profile_unknown_waveform(waveform_list):
+    """Test if tendencies outside of profiled waveforms are recorded."""
+    waveform = Waveform(waveform=waveform_list)
+    with WatcherProfiler() as profiler:
+        waveform.tendencies[1].user_duration = 3
+    assert {row["waveform"] for row in profiler.statistics()} == {UNKNOWN_WAVEFORM}
+
+
+def test_single_profiler():
+    """Test if only a single profiler can be active."""
+    with WatcherProfiler(), pytest.raises(RuntimeError):
+        WatcherProfiler().start()
+    assert WatcherProfiler().report() == "No watcher calls were recorded."
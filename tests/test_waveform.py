@@ -1,3 +1,5 @@
+from copy import deepcopy
+
 import numpy as np
 import pytest
 
@@ -273,3 +275,197 @@ def test_overlap_derivatives():
     expected = [2, 2, -1.5, -1.5, -1.5, -1.5, -1.5]
     values = waveform.get_derivative(np.linspace(0, 3, 7))
     assert np.allclose(values, expected)
+
+
+def test_get_value_unsorted(waveform):
+    """Test if unsorted time arrays give the same values as sorted time arrays."""
+    times = np.linspace(-1, 15, 161)
+    shuffled = np.random.default_rng(0).permutation(times)
+    _, values = waveform.get_value(times)
+    _, shuffled_values = waveform.get_value(shuffled)
+    assert np.array_equal(shuffled_values, np.interp(shuffled, times, values))
+
+    derivatives = waveform.get_derivative(times)
+    shuffled_derivatives = waveform.get_derivative(shuffled)
+    order = np.argsort(shuffled)
+    assert np.array_equal(shuffled_derivatives[order], derivatives)
+
+
+def test_get_value_and_derivative():
+    """Test if values and derivatives evaluated together are equal to the values and
+    derivatives evaluated separately."""
+    waveform = Waveform(
+        waveform=[
+            {"user_type": "piecewise", "user_time": [0, 1, 3], "user_value": [1, 3, 2]},
+            {"user_type": "linear", "user_start": 4, "user_to": 8, "user_duration": 2},
+            {"user_type": "smooth", "user_to": 0, "user_duration": 2},
+            {
+                "user_type": "repeat",
+                "user_duration": 3,
+                "user_waveform": [
+                    {"user_type": "linear", "user_from": 0, "user_to": 1},
+                    {"user_type": "sine", "user_duration": 1},
+                ],
+            },
+        ]
+    )
+    times = np.linspace(-1, 12, 261)
+    for time in (times, np.random.default_rng(0).permutation(times)):
+        values, derivatives = waveform.get_value_and_derivative(time)
+        assert np.array_equal(values, waveform.get_value(time)[1])
+        assert np.array_equal(derivatives, waveform.get_derivative(time))
+
+    value, derivative = waveform.get_value_and_derivative(np.float64(2.5))
+    assert value == waveform.value_at(2.5)
+    assert derivative == -0.5
+
+
+def test_breakpoints_update(waveform):
+    """Test if cached breakpoints are updated when the tendency timing changes."""
+    _, values = waveform.get_value(np.array([15.0]))
+    assert np.allclose(values, [0])
+    waveform.tendencies[-1].user_duration = 4
+    _, values = waveform.get_value(np.array([15.0]))
+    assert np.allclose(values, [1.25])
+
+
+@pytest.mark.parametrize(
+    "waveform_list",
+    [
+        [
+            {"user_type": "linear", "user_from": 1, "user_to": 3, "user_end": 2},
+            {"user_type": "smooth", "user_to": 5, "user_start": 4, "user_end": 6},
+            {"user_type": "sine", "user_amplitude": 2, "user_phase": 1},
+            {"user_type": "square", "user_frequency": 0.3, "user_duration": 4},
+            {"user_type": "triangle", "user_frequency": 0.9, "user_duration": 4},
+            {"user_type": "sawtooth", "user_frequency": 1.3, "user_duration": 4},
+            {
+                "user_type": "piecewise",
+                "user_time": [20, 21, 23],
+                "user_value": [1, 4, 2],
+            },
+            {
+                "user_type": "repeat",
+                "user_duration": 7,
+                "user_waveform": [
+                    {"type": "linear", "from": 0, "to": 1, "duration": 1},
+                    {"type": "smooth", "to": 0, "duration": 1},
+                ],
+            },
+            {"user_type": "constant", "user_value": 3},
+        ],
+        # Overlapping tendencies
+        [
+            {"user_type": "linear", "user_from": 1, "user_to": 3, "user_end": 4},
+            {"user_type": "linear", "user_from": 5, "user_start": 3, "user_end": 5},
+        ],
+    ],
+)
+def test_value_at(waveform_list):
+    """Test if value_at gives the same values as get_value."""
+    waveform = Waveform(waveform=waveform_list)
+    times = np.concatenate([np.linspace(-1, 33, 681), [2, 4, 6, 20, 21, np.nan]])
+    for time in times:
+        _, expected = waveform.get_value(np.array([time]))
+        assert waveform.value_at(time) == expected[0]
+
+
+def _tendency_state(tendency):
+    values = tendency.param.values()
+    for name in ("name", "prev_tendency", "next_tendency", "annotations"):
+        values.pop(name)
+    return values, list(tendency.annotations)
+
+
+def _link_one_by_one(waveform_list):
+    """Create a waveform whose tendencies are linked one by one."""
+    linked = Waveform()
+    linked.tendencies = [linked._handle_tendency(deepcopy(e)) for e in waveform_list]
+    linked.tendencies = [tendency for tendency in linked.tendencies if tendency]
+    linked._link_tendencies()
+    for tendency in linked.tendencies:
+        linked._watch(tendency)
+    linked.update_annotations()
+    return linked
+
+
+def test_batch_resolve():
+    """Test if tendencies resolved in batch equal tendencies which are linked one by
+    one, also after editing one of them."""
+    waveform_list = [
+        {"user_type": "linear", "user_to": 3, "user_rate": 1, "user_end": 2},
+        {"user_type": "smooth", "user_duration": 2},
+        {"user_type": "linear", "user_to": 2, "user_duration": 1},
+        {"user_type": "sine", "user_amplitude": 2, "user_start": 6, "user_end": 7},
+        {"user_type": "smooth", "user_start": 6.5},
+        {"user_type": "constant", "user_duration": 1},
+        {"user_type": "linear", "user_from": 1, "user_rate": 2},
+        {"user_type": "square", "user_frequency": 0.5, "user_period": 1},
+        {
+            "user_type": "repeat",
+            "user_duration": 3,
+            "user_waveform": [
+                {"type": "linear", "from": 0, "to": 1, "duration": 1},
+                {"type": "smooth", "duration": 1},
+            ],
+        },
+        {"user_type": "smooth", "user_to": 0, "user_duration": 1},
+    ]
+    linked = _link_one_by_one(waveform_list)
+    waveform = Waveform(waveform=waveform_list)
+    assert waveform.annotations
+
+    for _ in range(2):
+        for tendency, expected in zip(
+            waveform.tendencies, linked.tendencies, strict=True
+        ):
+            assert _tendency_state(tendency) == _tendency_state(expected)
+        time = np.linspace(0, 25, 101)
+        assert np.array_equal(
+            waveform.get_value(time)[1], linked.get_value(time)[1], equal_nan=True
+        )
+
+        # Edits are propagated to the neighbouring tendencies
+        waveform.tendencies[2].user_duration = 3
+        linked.tendencies[2].user_duration = 3
+
+
+def test_batch_resolve_random():
+    """Test if tendencies resolved in batch equal tendencies which are linked one by
+    one, annotations included, for random waveforms with invalid durations."""
+    rng = np.random.default_rng(0)
+    types = ["linear", "smooth", "constant", "sine", "square", "sawtooth"]
+    time = np.linspace(-1, 25, 261)
+    for _ in range(100):
+        waveform_list = []
+        for _ in range(rng.integers(1, 7)):
+            entry = {"user_type": str(rng.choice(types))}
+            for key in ("user_from", "user_to"):
+                if entry["user_type"] in ("linear", "smooth") and rng.random() < 0.5:
+                    entry[key] = int(rng.integers(-3, 5))
+            choice = rng.random()
+            if choice < 0.5:
+                entry["user_duration"] = float(rng.choice([0.5, 1, 2]))
+            elif choice < 0.7:
+                entry["user_duration"] = float(rng.choice([-2, -1, 0]))
+            elif choice < 0.85:
+                entry["user_end"] = int(rng.integers(0, 10))
+            else:
+                entry["user_start"] = int(rng.integers(0, 6))
+                entry["user_end"] = int(rng.integers(0, 6))
+            waveform_list.append(entry)
+
+        linked = _link_one_by_one(waveform_list)
+        waveform = Waveform(waveform=deepcopy(waveform_list))
+        for _ in range(2):
+            assert waveform.annotations == linked.annotations
+            for tendency, expected in zip(
+                waveform.tendencies, linked.tendencies, strict=True
+            ):
+                assert _tendency_state(tendency) == _tendency_state(expected)
+            assert np.array_equal(
+                waveform.get_value(time)[1], linked.get_value(time)[1], equal_nan=True
+            )
+            # Edits are propagated in the same way
+            waveform.tendencies[0].user_duration = 3
+            linked.tendencies[0].user_duration = 3
@@ -1,3 +1,7 @@
+import random
+from textwrap import dedent
+
+import numpy as np
 import pytest
 from pytest import approx
 
@@ -11,7 +15,11 @@ from waveform_editor.tendencies.periodic.square_wave import SquareWaveTendency
 from waveform_editor.tendencies.periodic.triangle_wave import TriangleWaveTendency
 from waveform_editor.tendencies.smooth import SmoothTendency
 from waveform_editor.waveform import Waveform
-from waveform_editor.yaml_parser import YamlParser
+from waveform_editor.yaml_parser import (
+    LineNumberYamlLoader,
+    WaveformYamlLoader,
+    YamlParser,
+)
 
 
 @pytest.fixture
@@ -130,6 +138,19 @@ def test_scientific_notation(yaml_parser):
         assert waveform.tendencies[0].to == expected_value
 
 
+def test_loader_resolvers(yaml_parser):
+    """Test if parsing waveforms does not add implicit resolvers to the loaders."""
+    loaders = {LineNumberYamlLoader, WaveformYamlLoader}
+    sizes = {
+        loader: sum(map(len, loader.yaml_implicit_resolvers.values()))
+        for loader in loaders
+    }
+    for _ in range(10):
+        yaml_parser.parse_waveform("waveform:\n- {type: linear, to: 1.5e5}")
+    for loader in loaders:
+        assert sum(map(len, loader.yaml_implicit_resolvers.values())) == sizes[loader]
+
+
 def test_constant_shorthand_notation(yaml_parser):
     """Test if shorthand notation is parsed correctly."""
 
@@ -144,6 +165,146 @@ def test_constant_shorthand_notation(yaml_parser):
         assert not yaml_parser.parse_errors
 
 
+def test_parse_waveform_incremental(yaml_parser):
+    """Test that only the changed tendencies are created again when reparsing."""
+    entries = [
+        "{type: linear, from: 0, to: 1, duration: 2}",
+        "{type: smooth, to: 3, duration: 1}",
+        "{type: constant, duration: 2}",
+        "{type: sine, amplitude: 2, frequency: 1, duration: 2}",
+        "{type: linear, to: 0}",
+    ]
+
+    def parse(entries, previous=None):
+        yaml_str = "waveform:\n" + "".join(f"- {entry}\n" for entry in entries)
+        return yaml_parser.parse_waveform(yaml_str, previous=previous)
+
+    def assert_equivalent(waveform, expected):
+        time = np.linspace(-1, 10, 1001)
+        assert waveform.get_value(time)[1] == approx(expected.get_value(time)[1])
+        prev_tendency = None
+        for tendency, expected_tendency in zip(
+            waveform.tendencies, expected.tendencies, strict=True
+        ):
+            assert tendency.prev_tendency is prev_tendency
+            prev_tendency = tendency
+            assert tendency.start == expected_tendency.start
+            assert tendency.end == expected_tendency.end
+            assert tendency.line_number == expected_tendency.line_number
+
+    previous = parse(entries)
+    old_tendencies = list(previous.tendencies)
+
+    # Change a single entry
+    entries[2] = "{type: constant, duration: 1.5}"
+    waveform = parse(entries, previous)
+    assert waveform.tendencies[:2] == old_tendencies[:2]
+    assert waveform.tendencies[2] is not old_tendencies[2]
+    assert waveform.tendencies[3:] == old_tendencies[3:]
+    assert_equivalent(waveform, parse(entries))
+
+    # Insert an entry, the line numbers of the later tendencies are updated
+    previous = waveform
+    entries.insert(1, "{type: constant, value: 1, duration: 0.5}")
+    waveform = parse(entries, previous)
+    assert waveform.tendencies[0] is previous.tendencies[0]
+    assert waveform.tendencies[2:] == previous.tendencies[1:]
+    assert_equivalent(waveform, parse(entries))
+
+    # Discard a version with errors, and restore the previous version
+    previous = waveform
+    expected = parse(entries)
+    waveform = parse([*entries, "{type: linear, start: 0, duration: 1}"], previous)
+    assert waveform.annotations
+    waveform.restore_previous()
+    assert not previous.annotations
+    assert_equivalent(previous, expected)
+
+
+def _waveform_state(waveform):
+    """Return the parameters and annotations of all tendencies, and the values of a
+    waveform, such that they can be compared."""
+    tendencies = []
+    for tendency in waveform.tendencies:
+        values = tendency.param.values()
+        for name in ("name", "prev_tendency", "next_tendency", "annotations"):
+            values.pop(name)
+        values.pop("user_waveform", None)
+        values = {
+            name: value.tolist() if isinstance(value, np.ndarray) else value
+            for name, value in values.items()
+            if name != "spline"
+        }
+        tendencies.append((values, list(tendency.annotations)))
+    time = np.linspace(-1, 20, 211)
+    return tendencies, list(waveform.annotations), waveform.get_value(time)[1].tolist()
+
+
+def _random_entry(rng):
+    tendency_type = rng.choice(["linear", "smooth", "constant", "sine", "square"])
+    keys = {}
+    if tendency_type in ("linear", "smooth"):
+        for key in ("from", "to"):
+            if rng.random() < 0.5:
+                keys[key] = rng.randint(-3, 5)
+    elif tendency_type == "constant" and rng.random() < 0.5:
+        keys["value"] = rng.randint(-3, 5)
+    elif tendency_type in ("sine", "square"):
+        keys["frequency"] = rng.choice([0.5, 1, 2])
+    choice = rng.random()
+    if choice < 0.6:
+        keys["duration"] = rng.choice([0.5, 1, 2, 3])
+    elif choice < 0.75:
+        keys["end"] = rng.randint(0, 12)
+    elif choice < 0.9:
+        keys["start"] = rng.randint(0, 8)
+        keys["duration"] = rng.choice([-1, 1, 2])
+    items = "".join(f", {key}: {value}" for key, value in keys.items())
+    return f"{{type: {tendency_type}{items}}}"
+
+
+def test_parse_waveform_incremental_random(yaml_parser):
+    """Test that reparsing incrementally gives the same waveform as parsing it from
+    scratch, and that the previous waveform is restored exactly."""
+
+    def parse(entries, previous=None):
+        yaml_str = "waveform:\n" + "".join(f"- {entry}\n" for entry in entries)
+        return yaml_parser.parse_waveform(yaml_str, previous=previous)
+
+    rng = random.Random(0)
+    cases = [
+        (
+            [
+                "{type: linear, duration: 3, to: 2}",
+                "{type: smooth, to: 5}",
+                "{type: linear, to: 0}",
+                "{type: smooth, to: 5}",
+                "{type: square, frequency: 1}",
+            ],
+            (1, "{type: smooth, from: 2, duration: 2}"),
+        )
+    ]
+    for _ in range(60):
+        entries = [_random_entry(rng) for _ in range(rng.randint(1, 6))]
+        edit = (rng.randint(0, len(entries)), _random_entry(rng))
+        cases.append((entries, edit))
+
+    for i, (entries, (index, entry)) in enumerate(cases):
+        new_entries = list(entries)
+        if i % 3 == 2 and index < len(entries):
+            del new_entries[index]
+        elif i % 3 == 1 and index < len(entries):
+            new_entries[index] = entry
+        else:
+            new_entries.insert(index, entry)
+        previous = parse(entries)
+        expected_previous = _waveform_state(previous)
+        waveform = parse(new_entries, previous)
+        assert _waveform_state(waveform) == _waveform_state(parse(new_entries))
+        waveform.restore_previous()
+        assert _waveform_state(previous) == expected_previous
+
+
 def test_load_yaml(config):
     """Test if yaml is loaded correctly."""
     yaml_str = """
@@ -185,6 +346,76 @@ def test_load_yaml(config):
         root_group["beams"]["asdf/asdf"]
 
 
+def test_load_yaml_line_numbers(config):
+    """Test if loaded waveforms have the same tendencies and line numbers as waveforms
+    parsed from their YAML string."""
+    yaml_str = """
+    group:
+      waveform:
+      # A comment before the first tendency
+      - {to: 8.33e5, duration: 20} # implicit linear ramp
+      - type: repeat
+        duration: 10
+        waveform:
+        - {type: linear, from: 0, to: 1, duration: 1}
+        - type: smooth
+          duration: 1
+      - {type: sine, duration: 1, unknown: 3}
+      derived: |
+        "waveform" * 2
+    """
+    config.load_yaml(yaml_str)
+    waveform = config["waveform"]
+    assert config["derived"].yaml == '"waveform" * 2\n'
+    assert [tendency.line_number for tendency in waveform.tendencies] == [2, 3, 9]
+    repeated = waveform.tendencies[1].waveform.tendencies
+    assert [tendency.line_number for tendency in repeated] == [6, 7]
+    assert [annotation["row"] for annotation in waveform.annotations] == [8]
+
+    parsed = config.parse_waveform(f"waveform:\n{waveform.get_yaml_string()}")
+    assert parsed.annotations == waveform.annotations
+    assert waveform.get_yaml_string() == parsed.get_yaml_string()
+    for tendency, expected in zip(waveform.tendencies, parsed.tendencies, strict=True):
+        assert type(tendency) is type(expected)
+        assert tendency.line_number == expected.line_number
+        assert (tendency.start, tendency.end) == (expected.start, expected.end)
+        assert tendency.end_value == expected.end_value
+
+
+def test_load_yaml_reparse_scalars(config):
+    """Test if loaded waveforms have the same values and annotations as waveforms
+    parsed again from their YAML string, also for scalars which differ between YAML
+    1.1 and YAML 1.2."""
+    yaml_str = """
+    group:
+      sine:
+      - {type: sine, phase: yes, frequency: 017, duration: 1e1}
+      - {type: linear, to: 0o17, duration: 1:30}
+      - {type: square, amplitude: 0x1F, base: 1_000, duration: .5}
+      constant:
+      - {type: constant, value: on, duration: 08}
+      - {type: smooth, to: -1E+5, duration: 1.}
+    """
+    with open("tests/test_yaml/example.yaml") as file:
+        yaml_str = dedent(yaml_str) + file.read()
+    config.load_yaml(yaml_str)
+    assert not config.load_error
+    sine = config["sine"].tendencies
+    assert sine[0].frequency == 17
+    assert sine[0].annotations
+    assert sine[1].to == 15
+    assert config["constant"].tendencies[0].duration == 8
+
+    time = np.linspace(-1, 200, 1001)
+    for name in config.waveform_names:
+        waveform = config[name]
+        if not isinstance(waveform, Waveform):
+            continue
+        parsed = config.parse_waveform(f"{name}:\n{waveform.get_yaml_string()}")
+        assert parsed.annotations == waveform.annotations
+        assert np.array_equal(parsed.get_value(time)[1], waveform.get_value(time)[1])
+
+
 def test_load_yaml_globals_full(yaml_parser, config):
     yaml_str = """
     globals:
@@ -31,14 +31,15 @@ class Annotations(UserList):
         # The key of the kv-pair is removed in the editor, so we account for this
         if line_number > 0:
             line_number -= 1
-        self.append(
-            {
-                "row": line_number,
-                "column": 0,
-                "text": error_msg,
-                "type": error_type,
-            }
-        )
+        annotation = {
+            "row": line_number,
+            "column": 0,
+            "text": error_msg,
+            "type": error_type,
+        }
+        # Tendencies may validate their inputs multiple times, report each issue once
+        if annotation not in self:
+            self.append(annotation)
 
     def add_yaml_error(self, error):
         """Add a YAML parsing error to the annotations.
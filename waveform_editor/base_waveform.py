@@ -7,16 +7,15 @@ from ruamel.yaml import YAML
 
 from waveform_editor.annotations import Annotations
 
+# Default number of time points per chunk when evaluating waveforms in chunks
+CHUNK_SIZE = 100_000
 
-class BaseWaveform(ABC):
-    def __init__(self, yaml_str, name, dd_version):
-        yaml_dict = YAML().load(yaml_str)
-        self.yaml = yaml_dict[name] if yaml_dict else None
-        self.tendencies = []
-        self.name = name
-        self.metadata = self.get_metadata(dd_version)
-        self.annotations = Annotations()
-        self.units = self.metadata.units if self.metadata else "a.u."
+
+class Evaluable(ABC):
+    """Interface of the waveforms which can be evaluated, which is shared by the
+    editable waveforms and their frozen snapshots in :mod:`waveform_editor.frozen`."""
+
+    __slots__ = ()
 
     @abstractmethod
     def get_value(
@@ -24,6 +23,73 @@ class BaseWaveform(ABC):
     ) -> tuple[np.ndarray, np.ndarray]:
         raise NotImplementedError
 
+
+class DerivedEvaluable(Evaluable):
+    """Evaluable waveform whose values are derived from the other waveforms of its
+    configuration, which are listed in its ``dependencies``."""
+
+    __slots__ = ()
+
+
+class BaseWaveform(Evaluable):
+    def __init__(self, yaml_str, name, dd_version, yaml_node=None):
+        if yaml_node is None and yaml_str:
+            yaml_dict = YAML().load(yaml_str)
+            yaml_node = yaml_dict[name] if yaml_dict else None
+        self.yaml = yaml_node
+        self.tendencies = []
+        self.name = name
+        self.metadata = self.get_metadata(dd_version)
+        self.annotations = Annotations()
+        self.units = self.metadata.units if self.metadata else "a.u."
+
+    def has_values(self) -> bool:
+        """Whether the waveform has any values to export.
+
+        Returns:
+            True, unless the waveform has no values.
+        """
+        return True
+
+    def value_at(self, time: float) -> float:
+        """Get the value of the waveform at a single time point.
+
+        Args:
+            time: The time point at which to evaluate the waveform.
+
+        Returns:
+            The value of the waveform.
+        """
+        return float(self.get_value(np.array([time]))[1][0])
+
+    def fill_values(self, time: np.ndarray, out: np.ndarray) -> None:
+        """Evaluate the waveform at a sorted time array and store the values in a
+        preallocated output array.
+
+        Args:
+            time: The time array on which to generate points, in increasing order.
+            out: Array with the same length as the time array to store the values in.
+        """
+        out[:] = self.get_value(time)[1]
+
+    def iter_values(self, times: np.ndarray, chunk_size: int = CHUNK_SIZE):
+        """Evaluate the waveform in contiguous chunks of a time array.
+
+        Only the values of a single chunk are kept in memory at any time, which allows
+        evaluating waveforms on very large time arrays.
+
+        Args:
+            times: The time array on which to evaluate the waveform.
+            chunk_size: Maximum number of time points per chunk.
+
+        Yields:
+            Tuples containing a chunk of the time array and the waveform values on it.
+        """
+        time = np.asarray(times, dtype=float)
+        for start in range(0, len(time), chunk_size):
+            chunk = time[start : start + chunk_size]
+            yield chunk, self.get_value(chunk)[1]
+
     @abstractmethod
     def get_yaml_string(self) -> str:
         raise NotImplementedError
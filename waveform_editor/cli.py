@@ -7,8 +7,8 @@ import numpy as np
 from rich import console, traceback
 
 import waveform_editor
-from waveform_editor.configuration import WaveformConfiguration
 from waveform_editor.exporter import ConfigurationExporter
+from waveform_editor.frozen import FrozenConfiguration
 from waveform_editor.util import times_from_csv
 
 logger = logging.getLogger(__name__)
@@ -27,7 +27,19 @@ def _excepthook(type_, value, tb):
 @click.group("waveform-editor", invoke_without_command=True, no_args_is_help=True)
 @click.option("--version", is_flag=True, help="Show version information")
 @click.option("-v", "--verbose", count=True, help="Show verbose output")
-def cli(version, verbose):
+@click.option(
+    "--profile-watchers",
+    is_flag=True,
+    help="Report the param watcher calls of the tendencies of every waveform",
+)
+@click.option(
+    "-j",
+    "--workers",
+    type=click.IntRange(min=1),
+    help="Load the waveforms in parallel, using this many worker processes",
+)
+@click.pass_context
+def cli(ctx, version, verbose, profile_watchers, workers):
     """The Waveform Editor command line interface.
 
     Please use one of the available commands listed below. You can get help for each
@@ -50,6 +62,18 @@ def cli(version, verbose):
     if version:
         print_version()
 
+    if profile_watchers:
+        from waveform_editor.watcher_profiler import WatcherProfiler
+
+        profiler = WatcherProfiler()
+        profiler.start()
+
+        def report():
+            profiler.stop()
+            click.echo(profiler.report(limit=None), err=True)
+
+        ctx.call_on_close(report)
+
 
 def print_version():
     """Print version information of the waveform editor."""
@@ -221,7 +245,7 @@ def actor():
 
 
 def create_exporter(yaml, csv, linspace):
-    """Read a YAML file from disk, load it into a WaveformConfiguration and create a
+    """Read a YAML file from disk, load it into a FrozenConfiguration and create a
     ConfigurationExporter using the given times.
 
     Args:
@@ -244,38 +268,46 @@ def create_exporter(yaml, csv, linspace):
     else:
         times = None
 
-    config = WaveformConfiguration()
-    load_config(config, Path(yaml))
+    workers = click.get_current_context().find_root().params.get("workers")
+    config = load_config(Path(yaml), workers)
     exporter = ConfigurationExporter(config, times)
     return exporter
 
 
-def load_config(config: WaveformConfiguration, filepath: Path) -> None:
-    """Load the YAML file from disk with the provided configuration.
+def load_config(filepath: Path, max_workers: int | None = None) -> FrozenConfiguration:
+    """Load the YAML file from disk into a frozen configuration. The waveforms are
+    only evaluated, so they don't need to track any changes.
 
     Args:
-        config: configuration to load the file with
         filepath: Path to the yaml file
+        max_workers: Number of worker processes to load the waveforms with, or None
+            to load them in this process. See
+            :meth:`~waveform_editor.frozen.FrozenConfiguration.from_yaml`.
+
+    Returns:
+        The loaded configuration.
     """
     if not filepath.is_file():
         raise ValueError(f"Cannot find waveform configuration file '{filepath}'")
     logging.debug("Loading waveform configuration from %s", filepath)
 
-    config.clear()
-    config.load_yaml(filepath)
-
-    if config.load_error:  # Set when the YAML could not be parsed
-        raise RuntimeError(f"Could not load waveforms: {config.load_error}")
+    try:
+        config = FrozenConfiguration.from_yaml(
+            filepath, max_workers, base_path=filepath.parent
+        )
+    except ValueError as e:  # Raised when the YAML could not be parsed
+        raise RuntimeError(f"Could not load waveforms: {e}") from e
 
     # Warn for any waveform with issues
-    for name, group in config.waveform_map.items():
-        waveform = group[name]
+    for name in config.waveform_names:
+        waveform = config[name]
         if waveform.annotations:
             details = "\n".join(
                 "- " + item["text"].replace("\n", "\n  ").strip()
                 for item in waveform.annotations
             )
             logger.warning("Found issues with waveform '%s':\n%s", name, details)
+    return config
 
 
 if __name__ == "__main__":
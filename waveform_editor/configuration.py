@@ -1,12 +1,22 @@
 import io
 import logging
+from contextlib import contextmanager
 
+import numpy as np
 import param
 from ruamel.yaml import YAML
 from ruamel.yaml.comments import CommentedMap
 
+from waveform_editor.base_waveform import CHUNK_SIZE, DerivedEvaluable
 from waveform_editor.dependency_graph import DependencyGraph
 from waveform_editor.derived_waveform import DerivedWaveform
+from waveform_editor.evaluation import (
+    PARALLEL_MIN_SAMPLES,
+    EvaluationSession,
+    activate_session,
+    get_active_session,
+    run_concurrently,
+)
 from waveform_editor.group import WaveformGroup
 from waveform_editor.yaml_globals import YamlGlobals
 from waveform_editor.yaml_parser import YamlParser
@@ -28,6 +38,8 @@ class WaveformConfiguration(param.Parameterized):
         self.waveform_map = {}
         self.globals = YamlGlobals()
         self.load_error = ""
+        # Directory against which relative paths of data files are resolved
+        self.base_path = None
         self.parser = YamlParser(self)
         self.dependency_graph = DependencyGraph()
         self.start = self.DEFAULT_START
@@ -56,13 +68,50 @@ class WaveformConfiguration(param.Parameterized):
             return self.groups[key]
         raise KeyError(f"{key!r} not found in waveforms/groups")
 
-    def load_yaml(self, yaml_str):
-        """Parses a YAML string and populates configuration.
+    @property
+    def waveform_names(self):
+        """List with the names of all waveforms, in the order in which they were
+        added to the configuration."""
+        return list(self.waveform_map)
+
+    def _evaluation_levels(self, names):
+        """Group waveforms, and all waveforms they depend on, into levels for their
+        evaluation, see :meth:`DependencyGraph.levels_for`. Dependencies which are not
+        waveforms of this configuration are skipped.
+
+        Args:
+            names: Names of the waveforms to evaluate.
+
+        Returns:
+            List of levels, where each level is a list of waveform names.
+        """
+        return self.dependency_graph.levels_for(names, known=self.waveform_map)
+
+    def _get_waveform(self, name):
+        """Retrieves a waveform by name. Unlike :meth:`__getitem__`, this raises a
+        KeyError for the names of groups.
+
+        Args:
+            name: The name of the waveform to retrieve.
+
+        Returns:
+            The requested waveform.
+        """
+        return self.waveform_map[name][name]
+
+    def load_yaml(self, yaml_str, base_path=None):
+        """Parses a YAML string and populates configuration. To load a configuration
+        which is only evaluated, see
+        :meth:`~waveform_editor.frozen.FrozenConfiguration.from_yaml`.
 
         Args:
             yaml_str: The YAML string to load YAML for.
+            base_path: Directory of the YAML file. Relative paths of data files are
+                resolved against this directory, or against the current working
+                directory if it is not provided.
         """
         self.clear()
+        self.base_path = base_path
         try:
             self.parser.load_yaml(yaml_str)
             self._calculate_bounds()
@@ -83,6 +132,56 @@ class WaveformConfiguration(param.Parameterized):
             waveform: The waveform object to add.
             path: A list representing the path where the new waveform should be created.
         """
+        group = self._get_target_group(waveform, path)
+        if isinstance(waveform, DerivedWaveform):
+            self.dependency_graph.add_node(waveform.name, waveform.dependencies)
+        group.waveforms[waveform.name] = waveform
+        self.waveform_map[waveform.name] = group
+        self._calculate_bounds()
+        self.has_changed = True
+
+    def add_waveforms(self, waveforms):
+        """Adds multiple waveforms to the configuration at once.
+
+        Contrary to calling :meth:`add_waveform` for every waveform, the bounds of the
+        configuration are only calculated once, and the dependencies of all derived
+        waveforms are checked for cycles in a single pass over the dependency graph.
+        If any of the waveforms can't be added, none of them are added.
+
+        Args:
+            waveforms: Iterable of tuples containing the waveform object to add, and
+                the path of the group to add it to.
+        """
+        added = []
+        dependencies = {}
+        try:
+            for waveform, path in waveforms:
+                group = self._get_target_group(waveform, path)
+                group.waveforms[waveform.name] = waveform
+                self.waveform_map[waveform.name] = group
+                added.append(waveform.name)
+                if isinstance(waveform, DerivedWaveform):
+                    dependencies[waveform.name] = waveform.dependencies
+            self.dependency_graph.add_nodes(dependencies)
+        except Exception:
+            for name in added:
+                del self.waveform_map.pop(name).waveforms[name]
+            raise
+        if added:
+            self._calculate_bounds()
+            self.has_changed = True
+
+    def _get_target_group(self, waveform, path):
+        """Find the group to add a waveform to, and check that the waveform can be
+        added to it.
+
+        Args:
+            waveform: The waveform object to add.
+            path: A list representing the path of the group.
+
+        Returns:
+            The group to add the waveform to.
+        """
         self._validate_name(waveform.name)
         if not path:
             raise ValueError("Waveforms must be added at a specific group path.")
@@ -92,13 +191,7 @@ class WaveformConfiguration(param.Parameterized):
             raise ValueError(
                 f"The group {group.name!r} already contains {waveform.name!r}."
             )
-
-        if isinstance(waveform, DerivedWaveform):
-            self.dependency_graph.add_node(waveform.name, waveform.dependencies)
-        group.waveforms[waveform.name] = waveform
-        self.waveform_map[waveform.name] = group
-        self._calculate_bounds()
-        self.has_changed = True
+        return group
 
     def rename_waveform(self, old_name, new_name):
         """Renames an existing waveform.
@@ -303,17 +396,223 @@ class WaveformConfiguration(param.Parameterized):
         yaml.dump(data, stream)
         return stream.getvalue()
 
-    def parse_waveform(self, yaml_str):
+    def evaluate(
+        self, times, names=None, dtype=float, max_workers=None, optimize=False
+    ):
+        """Evaluate multiple waveforms on a shared time array.
+
+        The time array is validated (and sorted, if required) only once, after which
+        all waveforms are evaluated directly into a single preallocated array. Derived
+        waveforms are evaluated in the order of the dependency graph, see
+        :meth:`EvaluationSession.evaluate_all
+        <waveform_editor.evaluation.EvaluationSession.evaluate_all>`. For large time
+        arrays, independent waveforms are evaluated concurrently.
+
+        Args:
+            times: The time array on which to evaluate the waveforms.
+            names: Names of the waveforms to evaluate. Defaults to all waveforms in the
+                configuration, in the order of :attr:`waveform_names`.
+            dtype: Data type of the returned array.
+            max_workers: Maximum number of threads used for the evaluation. Set to 1
+                to evaluate all waveforms in the calling thread.
+            optimize: Whether to fold constants and evaluate common subexpressions of
+                the derived waveforms only once. This gives the same results, but is
+                faster for configurations where derived waveforms share
+                subexpressions.
+
+        Returns:
+            Array of shape ``(len(names), len(times))``, where row ``i`` contains the
+            values of waveform ``names[i]``.
+        """
+        names = self.waveform_names if names is None else list(names)
+        time = np.asarray(times, dtype=float)
+        if time.ndim != 1:
+            raise ValueError("Time array must be one-dimensional.")
+
+        order = None
+        if not np.all(time[1:] >= time[:-1]):
+            order = np.argsort(time, kind="stable")
+            time = time[order]
+
+        if len(time) == 1:
+            return self.values_at(time[0], names).astype(dtype).reshape(-1, 1)
+
+        values = np.empty((len(names), len(time)), dtype=dtype)
+        if len(time) < PARALLEL_MIN_SAMPLES:
+            max_workers = 1
+        # Only share the rows with derived waveforms if they are stored at full
+        # precision
+        share_rows = values.dtype == np.float64
+        with self.evaluation_session() as session:
+            regular_rows = []
+            derived_rows = []
+            for name, row in zip(names, values, strict=True):
+                waveform = self._get_waveform(name)
+                cached = session.lookup(name, time)
+                if cached is not None:
+                    row[:] = cached
+                elif isinstance(waveform, DerivedWaveform):
+                    derived_rows.append((name, row))
+                else:
+                    regular_rows.append((waveform, row))
+
+            def fill_row(item):
+                waveform, row = item
+                waveform.fill_values(time, row)
+
+            run_concurrently(fill_row, regular_rows, max_workers)
+            if share_rows:
+                for waveform, row in regular_rows:
+                    session.store(waveform.name, time, row)
+
+            session.evaluate_all(
+                [name for name, _ in derived_rows], time, max_workers, optimize
+            )
+            for name, row in derived_rows:
+                row[:] = session.get_value(name, time)
+            if order is not None:
+                # The sorted time array is local, so its cached values can't be reused
+                session.discard(time)
+
+        if order is not None:
+            sorted_values = values
+            values = np.empty_like(sorted_values)
+            values[:, order] = sorted_values
+        return values
+
+    def values_at(self, time, names=None):
+        """Evaluate multiple waveforms at a single time point.
+
+        Every waveform is evaluated with its scalar ``value_at`` implementation, which
+        avoids the overhead of array operations when sampling waveforms one time point
+        at a time (for example, in a coupled simulation). Derived waveforms are
+        evaluated level by level, from the values of their dependencies.
+
+        Args:
+            time: The time point at which to evaluate the waveforms.
+            names: Names of the waveforms to evaluate. Defaults to all waveforms in the
+                configuration, in the order of :attr:`waveform_names`.
+
+        Returns:
+            Array containing the value of waveform ``names[i]`` at index ``i``.
+        """
+        names = self.waveform_names if names is None else list(names)
+        time = float(time)
+        values = {}
+        levels = self._evaluation_levels(names)
+        # The first level contains the waveforms which are not in the dependency graph
+        for name in levels[0]:
+            values[name] = self._get_waveform(name).value_at(time)
+        for level in levels[1:]:
+            for name in level:
+                waveform = self._get_waveform(name)
+                values[name] = waveform.evaluate_at(
+                    {dep: values[dep] for dep in waveform.dependencies}
+                )
+        return np.array([values[name] for name in names], dtype=float)
+
+    def iter_evaluate(
+        self,
+        times,
+        names=None,
+        chunk_size=CHUNK_SIZE,
+        dtype=float,
+        max_workers=None,
+        optimize=False,
+    ):
+        """Evaluate multiple waveforms in contiguous chunks of a shared time array.
+
+        Every chunk is evaluated with :meth:`evaluate`, after which its values are
+        removed from the evaluation session. Memory usage therefore depends on the
+        chunk size instead of on the length of the time array.
+
+        Args:
+            times: The time array on which to evaluate the waveforms.
+            names: Names of the waveforms to evaluate. Defaults to all waveforms in the
+                configuration, in the order of :attr:`waveform_names`.
+            chunk_size: Maximum number of time points per chunk.
+            dtype: Data type of the returned arrays.
+            max_workers: Maximum number of threads used for the evaluation.
+            optimize: Whether to optimize the expressions of derived waveforms, see
+                :meth:`evaluate`.
+
+        Yields:
+            Tuples containing a chunk of the time array, and an array of shape
+            ``(len(names), len(chunk))`` with the values of the waveforms on it.
+        """
+        names = self.waveform_names if names is None else list(names)
+        time = np.asarray(times, dtype=float)
+        if time.ndim != 1:
+            raise ValueError("Time array must be one-dimensional.")
+        for start in range(0, len(time), chunk_size):
+            chunk = time[start : start + chunk_size]
+            with self.evaluation_session() as session:
+                values = self.evaluate(chunk, names, dtype, max_workers, optimize)
+                session.discard(chunk)
+            yield chunk, values
+
+    @contextmanager
+    def evaluation_session(self):
+        """Context manager which caches waveform values for the duration of a single
+        export or plot request. Nested calls reuse the already active session.
+
+        The session is only active in the current thread (or :mod:`contextvars`
+        context), and in the thread pools which evaluate the waveforms for it.
+
+        Example:
+
+            .. code-block:: python
+
+                with config.evaluation_session() as session:
+                    values = config.evaluate(times)
+                print(session.statistics())
+
+        Yields:
+            The active :class:`~waveform_editor.evaluation.EvaluationSession`.
+        """
+        session = self.session
+        if session is not None:
+            yield session
+            return
+
+        session = EvaluationSession(self)
+        try:
+            with activate_session(session):
+                yield session
+        finally:
+            logger.debug("Evaluation cache statistics: %s", session.statistics())
+
+    @property
+    def session(self):
+        """The evaluation session which is active in the current context, or None."""
+        return get_active_session(self)
+
+    def freeze(self):
+        """Create an immutable snapshot of this configuration, for evaluating and
+        exporting the waveforms without editing them. The snapshot evaluates to the
+        same values, but its tendencies don't watch each other for changes. See
+        :class:`~waveform_editor.frozen.FrozenConfiguration`.
+
+        Returns:
+            The frozen configuration.
+        """
+        from waveform_editor.frozen import FrozenConfiguration
+
+        return FrozenConfiguration(self)
+
+    def parse_waveform(self, yaml_str, previous=None):
         """Parse a YAML waveform string and return a waveform object.
 
         Args:
             yaml_str: The YAML string to parse.
+            previous: Previous version of the waveform, whose tendencies are reused
+                for the entries which did not change.
 
         Returns:
             The parsed waveform object.
         """
         self.parser.parse_errors = []
-        return self.parser.parse_waveform(yaml_str)
+        return self.parser.parse_waveform(yaml_str, previous)
 
     def _to_commented_map(self):
         """Return the configuration as a nested CommentedMap."""
@@ -323,17 +622,9 @@ class WaveformConfiguration(param.Parameterized):
         return result
 
     def _calculate_bounds(self):
-        min_start = float("inf")
-        max_end = float("-inf")
-
-        for name in self.waveform_map:
-            waveform = self[name]
-            if not isinstance(waveform, DerivedWaveform) and waveform.tendencies:
-                min_start = min(min_start, waveform.tendencies[0].start)
-                max_end = max(max_end, waveform.tendencies[-1].end)
-
-        self.start = min_start if min_start != float("inf") else self.DEFAULT_START
-        self.end = max_end if max_end != float("-inf") else self.DEFAULT_END
+        self.start, self.end = calculate_bounds(
+            self._get_waveform(name) for name in self.waveform_map
+        )
 
     def print(self, indent=0):
         """Prints the waveform configuration as a hierarchical tree.
@@ -349,8 +640,34 @@ class WaveformConfiguration(param.Parameterized):
         """Clears the data stored in the configuration."""
         self.groups = {}
         self.waveform_map = {}
+        self.dependency_graph = DependencyGraph()
         self.globals.reset()
         self.load_error = ""
+        self.base_path = None
         self.start = self.DEFAULT_START
         self.end = self.DEFAULT_END
         self.has_changed = False
+
+
+def calculate_bounds(waveforms):
+    """Calculate the start and end of a configuration, which span the tendencies of all
+    its waveforms.
+
+    Args:
+        waveforms: Iterable of the waveforms of the configuration.
+
+    Returns:
+        Tuple containing the start and end, or the default start and end of a
+        configuration if none of the waveforms have tendencies.
+    """
+    min_start = float("inf")
+    max_end = float("-inf")
+
+    for waveform in waveforms:
+        if not isinstance(waveform, DerivedEvaluable) and waveform.tendencies:
+            min_start = min(min_start, waveform.tendencies[0].start)
+            max_end = max(max_end, waveform.tendencies[-1].end)
+
+    if min_start == float("inf"):  # None of the waveforms have tendencies
+        return WaveformConfiguration.DEFAULT_START, WaveformConfiguration.DEFAULT_END
+    return min_start, max_end
@@ -2,42 +2,54 @@ class DependencyGraph:
     """
     Manages dependencies between nodes (e.g., waveforms) and enforces acyclic
     constraints.
+
+    Next to the dependencies of every node, the graph keeps a reverse index with the
+    dependents of every name. Names which are not part of the graph can have
+    dependents as well, when nodes depend on them.
     """
 
     def __init__(self):
         self.graph = {}
+        self.dependents = {}
+        self._levels = None
 
     def __contains__(self, name):
         return name in self.graph
 
+    def copy(self):
+        """Return a copy of the dependency graph, which can be changed independently
+        of this graph."""
+        graph = DependencyGraph()
+        graph.graph = {name: set(deps) for name, deps in self.graph.items()}
+        graph.dependents = {name: set(nodes) for name, nodes in self.dependents.items()}
+        return graph
+
     def check_safe_to_remove(self, name):
         """Verify that a node can be removed without breaking dependencies.
 
         Args:
             name: Node name to check.
         """
-        for node, deps in self.graph.items():
-            if name in deps:
-                raise RuntimeError(
-                    f"Cannot remove waveform {name!r} because it is a dependency of "
-                    f"{node!r}"
-                )
+        dependents = self.dependents.get(name)
+        if dependents:
+            raise RuntimeError(
+                f"Cannot remove waveform {name!r} because it is a dependency of "
+                f"{min(dependents)!r}"
+            )
 
     def check_safe_to_replace(self, name, dependencies):
         """Check if replacing a node's dependencies would introduce cycles.
 
+        Only the dependencies which are added to the node can introduce a cycle, so
+        only these are searched for a path back to the node.
+
         Args:
             name: Node name to check.
             dependencies: Set of new dependencies for the node.
         """
         if name not in self.graph:
             return
-        old_deps = self.graph[name]
-        self.graph[name] = set(dependencies)
-        try:
-            self.detect_cycles()
-        finally:
-            self.graph[name] = old_deps
+        self._check_new_dependencies(name, set(dependencies) - self.graph[name])
 
     def replace_node(self, name, dependencies):
         """Replace the dependencies of an existing node or add it if missing.
@@ -46,31 +58,46 @@ class DependencyGraph:
             name: The name of the node.
             dependencies: Set of new dependencies for the node.
         """
-        if name not in self.graph:
-            self.add_node(name, dependencies)
-            return
-        old = self.graph[name]
-        self.graph[name] = set(dependencies)
-        try:
-            self.detect_cycles()
-        except RuntimeError:
-            self.graph[name] = old
-            raise
+        self.add_node(name, dependencies)
 
     def add_node(self, name, dependencies):
-        """Add a new node with specified dependencies. Validates that there are no
-        cycles and removes node on failure.
+        """Add a new node with specified dependencies, or replace the dependencies of
+        an existing node. Validates that there are no cycles and restores the node on
+        failure.
 
         Args:
             name: The name of the node.
             dependencies: Set of new dependencies for the node.
         """
-        self.graph[name] = set(dependencies)
-        try:
-            self.detect_cycles()
-        except RuntimeError:
-            del self.graph[name]
-            raise
+        dependencies = set(dependencies)
+        old_dependencies = self.graph.get(name)
+        if old_dependencies is None:
+            self._check_new_dependencies(name, dependencies)
+        else:
+            self._check_new_dependencies(name, dependencies - old_dependencies)
+        self._set_dependencies(name, dependencies)
+
+    def add_nodes(self, nodes):
+        """Add multiple nodes at once. The graph is checked for cycles once, after all
+        nodes are added. On failure, the graph is restored and all cycles are
+        reported.
+
+        Args:
+            nodes: Dictionary mapping the names of the nodes to their dependencies.
+        """
+        if not nodes:
+            return
+        previous = {name: self.graph.get(name) for name in nodes}
+        for name, dependencies in nodes.items():
+            self._set_dependencies(name, set(dependencies))
+        cycles = self.find_cycles()
+        if cycles:
+            for name, dependencies in previous.items():
+                if dependencies is None:
+                    self.remove_node(name)
+                else:
+                    self._set_dependencies(name, dependencies)
+            raise RuntimeError(_format_cycles(cycles))
 
     def remove_node(self, name):
         """Remove a node from the graph.
@@ -78,7 +105,9 @@ class DependencyGraph:
         Args:
             name: Node name to remove.
         """
+        self._unlink(name)
         del self.graph[name]
+        self._levels = None
 
     def rename_node(self, old_name, new_name):
         """Rename a node and update all dependencies referencing it.
@@ -90,17 +119,83 @@ class DependencyGraph:
         Returns:
             Names of nodes that depended on the renamed node.
         """
-        dependents = [node for node, deps in self.graph.items() if old_name in deps]
+        dependents = sorted(self.dependents.pop(old_name, ()))
+        self._levels = None
 
         if old_name in self.graph:
-            self.graph[new_name] = self.graph.pop(old_name)
+            dependencies = self.graph[old_name]
+            self.remove_node(old_name)
+            self._set_dependencies(new_name, dependencies)
 
         for dependent_name in dependents:
             dependencies = self.graph[dependent_name]
             dependencies.remove(old_name)
             dependencies.add(new_name)
+        if dependents:
+            self.dependents.setdefault(new_name, set()).update(dependents)
         return dependents
 
+    def _set_dependencies(self, name, dependencies):
+        """Set the dependencies of a node, and update the index of dependents.
+
+        Args:
+            name: The name of the node.
+            dependencies: Set of dependencies of the node.
+        """
+        if name in self.graph:
+            self._unlink(name)
+        self.graph[name] = dependencies
+        for dependency in dependencies:
+            self.dependents.setdefault(dependency, set()).add(name)
+        self._levels = None
+
+    def _unlink(self, name):
+        """Remove a node from the dependents of all of its dependencies.
+
+        Args:
+            name: The name of the node.
+        """
+        for dependency in self.graph[name]:
+            dependents = self.dependents[dependency]
+            dependents.discard(name)
+            if not dependents:
+                del self.dependents[dependency]
+
+    def _check_new_dependencies(self, name, dependencies):
+        """Check if adding dependencies to a node would introduce a cycle, assuming
+        that the graph itself has no cycles. Raises RuntimeError if any of the
+        dependencies (indirectly) depends on the node.
+
+        Args:
+            name: The name of the node.
+            dependencies: Set of dependencies which are added to the node.
+        """
+        if name not in self.dependents and name not in dependencies:
+            # No other node depends on this node, so it can't be part of a cycle
+            return
+        # Iterative depth-first search from the new dependencies back to the node,
+        # which remembers from which node every node was reached
+        parents = {}
+        stack = []
+        for dependency in dependencies:
+            if dependency not in parents:
+                parents[dependency] = name
+                stack.append(dependency)
+        while stack:
+            node = stack.pop()
+            if node == name:
+                cycle = []
+                while True:
+                    node = parents[node]
+                    cycle.append(node)
+                    if node == name:
+                        break
+                raise RuntimeError(_format_cycles([cycle[::-1]]))
+            for neighbor in self.graph.get(node, ()):
+                if neighbor not in parents:
+                    parents[neighbor] = node
+                    stack.append(neighbor)
+
     def detect_cycles(self, start_node=None):
         """Detect cycles in the graph, optionally starting from a specific node. Raises
         RuntimeError if a circular dependency is found.
@@ -109,18 +204,30 @@ class DependencyGraph:
             start_node: Node to start detection from. Checks entire graph if None.
         """
         visited = set()
-        stack = set()
+        on_stack = set()
 
-        def visit(node):
-            if node in stack:
-                raise RuntimeError(f"Circular dependency detected involving '{node}'")
-            if node in visited:
+        def visit(start):
+            # Iterative depth-first search, to support arbitrarily deep dependencies
+            if start in visited:
                 return
-            visited.add(node)
-            stack.add(node)
-            for neighbor in self.graph.get(node, []):
-                visit(neighbor)
-            stack.remove(node)
+            visited.add(start)
+            on_stack.add(start)
+            stack = [(start, iter(self.graph.get(start, [])))]
+            while stack:
+                node, neighbors = stack[-1]
+                for neighbor in neighbors:
+                    if neighbor in on_stack:
+                        raise RuntimeError(
+                            f"Circular dependency detected involving '{neighbor}'"
+                        )
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        on_stack.add(neighbor)
+                        stack.append((neighbor, iter(self.graph.get(neighbor, []))))
+                        break
+                else:
+                    stack.pop()
+                    on_stack.remove(node)
 
         if start_node is not None:
             if start_node not in self.graph:
@@ -129,3 +236,199 @@ class DependencyGraph:
         else:
             for node in self.graph:
                 visit(node)
+
+    def levels(self):
+        """Group the nodes into levels, such that the nodes in each level only depend
+        on nodes in earlier levels, or on nodes which are not part of the graph. Nodes
+        within the same level are independent of each other. The result is cached
+        until the graph is modified.
+
+        Returns:
+            List of levels, where each level is a list of node names.
+        """
+        if self._levels is None:
+            levels, remaining = self._kahn_levels()
+            if remaining:
+                raise RuntimeError(_format_cycles(self._find_cycles(remaining)))
+            self._levels = levels
+        return self._levels
+
+    def find_cycles(self):
+        """Find all circular dependencies in the graph.
+
+        A single pass of Kahn's algorithm places every node which does not depend on
+        a cycle. Only the remaining nodes are searched for cycles, which are reported
+        once per strongly connected component.
+
+        Returns:
+            List of cycles, where each cycle is a list of node names in which every
+            node depends on the next one, and the last node depends on the first one.
+        """
+        _, remaining = self._kahn_levels()
+        return self._find_cycles(remaining)
+
+    def _kahn_levels(self):
+        """Group the nodes into levels with Kahn's algorithm, see :meth:`levels`.
+
+        Returns:
+            Tuple containing the list of levels, and a list of the nodes which could
+            not be placed in a level, because they are part of, or depend on, a cycle.
+        """
+        # A node is ready as soon as all its dependencies that are part of the graph
+        # have been placed in an earlier level
+        num_pending = {}
+        dependents = {}
+        for node, deps in self.graph.items():
+            graph_deps = [dep for dep in deps if dep in self.graph]
+            num_pending[node] = len(graph_deps)
+            for dep in graph_deps:
+                dependents.setdefault(dep, []).append(node)
+
+        levels = []
+        level = [node for node, num in num_pending.items() if num == 0]
+        while level:
+            levels.append(level)
+            next_level = []
+            for node in level:
+                for dependent in dependents.get(node, []):
+                    num_pending[dependent] -= 1
+                    if num_pending[dependent] == 0:
+                        next_level.append(dependent)
+            level = next_level
+        remaining = [node for node, num in num_pending.items() if num > 0]
+        return levels, remaining
+
+    def _find_cycles(self, nodes):
+        """Find a cycle in every strongly connected component of a subgraph.
+
+        Args:
+            nodes: Names of the nodes of the subgraph.
+
+        Returns:
+            List of cycles, see :meth:`find_cycles`.
+        """
+        nodes = set(nodes)
+        # Dependencies within the subgraph, sorted to report the cycles consistently
+        edges = {node: sorted(self.graph[node] & nodes) for node in nodes}
+        order = {node: i for i, node in enumerate(self.graph)}
+        cycles = []
+        for component in _strongly_connected_components(edges, order):
+            node = min(component, key=order.get)
+            if len(component) == 1 and node not in edges[node]:
+                continue
+            # Every node of the component depends on another node of the component
+            members = set(component)
+            path = []
+            position = {}
+            while node not in position:
+                position[node] = len(path)
+                path.append(node)
+                node = next(dep for dep in edges[node] if dep in members)
+            cycles.append(path[position[node] :])
+        return cycles
+
+    def levels_for(self, names, known=None):
+        """Group nodes, and all nodes they (indirectly) depend on, into levels.
+
+        The first level contains the requested names and dependencies which are not
+        part of the graph, the other levels follow the order of :meth:`levels`.
+
+        Args:
+            names: Names of the nodes to group into levels.
+            known: Container with the names of the nodes which exist. If provided,
+                dependencies which are not in it are skipped.
+
+        Returns:
+            List of levels, where each level is a list of node names.
+        """
+        # Collect all (indirect) dependencies, a dict is used to keep a stable order
+        needed = dict.fromkeys(names)
+        to_visit = [dep for name in needed for dep in self.graph.get(name, ())]
+        while to_visit:
+            name = to_visit.pop()
+            if name not in needed and (known is None or name in known):
+                needed[name] = None
+                to_visit.extend(self.graph.get(name, ()))
+
+        levels = [[name for name in needed if name not in self.graph]]
+        levels += [
+            [name for name in level if name in needed] for level in self.levels()
+        ]
+        return levels
+
+    def topological_order(self):
+        """Return the nodes in an order where every node comes after all of its
+        dependencies. The result is cached until the graph is modified.
+
+        Returns:
+            List of node names.
+        """
+        return [node for level in self.levels() for node in level]
+
+
+def _strongly_connected_components(edges, order):
+    """Find the strongly connected components of a graph, with an iterative version
+    of Tarjan's algorithm.
+
+    Args:
+        edges: Dictionary mapping every node to its list of neighbours.
+        order: Dictionary which defines the order in which the nodes are visited.
+
+    Returns:
+        List of components, where each component is a list of nodes.
+    """
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+    for root in sorted(edges, key=order.get):
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(edges[root]))]
+        while work:
+            node, neighbors = work[-1]
+            for neighbor in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = low[neighbor] = len(index)
+                    stack.append(neighbor)
+                    on_stack.add(neighbor)
+                    work.append((neighbor, iter(edges[neighbor])))
+                    break
+                if neighbor in on_stack:
+                    low[node] = min(low[node], index[neighbor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.remove(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def _format_cycles(cycles):
+    """Create an error message which lists circular dependencies.
+
+    Args:
+        cycles: List of cycles, see :meth:`DependencyGraph.find_cycles`.
+
+    Returns:
+        The error message.
+    """
+    descriptions = [
+        " -> ".join(repr(node) for node in [*cycle, cycle[0]]) for cycle in cycles
+    ]
+    if len(cycles) == 1:
+        return f"Circular dependency detected: {descriptions[0]}"
+    return "Circular dependencies detected: " + "; ".join(descriptions)
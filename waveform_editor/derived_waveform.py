@@ -1,9 +1,10 @@
 import ast
+import copy
 
 import numpy as np
-from asteval import Interpreter
+from asteval.astutils import UNSAFE_ATTRS, safe_lshift, safe_pow
 
-from waveform_editor.base_waveform import BaseWaveform
+from waveform_editor.base_waveform import CHUNK_SIZE, BaseWaveform, DerivedEvaluable
 
 NUMPY_UFUNCS = {}
 for name in np.__all__:
@@ -11,6 +12,32 @@ for name in np.__all__:
     if isinstance(obj, np.ufunc):
         NUMPY_UFUNCS[name] = obj
 
+# Node types which may appear in a derived waveform expression. This mirrors the
+# nodes supported by a minimal asteval interpreter, which excludes conditional
+# expressions, lambdas and comprehensions.
+ALLOWED_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.BoolOp,
+    ast.Compare,
+    ast.Call,
+    ast.keyword,
+    ast.Name,
+    ast.Constant,
+    ast.Attribute,
+    ast.Subscript,
+    ast.Slice,
+    ast.Tuple,
+    ast.List,
+    ast.expr_context,
+    ast.operator,
+    ast.unaryop,
+    ast.boolop,
+    ast.cmpop,
+)
+UNSAFE_ATTRIBUTES = set(UNSAFE_ATTRS) | {"ctypes", "tofile", "dump"}
+
 
 class DependencyRenamer(ast.NodeTransformer):
     """AST transformer to rename string constants."""
@@ -65,33 +92,117 @@ class ExpressionExtractor(ast.NodeTransformer):
             return node
 
 
-class DerivedWaveform(BaseWaveform):
-    def __init__(self, yaml_str, name, config, dd_version=None):
-        super().__init__(yaml_str, name, dd_version)
+class ExpressionCompiler(ast.NodeTransformer):
+    """
+    AST transformer validating a transformed expression and compiling it into a
+    code object, which can be evaluated repeatedly without parsing it again.
+
+    Only the node types of a minimal asteval interpreter are accepted, attributes
+    which could be used to escape the restricted namespace are rejected, and powers
+    and left shifts are guarded against excessively large results, like asteval does.
+    Names are resolved at evaluation time, unknown names raise a NameError.
+    """
+
+    # Functions which replace the guarded binary operators
+    SAFE_OPERATORS = {ast.Pow: "__pow", ast.LShift: "__lshift"}
+    NAMESPACE = {
+        "__builtins__": {},
+        "__pow": safe_pow,
+        "__lshift": safe_lshift,
+        **NUMPY_UFUNCS,
+    }
+
+    def compile(self, tree):
+        """Validate the expression tree and compile it.
+
+        Args:
+            tree: Expression tree, as transformed by the ExpressionExtractor.
+
+        Returns:
+            Function which evaluates the expression, given a dictionary mapping the
+            names of the dependencies to their values.
+        """
+        tree = ast.fix_missing_locations(self.visit(copy.deepcopy(tree)))
+        code = compile(tree, "<derived waveform>", "eval")
+        namespace = self.NAMESPACE
+
+        def evaluate(dependencies):
+            return eval(code, namespace, {"__w": dependencies})
+
+        return evaluate
+
+    def generic_visit(self, node):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"{type(node).__name__} is not allowed in an expression")
+        return super().generic_visit(node)
+
+    def visit_Name(self, node):
+        if node.id.startswith("__") and node.id != "__w":
+            raise NameError(f"name '{node.id}' is not defined")
+        return node
+
+    def visit_Attribute(self, node):
+        attr = node.attr
+        if attr in UNSAFE_ATTRIBUTES or attr.startswith("__"):
+            raise AttributeError(f"Access to attribute '{attr}' is not allowed")
+        return self.generic_visit(node)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bytes):
+            raise ValueError("Bytes are not allowed in an expression")
+        return node
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        func = self.SAFE_OPERATORS.get(type(node.op))
+        if func is None:
+            return node
+        return ast.copy_location(
+            ast.Call(
+                func=ast.Name(id=func, ctx=ast.Load()),
+                args=[node.left, node.right],
+                keywords=[],
+            ),
+            node,
+        )
+
+
+class DerivedWaveform(BaseWaveform, DerivedEvaluable):
+    def __init__(self, yaml_str, name, config, dd_version=None, yaml_node=None):
+        super().__init__(yaml_str, name, dd_version, yaml_node)
         self.config = config
         self.dependencies = set()
         self.is_constant = False
         self.expression = None
+        self.expression_tree = None
+        self._evaluator = None
         self.prepare_expression()
 
     def prepare_expression(self):
         """Parse the YAML expression, extract dependencies, transform it for
         evaluation, and compile it.
+
+        The expression is validated and compiled only once, such that repeated
+        evaluations only need to bind the values of the dependencies.
         """
         if self.yaml is None:
             return
 
+        extractor = ExpressionExtractor()
         try:
             tree = ast.parse(str(self.yaml), mode="eval")
+            modified_tree = ast.fix_missing_locations(extractor.visit(tree))
+            self.expression = ast.unparse(modified_tree)
+            self._evaluator = ExpressionCompiler().compile(modified_tree)
         except Exception as e:
             self.annotations.add(0, f"Could not parse or evaluate the waveform: {e}")
             self.expression = None
+            self.expression_tree = None
+            self._evaluator = None
             return
 
-        extractor = ExpressionExtractor()
-        modified_tree = ast.fix_missing_locations(extractor.visit(tree))
+        self.expression_tree = modified_tree
         self.is_constant = not extractor.string_nodes
-        self.expression = ast.unparse(modified_tree)
         self.dependencies = set(extractor.string_nodes)
 
     def rename_dependency(self, old_name, new_name):
@@ -111,7 +222,9 @@ class DerivedWaveform(BaseWaveform):
         self.prepare_expression()
 
     def _build_eval_context(self, time: np.ndarray) -> dict:
-        """Build the evaluation context dictionary with dependencies resolved.
+        """Build the evaluation context dictionary with dependencies resolved. The
+        dependencies are evaluated through the active evaluation session of the
+        configuration, so shared dependencies are only evaluated once.
 
         Args:
             time: The time array on which to generate points.
@@ -121,8 +234,9 @@ class DerivedWaveform(BaseWaveform):
         """
         eval_context = {}
 
-        for name in self.dependencies:
-            eval_context[name] = self.config[name].get_value(time)[1]
+        with self.config.evaluation_session() as session:
+            for name in self.dependencies:
+                eval_context[name] = session.get_value(name, time)
         return eval_context
 
     def get_value(
@@ -144,21 +258,84 @@ class DerivedWaveform(BaseWaveform):
             return time, np.zeros_like(time)
 
         eval_context = self._build_eval_context(time)
-        sym_table = NUMPY_UFUNCS.copy()
-        sym_table["__w"] = eval_context
-        aeval = Interpreter(
-            symtable=sym_table,
-            minimal=True,
-            use_numpy=False,
-        )
 
         # Don't print the entire NumPy array in the error alert message
         with np.printoptions(threshold=10):
-            result = aeval.eval(self.expression, raise_errors=True)
+            result = self._evaluator(eval_context)
+        return time, self.process_result(time, result)
+
+    def value_at(self, time: float) -> float:
+        """Evaluate the derived waveform expression at a single time point.
+
+        Args:
+            time: The time point at which to evaluate the waveform.
+
+        Returns:
+            The value of the derived waveform.
+        """
+        return self.evaluate_at(
+            {name: self.config[name].value_at(time) for name in self.dependencies}
+        )
+
+    def evaluate_at(self, dependency_values: dict) -> float:
+        """Evaluate the derived waveform expression on the values of its dependencies
+        at a single time point.
 
+        The values are wrapped in single-element arrays, such that the expression is
+        evaluated by the same NumPy array loops as in :meth:`get_value`. Operators on
+        NumPy scalars may round differently (e.g. for powers), and Python floats
+        raise an error on division by zero.
+
+        Args:
+            dependency_values: Mapping of dependency names to their values.
+
+        Returns:
+            The value of the derived waveform.
+        """
+        if self.expression is None:
+            return 0.0
+        eval_context = {
+            name: np.array([value], dtype=float)
+            for name, value in dependency_values.items()
+        }
+        # Unlike in get_value, the printoptions are not needed as the arrays are small
+        result = self._evaluator(eval_context)
+        return float(self.process_result(np.zeros(1), result)[0])
+
+    def iter_values(self, times: np.ndarray, chunk_size: int = CHUNK_SIZE):
+        """Evaluate the derived waveform in contiguous chunks of a time array.
+
+        The values of the dependencies on a chunk are removed from the active
+        evaluation session once the chunk is evaluated, so they do not accumulate.
+
+        Args:
+            times: The time array on which to evaluate the waveform.
+            chunk_size: Maximum number of time points per chunk.
+
+        Yields:
+            Tuples containing a chunk of the time array and the waveform values on it.
+        """
+        time = np.asarray(times, dtype=float)
+        for start in range(0, len(time), chunk_size):
+            chunk = time[start : start + chunk_size]
+            with self.config.evaluation_session() as session:
+                values = self.get_value(chunk)[1]
+                session.discard(chunk)
+            yield chunk, values
+
+    def process_result(self, time, result):
+        """Convert the result of the evaluated expression to the waveform values.
+
+        Args:
+            time: The time array on which the expression was evaluated.
+            result: The result of the evaluated expression.
+
+        Returns:
+            numpy array containing the waveform values.
+        """
         # If derived waveform is a constant, ensure an array is returned
         if self.is_constant:
-            return time, np.full_like(time, result, dtype=float)
+            return np.full_like(time, result, dtype=float)
 
         # Ensure the result is a 1D array
         if not isinstance(result, np.ndarray):
@@ -170,7 +347,10 @@ class DerivedWaveform(BaseWaveform):
                 f"shape of the time array {time.shape}"
             )
 
-        return time, result
+        if not result.flags.writeable:
+            # The result is the cached array of a dependency, which must not change
+            result = result.copy()
+        return result
 
     def get_yaml_string(self):
         """Returns the current YAML expression string."""
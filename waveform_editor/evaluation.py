@@ -0,0 +1,220 @@
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+from waveform_editor.base_waveform import DerivedEvaluable
+from waveform_editor.expression_optimizer import ExpressionOptimizer
+
+logger = logging.getLogger(__name__)
+
+# Minimum number of time points for which waveforms are evaluated in a thread pool.
+# For smaller time arrays the overhead of the thread pool outweighs the gain.
+PARALLEL_MIN_SAMPLES = 10_000
+
+# Evaluation sessions which are active in the current context, by the id of their
+# configuration. Every thread has its own context, so concurrent requests on the same
+# configuration don't share a session. The mapping is replaced, never modified.
+_active_sessions = contextvars.ContextVar("active_sessions", default=None)
+
+
+def get_active_session(config):
+    """Return the evaluation session of a configuration which is active in the
+    current context.
+
+    Args:
+        config: The configuration to get the active session of.
+
+    Returns:
+        The active :class:`EvaluationSession`, or None if there is no active session.
+    """
+    return (_active_sessions.get() or {}).get(id(config))
+
+
+@contextmanager
+def activate_session(session):
+    """Context manager which activates an evaluation session for its configuration,
+    in the current context only.
+
+    Args:
+        session: The session to activate.
+
+    Yields:
+        The activated session.
+    """
+    sessions = _active_sessions.get() or {}
+    token = _active_sessions.set({**sessions, id(session.config): session})
+    try:
+        yield session
+    finally:
+        _active_sessions.reset(token)
+
+
+def run_concurrently(func, items, max_workers=None):
+    """Call a function for every item, in a thread pool if there are multiple items.
+
+    NumPy releases the GIL in most of its array operations, so waveforms on large time
+    arrays can be evaluated concurrently.
+
+    Every call runs in a copy of the context of the calling thread, such that the
+    active evaluation sessions are available in the worker threads.
+
+    Args:
+        func: Function to call for every item.
+        items: List of items to call the function for.
+        max_workers: Maximum number of threads. When set to 1, all items are processed
+            sequentially in the calling thread.
+
+    Returns:
+        List containing the return values of the function, in the order of the items.
+    """
+    if len(items) <= 1 or max_workers == 1:
+        return [func(item) for item in items]
+    # A context can only be entered by one thread at a time, so copy it per item
+    contexts = [contextvars.copy_context() for _ in items]
+    with ThreadPoolExecutor(max_workers) as executor:
+        return list(
+            executor.map(lambda ctx, item: ctx.run(func, item), contexts, items)
+        )
+
+
+class EvaluationSession:
+    """Cache of waveform values, which lives for the duration of a single export or
+    plot request.
+
+    Derived waveforms look up the values of their dependencies through the active
+    session, such that every waveform is evaluated only once per time array, even when
+    multiple derived waveforms depend on it. Sessions are created through
+    :meth:`WaveformConfiguration.evaluation_session()
+    <waveform_editor.configuration.WaveformConfiguration.evaluation_session>`.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Maps (name, id(time)) to a (time, values) tuple. The time array is stored
+        # alongside the values, to ensure its id is not reused while it is cached.
+        self._cache = {}
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get_value(self, name, time):
+        """Get the values of a waveform at the provided time array, evaluating the
+        waveform only if its values are not yet cached.
+
+        Args:
+            name: Name of the waveform to evaluate.
+            time: The time array on which to evaluate the waveform.
+
+        Returns:
+            numpy array containing the waveform values.
+        """
+        values = self.lookup(name, time)
+        if values is None:
+            values = self.config[name].get_value(time)[1]
+            self.store(name, time, values)
+        return values
+
+    def lookup(self, name, time):
+        """Return the cached values of a waveform, or None if they are not cached.
+
+        Args:
+            name: Name of the waveform.
+            time: The time array on which the waveform was evaluated.
+        """
+        entry = self._cache.get((name, id(time)))
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry[1]
+
+    def store(self, name, time, values):
+        """Store a read-only copy of the values of a waveform in the cache, such that
+        the cached values can't be changed through the array of the caller, for
+        example when it is a row of the array returned by
+        :meth:`~waveform_editor.configuration.WaveformConfiguration.evaluate`.
+
+        Args:
+            name: Name of the waveform.
+            time: The time array on which the waveform was evaluated.
+            values: The values of the waveform.
+        """
+        values = np.array(values)
+        values.flags.writeable = False
+        self._cache[(name, id(time))] = (time, values)
+
+    def discard(self, time):
+        """Remove the cached values of all waveforms which were evaluated on a time
+        array, for example when the time array is a chunk of a larger time array that
+        is no longer needed.
+
+        Args:
+            time: The time array to remove the cached values for.
+        """
+        keys = [key for key in self._cache if key[1] == id(time)]
+        for key in keys:
+            del self._cache[key]
+
+    def evaluate_all(self, names, time, max_workers=None, optimize=False):
+        """Evaluate waveforms, and all the waveforms they (indirectly) depend on, into
+        the cache.
+
+        The waveforms are evaluated level by level, following the levels of the
+        dependency graph of the configuration: first all waveforms which are not
+        derived, then the derived waveforms which only depend on those, etc. When
+        evaluating a derived waveform, all its dependencies are therefore already
+        cached, which avoids deep recursion for long chains of derived waveforms.
+        Waveforms within the same level are independent, and are evaluated
+        concurrently.
+
+        Args:
+            names: Names of the waveforms to evaluate.
+            time: The time array on which to evaluate the waveforms.
+            max_workers: Maximum number of threads used to evaluate a single level.
+            optimize: Whether to optimize the expressions of the derived waveforms
+                with an :class:`ExpressionOptimizer`, such that subexpressions which
+                are shared between derived waveforms are evaluated only once.
+        """
+        if len(time) < PARALLEL_MIN_SAMPLES:
+            max_workers = 1
+        levels = self.config._evaluation_levels(names)
+
+        optimizer = None
+        if optimize:
+            derived = [self.config[name] for level in levels[1:] for name in level]
+            derived = [wf for wf in derived if isinstance(wf, DerivedEvaluable)]
+            optimizer = ExpressionOptimizer(derived)
+
+        def evaluate(name):
+            if optimizer is not None and name in optimizer.expressions:
+                return optimizer.evaluate(name, time, self)
+            return self.config[name].get_value(time)[1]
+
+        for level in levels:
+            pending = [name for name in level if (name, id(time)) not in self._cache]
+            results = run_concurrently(evaluate, pending, max_workers)
+            for name, values in zip(pending, results, strict=True):
+                self.store(name, time, values)
+
+    @property
+    def hit_rate(self):
+        """Fraction of the lookups that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def statistics(self):
+        """Return the cache statistics of this session as a dictionary."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "cached": len(self),
+        }
@@ -7,16 +7,19 @@ import pandas as pd
 import plotly.graph_objects as go
 from imas.ids_path import IDSPath
 
+from waveform_editor.base_waveform import CHUNK_SIZE
 from waveform_editor.pcssp_exporter import PCSSPExporter
 
 logger = logging.getLogger(__name__)
 
 
 class ConfigurationExporter:
-    def __init__(self, config, times, progress=None):
+    def __init__(self, config, times, progress=None, chunk_size=CHUNK_SIZE):
         self.config = config
         self.times = times
         self.progress = progress
+        # Number of time points which are evaluated at once by streaming exporters
+        self.chunk_size = chunk_size
         self.total_progress = None
         self.current_progress = None
         # We assume that all DD times are in seconds
@@ -31,7 +34,9 @@ class ConfigurationExporter:
         Args:
             file_path: The file path to store the XML file to.
         """
-        pcssp_exporter = PCSSPExporter(self.config, self.times)
+        pcssp_exporter = PCSSPExporter(
+            self.config, self.times, self.chunk_size, self._get_exported_names()
+        )
         pcssp_exporter.export(file_path)
         logger.info(
             f"Successfully exported waveform configuration to PCSSP XML at {file_path}."
@@ -56,7 +61,10 @@ class ConfigurationExporter:
             A dictionary with IDS names as keys and IDS objects as values.
         """
         factory = imas.IDSFactory(self.config.globals.dd_version)
-        return {ids_name: ids for ids_name, ids in self._generate_idss(factory)}
+        # Share the values of waveforms that are used by multiple IDSs (e.g. as a
+        # dependency of derived waveforms) within a single evaluation session
+        with self.config.evaluation_session():
+            return {ids_name: ids for ids_name, ids in self._generate_idss(factory)}
 
     def _generate_idss(self, factory):
         """Generator for creating IDS objects from the configuration.
@@ -84,7 +92,10 @@ class ConfigurationExporter:
                 imas.ids_defs.IDS_TIME_MODE_HOMOGENEOUS
             )
             ids.time = self.times
-            self._fill_waveforms(ids, waveforms)
+            # The evaluation session is scoped to a single IDS, and is closed before
+            # the IDS is yielded
+            with self.config.evaluation_session():
+                self._fill_waveforms(ids, waveforms)
             yield ids_name, ids
 
     def to_png(self, dir_path):
@@ -93,13 +104,19 @@ class ConfigurationExporter:
         Args:
             dir_path: The directory path to store the PNGs into.
         """
-        self.total_progress = len(self.config.waveform_map)
+        self.total_progress = len(self.config.waveform_names)
         self.current_progress = 0
 
         Path(dir_path).mkdir(parents=True, exist_ok=True)
-        for name, group in self.config.waveform_map.items():
-            waveform = group[name]
-            times, values = waveform.get_value(self.times)
+        if self.times is not None:
+            all_values = self.config.evaluate(self.times, optimize=True)
+        for i, name in enumerate(self.config.waveform_names):
+            waveform = self.config[name]
+            if self.times is None or not waveform.has_values():
+                # Waveforms without tendencies have no values to plot
+                times, values = waveform.get_value()
+            else:
+                times, values = self.times, all_values[i]
             ylabel = f"Value [{waveform.units}]"
             fig = go.Figure(data=go.Scatter(x=times, y=values, mode="lines"))
             fig.update_layout(
@@ -119,30 +136,47 @@ class ConfigurationExporter:
     def to_csv(self, file_path):
         """Export the waveform to a CSV.
 
+        The waveforms are evaluated and written in chunks of the time array, such that
+        the memory usage does not depend on the number of time points.
+
         Args:
             file_path: The file path to store the CSV to.
         """
-        self.total_progress = len(self.config.waveform_map)
+        names = self._get_exported_names()
+        self.total_progress = max(1, -(-len(self.times) // self.chunk_size))
         self.current_progress = 0
-        data = {"time": self.times}
-
-        for name, group in self.config.waveform_map.items():
-            logger.debug(f"Collecting data for {name}...")
-            waveform = group[name]
-            _, values = waveform.get_value(self.times)
-            if len(values) != len(self.times):
-                logger.warning(
-                    f"{name} does not match the number of times, and is not exported."
-                )
-                continue
-            data[name] = values
-            self._increment_progress()
-
-        df = pd.DataFrame(data)
+        logger.debug(f"Collecting data for {len(names)} waveforms...")
         Path(file_path).parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(file_path, index=False)
+        columns = ["time", *names]
+        with open(file_path, "w", newline="") as file:
+            header = True
+            for times, values in self.config.iter_evaluate(
+                self.times, names, self.chunk_size, optimize=True
+            ):
+                df = pd.DataFrame(dict(zip(columns, [times, *values], strict=True)))
+                df.to_csv(file, header=header, index=False)
+                header = False
+                self._increment_progress()
+            if header:
+                pd.DataFrame(columns=columns).to_csv(file, index=False)
         logger.info(f"Successfully exported waveform configuration to {file_path}.")
 
+    def _get_exported_names(self):
+        """Returns the names of the waveforms to export. Waveforms without tendencies
+        have no values, so they are skipped with a warning.
+
+        Returns:
+            List of the names of the waveforms to export.
+        """
+        names = []
+        for name in self.config.waveform_names:
+            waveform = self.config[name]
+            if not waveform.has_values():
+                logger.warning(f"{name} has no tendencies, and is not exported.")
+                continue
+            names.append(name)
+        return names
+
     def _get_ids_map(self):
         """Constructs a mapping of IDS names to their corresponding waveform objects.
 
@@ -150,8 +184,8 @@ class ConfigurationExporter:
             A dictionary mapping IDS names to lists of waveform objects.
         """
         ids_map = {}
-        for name, group in self.config.waveform_map.items():
-            waveform = group[name]
+        for name in self._get_exported_names():
+            waveform = self.config[name]
             if not waveform.metadata:
                 logger.warning(
                     f"'{waveform.name}' does not exist in IDS, so it is not exported."
@@ -170,16 +204,18 @@ class ConfigurationExporter:
             ids: The IDS to populate with waveform data.
             waveforms: A list of waveform objects to be filled into the IDS.
         """
-        # Ensure get_value is only called once per waveform
+        # Evaluate all waveforms of this IDS in a single pass
         values_per_waveform = []
+        all_values = self.config.evaluate(
+            self.times, [wf.name for wf in waveforms], optimize=True
+        )
 
         # We iterate through the waveforms in reverse order because they are typically
         # ordered with increasing indices. By processing them in reverse, we avoid
         # unnecessary repeated resizing.
-        for waveform in reversed(waveforms):
+        for waveform, values in zip(reversed(waveforms), all_values[::-1], strict=True):
             logger.debug(f"Filling {waveform.name}...")
             path = IDSPath("/".join(waveform.name.split("/")[1:]))
-            _, values = waveform.get_value(self.times)
             values_per_waveform.append((path, values))
             self._fill_nodes_recursively(ids, path, values, fill=False)
             self._increment_progress()
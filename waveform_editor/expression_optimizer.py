@@ -0,0 +1,181 @@
+import ast
+import copy
+import hashlib
+from collections import Counter
+
+import numpy as np
+
+from waveform_editor.derived_waveform import ExpressionCompiler
+
+# Node types which are folded into constants, or shared between expressions
+SHAREABLE_NODES = (ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.Call)
+# Types of the results which may be substituted as a constant in an expression
+CONSTANT_TYPES = (bool, int, float, complex)
+
+
+def is_dependency(node):
+    """Check whether an AST node refers to a dependency, i.e. ``__w["name"]``."""
+    return (
+        isinstance(node, ast.Subscript)
+        and isinstance(node.value, ast.Name)
+        and node.value.id == "__w"
+    )
+
+
+def get_dependencies(tree):
+    """Return the names of all dependencies referenced in an expression tree."""
+    return {node.slice.value for node in ast.walk(tree) if is_dependency(node)}
+
+
+class ConstantFolder(ast.NodeTransformer):
+    """
+    AST transformer replacing subtrees which do not depend on any waveform by the
+    constant they evaluate to.
+    """
+
+    def __init__(self):
+        self.num_folded = 0
+
+    def generic_visit(self, node):
+        node = super().generic_visit(node)
+        if not isinstance(node, SHAREABLE_NODES) or not self._is_foldable(node):
+            return node
+        try:
+            evaluator = ExpressionCompiler().compile(ast.Expression(body=node))
+            value = evaluator({})
+        except Exception:
+            # Leave it to the evaluation of the expression to report the error
+            return node
+        if isinstance(value, np.float64):
+            value = value.item()
+        if type(value) not in CONSTANT_TYPES:
+            return node
+        self.num_folded += 1
+        return ast.copy_location(ast.Constant(value=value), node)
+
+    def _is_foldable(self, node):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.keyword):
+                child = child.value
+            if isinstance(child, ast.Name):
+                if not (isinstance(node, ast.Call) and child is node.func):
+                    return False
+            elif isinstance(child, ast.expr) and not isinstance(child, ast.Constant):
+                return False
+        return True
+
+
+class SubexpressionSharer(ast.NodeTransformer):
+    """
+    AST transformer replacing shared subtrees by a reference to a subexpression,
+    whose values are cached in the evaluation session.
+
+    Subexpressions are named after a hash of their contents, such that different
+    optimizers which share an evaluation session only share the values of identical
+    subexpressions.
+    """
+
+    def __init__(self, shared):
+        self.shared = shared
+        self.names = {}
+        self.trees = {}
+
+    def visit(self, node):
+        if isinstance(node, SHAREABLE_NODES):
+            key = ast.dump(node)
+            if key in self.shared:
+                if key not in self.names:
+                    digest = hashlib.sha256(key.encode()).hexdigest()
+                    name = f"<subexpression {digest}>"
+                    self.names[key] = name
+                    # Nested subtrees may be shared as well
+                    self.trees[name] = super().visit(node)
+                return ast.copy_location(
+                    ast.Subscript(
+                        value=ast.Name(id="__w", ctx=ast.Load()),
+                        slice=ast.Constant(value=self.names[key]),
+                        ctx=ast.Load(),
+                    ),
+                    node,
+                )
+        return super().visit(node)
+
+
+class ExpressionOptimizer:
+    """Optimized evaluation of a set of derived waveforms.
+
+    Constant subexpressions are folded, and subexpressions which occur multiple times
+    (in the same or in different derived waveforms) are evaluated only once per time
+    array, by caching their values in the evaluation session. The optimized
+    expressions evaluate to exactly the same values as the original expressions.
+    """
+
+    def __init__(self, waveforms):
+        """Optimize the expressions of derived waveforms.
+
+        Args:
+            waveforms: List of derived waveforms to optimize.
+        """
+        folder = ConstantFolder()
+        trees = {}
+        for waveform in waveforms:
+            if waveform.expression_tree is not None:
+                trees[waveform.name] = folder.visit(
+                    copy.deepcopy(waveform.expression_tree)
+                )
+        self.num_folded = folder.num_folded
+
+        counts = Counter(
+            ast.dump(node)
+            for tree in trees.values()
+            for node in ast.walk(tree)
+            if isinstance(node, SHAREABLE_NODES) and get_dependencies(node)
+        )
+        sharer = SubexpressionSharer({key for key, num in counts.items() if num > 1})
+        self.waveforms = {wf.name: wf for wf in waveforms}
+        self.expressions = {
+            name: self._compile(sharer.visit(tree)) for name, tree in trees.items()
+        }
+        self.subexpressions = {
+            name: self._compile(ast.Expression(body=tree))
+            for name, tree in sharer.trees.items()
+        }
+
+    @staticmethod
+    def _compile(tree):
+        return ExpressionCompiler().compile(tree), get_dependencies(tree)
+
+    def evaluate(self, name, time, session):
+        """Evaluate an optimized derived waveform.
+
+        Args:
+            name: Name of the derived waveform.
+            time: The time array on which to evaluate the waveform.
+            session: The evaluation session, containing the values of the
+                dependencies of the waveform.
+
+        Returns:
+            numpy array containing the values of the derived waveform.
+        """
+        evaluator, dependencies = self.expressions[name]
+        eval_context = {
+            dep: self._get_value(dep, time, session) for dep in dependencies
+        }
+        # Don't print the entire NumPy array in the error alert message
+        with np.printoptions(threshold=10):
+            result = evaluator(eval_context)
+        return self.waveforms[name].process_result(time, result)
+
+    def _get_value(self, name, time, session):
+        if name not in self.subexpressions:
+            return session.get_value(name, time)
+        values = session.lookup(name, time)
+        if values is None:
+            evaluator, dependencies = self.subexpressions[name]
+            eval_context = {
+                dep: self._get_value(dep, time, session) for dep in dependencies
+            }
+            with np.printoptions(threshold=10):
+                values = evaluator(eval_context)
+            session.store(name, time, values)
+        return values
@@ -0,0 +1,512 @@
+"""Frozen, immutable representations of waveforms and waveform configurations.
+
+The tendencies of a :class:`~waveform_editor.waveform.Waveform` are
+``param.Parameterized`` objects, which watch their neighbouring tendencies to update
+their values while a waveform is being edited. Paths which only evaluate waveforms
+(such as exporting from the command line, or a MUSCLE3 actor) don't need any of this.
+They can use a frozen snapshot instead, which only stores the resolved values of every
+tendency in slots, and evaluates to exactly the same values.
+
+The frozen classes reuse the evaluation methods of their editable counterparts, such
+that there is only a single implementation of every tendency.
+"""
+
+import logging
+from types import MappingProxyType
+
+import numpy as np
+
+from waveform_editor.base_waveform import BaseWaveform, DerivedEvaluable, Evaluable
+from waveform_editor.configuration import WaveformConfiguration, calculate_bounds
+from waveform_editor.derived_waveform import DerivedWaveform
+from waveform_editor.tendencies.base import BaseTendency
+from waveform_editor.tendencies.constant import ConstantTendency
+from waveform_editor.tendencies.linear import LinearTendency
+from waveform_editor.tendencies.periodic.periodic_base import PeriodicBaseTendency
+from waveform_editor.tendencies.periodic.sawtooth_wave import SawtoothWaveTendency
+from waveform_editor.tendencies.periodic.sine_wave import SineWaveTendency
+from waveform_editor.tendencies.periodic.square_wave import SquareWaveTendency
+from waveform_editor.tendencies.periodic.triangle_wave import TriangleWaveTendency
+from waveform_editor.tendencies.piecewise import PiecewiseLinearTendency
+from waveform_editor.tendencies.repeat import RepeatTendency
+from waveform_editor.tendencies.smooth import SmoothTendency
+from waveform_editor.waveform import Waveform, compute_breakpoints
+from waveform_editor.yaml_globals import YamlGlobals
+
+logger = logging.getLogger(__name__)
+
+
+class FrozenObject:
+    """Base class of the frozen objects, whose attributes can't be changed after
+    construction."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__!r} object is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__!r} object is immutable")
+
+    def _set(self, **attributes):
+        """Set attributes during construction of the frozen object."""
+        for name, value in attributes.items():
+            object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        return {
+            name: getattr(self, name)
+            for cls in type(self).__mro__
+            for name in getattr(cls, "__slots__", ())
+        }
+
+    def __setstate__(self, state):
+        # Unpickled arrays are writable, make them read-only again
+        for value in state.values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+        self._set(**state)
+
+
+def _read_only(array):
+    """Return a read-only copy of an array. Arrays which are already read-only, such
+    as memory-mapped data files, are not copied."""
+    if not array.flags.writeable and array.dtype == float:
+        return array
+    array = np.array(array, dtype=float)
+    array.setflags(write=False)
+    return array
+
+
+class FrozenTendency(FrozenObject):
+    """Frozen tendency, storing the resolved times and boundary values of a tendency.
+
+    Subclasses store the attributes which are needed to evaluate the tendency, as
+    listed in their ``__slots__``.
+    """
+
+    __slots__ = (
+        "start",
+        "end",
+        "duration",
+        "start_value",
+        "end_value",
+        "start_derivative",
+        "end_derivative",
+    )
+
+    def __init__(self, tendency):
+        """Freeze a tendency.
+
+        Args:
+            tendency: The tendency to freeze.
+        """
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                value = getattr(tendency, name, None)
+                if isinstance(value, np.ndarray):
+                    value = _read_only(value)
+                self._set(**{name: value})
+
+    def __repr__(self):
+        return f"{type(self).__name__}(start={self.start!r}, end={self.end!r})"
+
+    sample = BaseTendency.sample
+    value_at = BaseTendency.value_at
+    get_value_and_derivative = BaseTendency.get_value_and_derivative
+
+
+class FrozenConstantTendency(FrozenTendency):
+    __slots__ = ("value",)
+
+    get_value = ConstantTendency.get_value
+    get_derivative = ConstantTendency.get_derivative
+    value_at = ConstantTendency.value_at
+
+
+class FrozenLinearTendency(FrozenTendency):
+    __slots__ = ("from_", "to", "rate")
+
+    get_value = LinearTendency.get_value
+    get_derivative = LinearTendency.get_derivative
+    value_at = LinearTendency.value_at
+
+
+class FrozenSmoothTendency(FrozenTendency):
+    __slots__ = ("spline",)
+
+    get_value = SmoothTendency.get_value
+    get_derivative = SmoothTendency.get_derivative
+    get_value_and_derivative = SmoothTendency.get_value_and_derivative
+    sample = SmoothTendency.sample
+    value_at = SmoothTendency.value_at
+
+
+class FrozenPiecewiseLinearTendency(FrozenTendency):
+    __slots__ = ("time", "value", "_slopes")
+
+    def __init__(self, tendency):
+        super().__init__(tendency)
+        self._set(_slopes=_read_only(tendency._get_slopes()))
+
+    get_value = PiecewiseLinearTendency.get_value
+    get_derivative = PiecewiseLinearTendency.get_derivative
+    get_value_and_derivative = PiecewiseLinearTendency.get_value_and_derivative
+    value_at = PiecewiseLinearTendency.value_at
+    _get_slopes = PiecewiseLinearTendency._get_slopes
+    _find_segments = PiecewiseLinearTendency._find_segments
+
+
+class FrozenPeriodicTendency(FrozenTendency):
+    __slots__ = ("base", "amplitude", "frequency", "period", "phase")
+
+    _calc_envelope = PeriodicBaseTendency._calc_envelope
+
+
+class FrozenSineWaveTendency(FrozenPeriodicTendency):
+    __slots__ = ()
+
+    get_value = SineWaveTendency.get_value
+    get_derivative = SineWaveTendency.get_derivative
+    sample = SineWaveTendency.sample
+    value_at = SineWaveTendency.value_at
+    _calc_sine = SineWaveTendency._calc_sine
+
+
+class FrozenSquareWaveTendency(FrozenPeriodicTendency):
+    __slots__ = ()
+
+    get_value = SquareWaveTendency.get_value
+    sample = SquareWaveTendency.sample
+    get_derivative = SquareWaveTendency.get_derivative
+    value_at = SquareWaveTendency.value_at
+    _calc_square_wave = SquareWaveTendency._calc_square_wave
+    _calc_minimal_square_wave = SquareWaveTendency._calc_minimal_square_wave
+
+
+class FrozenSawtoothWaveTendency(FrozenPeriodicTendency):
+    __slots__ = ()
+
+    get_value = SawtoothWaveTendency.get_value
+    sample = SawtoothWaveTendency.sample
+    get_derivative = SawtoothWaveTendency.get_derivative
+    value_at = SawtoothWaveTendency.value_at
+    _calc_sawtooth_wave = SawtoothWaveTendency._calc_sawtooth_wave
+    _calc_minimal_sawtooth_wave = SawtoothWaveTendency._calc_minimal_sawtooth_wave
+
+
+class FrozenTriangleWaveTendency(FrozenPeriodicTendency):
+    __slots__ = ()
+
+    get_value = TriangleWaveTendency.get_value
+    sample = TriangleWaveTendency.sample
+    get_derivative = TriangleWaveTendency.get_derivative
+    value_at = TriangleWaveTendency.value_at
+    _calc_triangle_wave = TriangleWaveTendency._calc_triangle_wave
+    _calc_phase = TriangleWaveTendency._calc_phase
+    _calc_minimal_triangle_wave = TriangleWaveTendency._calc_minimal_triangle_wave
+
+
+class FrozenRepeatTendency(FrozenTendency):
+    __slots__ = ("waveform", "period", "_period_table")
+
+    def __init__(self, tendency):
+        super().__init__(tendency)
+        self._set(
+            waveform=FrozenWaveform(tendency.waveform),
+            _period_table=tendency._get_period_table() or False,
+        )
+
+    get_value = RepeatTendency.get_value
+    get_derivative = RepeatTendency.get_derivative
+    get_value_and_derivative = RepeatTendency.get_value_and_derivative
+    sample = RepeatTendency.sample
+    value_at = RepeatTendency.value_at
+    _get_period_table = RepeatTendency._get_period_table
+
+
+# Maps the tendency classes to their frozen counterparts
+frozen_tendency_map = {
+    ConstantTendency: FrozenConstantTendency,
+    LinearTendency: FrozenLinearTendency,
+    SmoothTendency: FrozenSmoothTendency,
+    PiecewiseLinearTendency: FrozenPiecewiseLinearTendency,
+    SineWaveTendency: FrozenSineWaveTendency,
+    SquareWaveTendency: FrozenSquareWaveTendency,
+    SawtoothWaveTendency: FrozenSawtoothWaveTendency,
+    TriangleWaveTendency: FrozenTriangleWaveTendency,
+    RepeatTendency: FrozenRepeatTendency,
+}
+
+
+def freeze_tendency(tendency):
+    """Create the frozen counterpart of a tendency.
+
+    Args:
+        tendency: The tendency to freeze.
+
+    Returns:
+        The frozen tendency.
+    """
+    return frozen_tendency_map[type(tendency)](tendency)
+
+
+class FrozenWaveform(FrozenObject, Evaluable):
+    """Frozen snapshot of a :class:`~waveform_editor.waveform.Waveform`.
+
+    The tendencies are stored as a tuple of frozen tendencies, and the tendency
+    breakpoints are computed once on construction.
+    """
+
+    __slots__ = (
+        "name",
+        "metadata",
+        "units",
+        "tendencies",
+        "annotations",
+        "_breakpoints",
+    )
+
+    def __init__(self, waveform):
+        """Freeze a waveform.
+
+        Args:
+            waveform: The waveform to freeze.
+        """
+        tendencies = tuple(freeze_tendency(t) for t in waveform.tendencies)
+        self._set(
+            name=waveform.name,
+            metadata=waveform.metadata,
+            units=waveform.units,
+            tendencies=tendencies,
+            annotations=tuple(waveform.annotations),
+            _breakpoints=compute_breakpoints(tendencies),
+        )
+
+    @classmethod
+    def from_tendencies(cls, name, tendencies, dd_version, annotations=()):
+        """Create a frozen waveform from already frozen tendencies, for example
+        tendencies which were frozen in another process.
+
+        Args:
+            name: Name of the waveform.
+            tendencies: Sequence of frozen tendencies.
+            dd_version: Data dictionary version to look up the metadata with.
+            annotations: Annotations of the waveform.
+
+        Returns:
+            The frozen waveform.
+        """
+        self = cls.__new__(cls)
+        tendencies = tuple(tendencies)
+        self._set(name=name)
+        metadata = BaseWaveform.get_metadata(self, dd_version)
+        self._set(
+            metadata=metadata,
+            units=metadata.units if metadata else "a.u.",
+            tendencies=tendencies,
+            annotations=tuple(annotations),
+            _breakpoints=compute_breakpoints(tendencies),
+        )
+        return self
+
+    def __repr__(self):
+        return f"{type(self).__name__}(name={self.name!r})"
+
+    get_value = Waveform.get_value
+    has_values = Waveform.has_values
+    sample = Waveform.sample
+    get_derivative = Waveform.get_derivative
+    get_value_and_derivative = Waveform.get_value_and_derivative
+    value_at = Waveform.value_at
+    fill_values = Waveform.fill_values
+    iter_values = BaseWaveform.iter_values
+    calc_length = Waveform.calc_length
+    _evaluate_tendencies = Waveform._evaluate_tendencies
+    _fill_tendencies = Waveform._fill_tendencies
+    _get_breakpoints = Waveform._get_breakpoints
+
+
+class FrozenDerivedWaveform(FrozenObject, DerivedEvaluable):
+    """Frozen snapshot of a :class:`~waveform_editor.derived_waveform.DerivedWaveform`.
+
+    The dependencies of the derived waveform are looked up in the frozen
+    configuration it belongs to.
+    """
+
+    __slots__ = (
+        "name",
+        "metadata",
+        "units",
+        "annotations",
+        "config",
+        "dependencies",
+        "is_constant",
+        "expression",
+        "expression_tree",
+        "_evaluator",
+    )
+
+    def __init__(self, waveform, config):
+        """Freeze a derived waveform.
+
+        Args:
+            waveform: The derived waveform to freeze.
+            config: The frozen configuration containing the dependencies.
+        """
+        self._set(
+            name=waveform.name,
+            metadata=waveform.metadata,
+            units=waveform.units,
+            annotations=tuple(waveform.annotations),
+            config=config,
+            dependencies=frozenset(waveform.dependencies),
+            is_constant=waveform.is_constant,
+            expression=waveform.expression,
+            expression_tree=waveform.expression_tree,
+            _evaluator=waveform._evaluator,
+        )
+
+    def __repr__(self):
+        return f"{type(self).__name__}(name={self.name!r})"
+
+    get_value = DerivedWaveform.get_value
+    has_values = BaseWaveform.has_values
+    value_at = DerivedWaveform.value_at
+    evaluate_at = DerivedWaveform.evaluate_at
+    fill_values = BaseWaveform.fill_values
+    iter_values = DerivedWaveform.iter_values
+    process_result = DerivedWaveform.process_result
+    _build_eval_context = DerivedWaveform._build_eval_context
+
+
+class FrozenConfiguration(FrozenObject):
+    """Frozen snapshot of a
+    :class:`~waveform_editor.configuration.WaveformConfiguration`.
+
+    Frozen configurations have no groups: :attr:`waveforms` directly maps the names
+    of the waveforms to the frozen waveforms, in the order of the original
+    configuration. All attributes are read-only.
+    """
+
+    __slots__ = (
+        "globals",
+        "start",
+        "end",
+        "waveforms",
+        "dependency_graph",
+    )
+
+    def __init__(self, config):
+        """Freeze a waveform configuration.
+
+        Args:
+            config: The configuration to freeze.
+        """
+        waveforms = {name: config[name] for name in config.waveform_names}
+        self._freeze(config.globals, waveforms, config.dependency_graph)
+
+    @classmethod
+    def from_waveforms(cls, globals, waveforms, dependency_graph):
+        """Create a frozen configuration from its waveforms, for example waveforms
+        which were frozen in other processes, see
+        :meth:`~waveform_editor.yaml_parser.YamlParser.load_frozen`.
+
+        Args:
+            globals: The globals of the configuration.
+            waveforms: Dictionary mapping the names of the waveforms to the waveforms,
+                which may already be frozen.
+            dependency_graph: The dependency graph of the derived waveforms.
+
+        Returns:
+            The frozen configuration.
+        """
+        self = cls.__new__(cls)
+        self._freeze(globals, waveforms, dependency_graph)
+        return self
+
+    @classmethod
+    def from_yaml(cls, yaml_str, max_workers=None, base_path=None):
+        """Load a configuration from a YAML string, to only evaluate and export it.
+
+        The waveforms are frozen while they are loaded, see
+        :meth:`~waveform_editor.yaml_parser.YamlParser.load_frozen`, such that no
+        editable configuration is created.
+
+        Args:
+            yaml_str: The YAML string to load.
+            max_workers: If provided, the waveforms with tendencies are created in
+                parallel, in a pool of this many worker processes.
+            base_path: Directory of the YAML file, see
+                :meth:`~waveform_editor.configuration.WaveformConfiguration.load_yaml`.
+
+        Returns:
+            The frozen configuration.
+
+        Raises:
+            ValueError: If the configuration could not be loaded.
+        """
+        # The configuration only holds the globals while loading
+        config = WaveformConfiguration()
+        config.base_path = base_path
+        try:
+            return config.parser.load_frozen(yaml_str, max_workers)
+        except Exception as e:
+            logger.warning("Got unexpected error: %s", e, exc_info=e)
+            raise ValueError(str(e)) from e
+
+    def _freeze(self, globals, waveforms, dependency_graph):
+        """Freeze the waveforms and set the attributes of the frozen configuration.
+
+        Args:
+            globals: The globals of the configuration.
+            waveforms: Dictionary mapping the names of the waveforms to the waveforms.
+            dependency_graph: The dependency graph of the derived waveforms.
+        """
+        frozen = {}
+        for name, waveform in waveforms.items():
+            if isinstance(waveform, FrozenWaveform):
+                frozen[name] = waveform
+            elif isinstance(waveform, DerivedWaveform):
+                frozen[name] = FrozenDerivedWaveform(waveform, self)
+            else:
+                frozen[name] = FrozenWaveform(waveform)
+        start, end = calculate_bounds(frozen.values())
+        self._set(
+            globals=YamlGlobals(**globals.get()["globals"]),
+            start=start,
+            end=end,
+            waveforms=MappingProxyType(frozen),
+            dependency_graph=dependency_graph.copy(),
+        )
+
+    def __getitem__(self, key):
+        """Retrieves a waveform by name.
+
+        Args:
+            key: The name of the waveform to retrieve.
+
+        Returns:
+            The requested frozen waveform.
+        """
+        if key in self.waveforms:
+            return self.waveforms[key]
+        raise KeyError(f"{key!r} not found in waveforms")
+
+    @property
+    def waveform_names(self):
+        """List with the names of all waveforms, in the order of the original
+        configuration."""
+        return list(self.waveforms)
+
+    def _get_waveform(self, name):
+        return self.waveforms[name]
+
+    def _evaluation_levels(self, names):
+        return self.dependency_graph.levels_for(names, known=self.waveforms)
+
+    evaluate = WaveformConfiguration.evaluate
+    values_at = WaveformConfiguration.values_at
+    iter_evaluate = WaveformConfiguration.iter_evaluate
+    evaluation_session = WaveformConfiguration.evaluation_session
+    session = WaveformConfiguration.session
@@ -1,11 +1,25 @@
+import logging
 import textwrap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 import panel as pn
 import param
+from panel.io.state import set_curdoc
 from panel.viewable import Viewer
 
 from waveform_editor.derived_waveform import DerivedWaveform
+from waveform_editor.util import State
 from waveform_editor.waveform import Waveform
+from waveform_editor.yaml_parser import YamlParser
+
+# Time (in seconds) to wait after a change of the editor text before it is parsed. Any
+# further changes within this time supersede the pending change.
+PARSE_DELAY = 0.15
+
+logger = logging.getLogger(__name__)
 
 
 class WaveformEditor(Viewer):
@@ -29,6 +43,18 @@ class WaveformEditor(Viewer):
         super().__init__()
         self.config = config
 
+        # The editor text is parsed on a worker thread, to keep the event loop
+        # responsive. Every change increments the generation, results of older
+        # generations are discarded.
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="waveform-editor")
+        self._lock = threading.Lock()
+        self._generation = 0
+        if pn.state.curdoc is not None:
+            pn.state.on_session_destroyed(lambda session_context: self.close())
+        # Parsed waveform and its sampled values, for plotting
+        self._sampled = None, None
+        self.parse_synchronously = State()
+
         has_error = self.param.error_message.rx.bool()
 
         self.error_alert = pn.pane.Alert(
@@ -59,6 +85,8 @@ class WaveformEditor(Viewer):
             waveform: Name of the waveform to edit. Can be set to None to disable the
                 editor.
         """
+        with self._lock:
+            self._generation += 1  # Discard results for the previous waveform
         self.waveform = None if waveform is None else self.config[waveform]
         self.error_message = ""
         if self.waveform is None:
@@ -71,38 +99,148 @@ class WaveformEditor(Viewer):
     def on_value_change(self, event):
         """Update the plot based on the YAML editor input.
 
+        The text is parsed on a worker thread, after a short delay in which further
+        changes supersede this one. Only the result of the latest change is applied,
+        on the event loop. Within :attr:`parse_synchronously`, or when there is no
+        Bokeh document, the text is parsed and applied immediately instead, reusing
+        the unchanged tendencies of the current waveform.
+
         Args:
             event: Event containing the code editor value input.
         """
         if self.waveform is None:
             return
 
-        # Parse waveform YAML
-        editor_text = event.new
-        name = self.waveform.name
-        # Merge code editor string with name into a single YAML string, ensure that
-        # dashed lists are placed below the key containing the waveform name
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        waveform_yaml = self._merge_yaml(self.waveform.name, event.new)
+        doc = pn.state.curdoc
+        if self.parse_synchronously or doc is None:
+            # Without a document, there is no event loop to apply the result on
+            self._parse_now(waveform_yaml, generation)
+        else:
+            deadline = time.monotonic() + PARSE_DELAY
+            self._executor.submit(self._parse, waveform_yaml, generation, doc, deadline)
+
+    def _merge_yaml(self, name, editor_text):
+        """Merge code editor string with name into a single YAML string.
+
+        Args:
+            name: Name of the waveform.
+            editor_text: Contents of the code editor.
+
+        Returns:
+            The YAML string of the waveform.
+        """
+        # Ensure that dashed lists are placed below the key containing the waveform name
         if editor_text.lstrip().startswith("- "):
-            waveform_yaml = f"{name}:\n{editor_text}"
+            return f"{name}:\n{editor_text}"
         # Derived waveforms are parsed as YAML block strings
-        elif "'" in editor_text or '"' in editor_text:
+        if "'" in editor_text or '"' in editor_text:
             indented_text = textwrap.indent(editor_text, "  ")
-            waveform_yaml = f"{name}: |\n{indented_text}"
-        else:
-            waveform_yaml = f"{name}: {editor_text}"
-        waveform = self.config.parse_waveform(waveform_yaml)
-        self.handle_exceptions(waveform)
-        if not self.error_message:
+            return f"{name}: |\n{indented_text}"
+        return f"{name}: {editor_text}"
+
+    def _parse_now(self, waveform_yaml, generation):
+        """Parse a waveform on the event loop and apply it. The tendencies of unchanged
+        entries are reused from the current waveform.
+
+        Args:
+            waveform_yaml: The YAML string of the waveform.
+            generation: Generation of the change of the editor text.
+        """
+        parser = YamlParser(self.config)
+        previous = self.waveform if isinstance(self.waveform, Waveform) else None
+        waveform = parser.parse_waveform(waveform_yaml, previous=previous)
+        self._apply(waveform, parser.parse_errors, None, generation)
+
+    def _parse(self, waveform_yaml, generation, doc, deadline):
+        """Parse and sample a waveform on the worker thread, and schedule applying it
+        on the event loop.
+
+        The waveform is parsed from scratch with its own parser, such that the worker
+        thread does not touch the current waveform or any other shared state.
+
+        Args:
+            waveform_yaml: The YAML string of the waveform.
+            generation: Generation of the change of the editor text.
+            doc: The Bokeh document to schedule applying the waveform on.
+            deadline: Monotonic time until which to wait for further changes, before
+                parsing.
+        """
+        if generation == self._generation:
+            time.sleep(max(deadline - time.monotonic(), 0))
+        with self._lock:
+            if generation != self._generation:
+                return  # Superseded by a newer change
+
+        try:
+            parser = YamlParser(self.config)
+            waveform = parser.parse_waveform(waveform_yaml)
+            sampled = None
+            # Derived waveforms are evaluated through the configuration, which is
+            # owned by the event loop
+            if isinstance(waveform, Waveform) and not waveform.annotations:
+                sampled = waveform.get_value()
+        except Exception:
+            logger.exception("Failed to parse the waveform")
+            return
+
+        apply = partial(self._apply, waveform, parser.parse_errors, sampled, generation)
+        with set_curdoc(doc):
+            pn.state.execute(apply, schedule=True)
+
+    def _apply(self, waveform, parse_errors, sampled, generation):
+        """Apply a parsed waveform to the editor, unless it was superseded. This is
+        always called on the event loop.
+
+        Args:
+            waveform: The parsed waveform.
+            parse_errors: Errors that occurred while parsing the YAML.
+            sampled: Tuple with the sampled time and values of the waveform, or None.
+            generation: Generation of the change of the editor text.
+        """
+        with self._lock:
+            is_latest = generation == self._generation
+        if is_latest:
+            self.handle_exceptions(waveform, parse_errors)
+        if is_latest and not self.error_message:
+            self._sampled = waveform, sampled
             self.waveform = waveform
             self.save_waveform()
+        elif isinstance(waveform, Waveform):
+            # The current waveform remains in use, so it needs its tendencies back
+            waveform.restore_previous()
+
+    def close(self):
+        """Stop the worker thread which parses the editor text. Pending changes are
+        discarded."""
+        with self._lock:
+            self._generation += 1
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_plot_values(self, waveform):
+        """Return the time and values to plot a waveform, which are sampled while
+        parsing the waveform if possible.
+
+        Args:
+            waveform: The waveform to plot.
+
+        Returns:
+            Tuple containing the time and the values of the waveform.
+        """
+        sampled_waveform, sampled = self._sampled
+        if sampled_waveform is waveform and sampled is not None:
+            return sampled
+        return waveform.get_value()
 
-    def handle_exceptions(self, waveform):
+    def handle_exceptions(self, waveform, parse_errors):
         annotations = waveform.annotations
         self.code_editor.annotations = list(annotations)
-        if self.config.parser.parse_errors:  # Handle errors
+        if parse_errors:  # Handle errors
             self.error_message = (
-                "### The YAML did not parse correctly\n  "
-                + f"{self.config.parser.parse_errors[0]}"
+                f"### The YAML did not parse correctly\n  {parse_errors[0]}"
             )
             self.alert_type = "danger"
         elif annotations:
@@ -72,7 +72,7 @@ class WaveformEditorGui(param.Parameterized):
 
         # Main views: view and edit tabs
         self.editor = WaveformEditor(self.config)
-        self.plotter_view = PlotterView()
+        self.plotter_view = PlotterView(self.config)
         self.plotter_edit = PlotterEdit(self.editor)
         globals_editor = pn.Param(
             self.config.globals.param,
@@ -167,16 +167,18 @@ class WaveformEditorGui(param.Parameterized):
         with open(path) as file:
             yaml_content = file.read()
 
-        self.load_yaml(yaml_content)
+        self.load_yaml(yaml_content, base_path=path.parent)
         self.io_manager.open_file = path
 
-    def load_yaml(self, yaml_content):
+    def load_yaml(self, yaml_content, base_path=None):
         """Load waveform configuration from YAML string.
 
         Args:
             yaml_content: YAML string to load.
+            base_path: Directory against which relative paths of data files are
+                resolved.
         """
-        self.config.load_yaml(yaml_content)
+        self.config.load_yaml(yaml_content, base_path=base_path)
         if self.config.load_error:
             raise RuntimeError(
                 "YAML could not be loaded:<br>"
@@ -54,11 +54,12 @@ class PlotterEdit(Viewer):
             self.pane.object = hv.Curve(([], []), self.xlabel, self.ylabel)
             return
 
-        # Find all piecewise linear tendencies
+        # Find all piecewise linear tendencies, except the ones which are loaded from
+        # a data file, since those can't be edited in the YAML
         pwl_tendencies = [
             tendency
             for tendency in self.plotted_waveform.tendencies
-            if isinstance(tendency, PiecewiseLinearTendency)
+            if isinstance(tendency, PiecewiseLinearTendency) and tendency.file is None
         ]
         if not pwl_tendencies:
             # No need for a CurveEdit stream, just show the whole waveform:
@@ -98,7 +99,8 @@ class PlotterEdit(Viewer):
 
     def main_curve(self, **kwargs):
         """Return a curve representing the whole waveform"""
-        return hv.Curve(self.plotted_waveform.get_value(), self.xlabel, self.ylabel)
+        values = self.editor.get_plot_values(self.plotted_waveform)
+        return hv.Curve(values, self.xlabel, self.ylabel)
 
     def piecewise_click_and_drag(self, data):
         """Updates a piecewise linear tendency in the code editor YAML time/value data.
@@ -161,7 +163,7 @@ class PlotterEdit(Viewer):
 
         # Update data of the piecewise linear tendencies
         for item in items:
-            if item.get("type") == "piecewise":
+            if item.get("type") == "piecewise" and "file" not in item:
                 data_slice = slice(nan_indices[data_idx] + 1, nan_indices[data_idx + 1])
                 time = times[data_slice]
                 item["time"] = [float(x) for x in time]
@@ -170,7 +172,7 @@ class PlotterEdit(Viewer):
 
         output = StringIO()
         yaml.dump(items, output)
-        with self._update_plot_from_drag:
+        with self._update_plot_from_drag, self.editor.parse_synchronously:
             # Overwrite editor with updated data
             self.editor.code_editor.value = output.getvalue()
             # Trigger an update of self.main_curve
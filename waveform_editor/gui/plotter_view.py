@@ -1,43 +1,126 @@
 import holoviews as hv
+import numpy as np
 import panel as pn
 import param
+from holoviews import streams
 from panel.viewable import Viewer
 
+from waveform_editor.derived_waveform import DerivedWaveform
+
+# Number of samples per pixel of the plot width, when the waveforms are evaluated on
+# the visible time range
+SAMPLES_PER_PIXEL = 2
+# Plot width (in pixels) which is assumed until the size of the plot is known
+DEFAULT_PLOT_WIDTH = 1000
+
 
 class PlotterView(Viewer):
-    """Class to plot multiple waveforms in view mode."""
+    """Class to plot multiple waveforms in view mode.
+
+    When the plot is panned or zoomed, the waveforms are re-evaluated on the visible
+    time range at roughly the resolution of the plot, such that the amount of data sent
+    to the browser does not depend on the length of the waveforms. Range updates are
+    debounced by HoloViews, and the waveforms are evaluated on a time range that is
+    twice as wide as the visible range. Panning and zooming within that time range
+    reuses the evaluated curves, as long as their resolution suffices.
+    """
 
     plotted_waveforms = param.Dict(default={})
 
-    def __init__(self, **params):
+    def __init__(self, config, **params):
         super().__init__(**params)
+        self.config = config
         self.pane = pn.pane.HoloViews(sizing_mode="stretch_both")
+        # Tuple of (evaluated time range, number of points, overlay) of the last plot
+        self._plotted = None
         self.update_plot()
 
     @param.depends("plotted_waveforms", watch=True)
     def update_plot(self):
+        """
+        Create a dynamic overlay of the selected waveforms, which is updated whenever
+        the visible time range or the size of the plot changes, and update the plot
+        pane.
+        """
+        self._plotted = None
+        if not self.plotted_waveforms:
+            self.pane.object = self.plot_waveform(None)
+            return
+
+        range_stream = streams.RangeX()
+        size_stream = streams.PlotSize()
+        self.pane.object = hv.DynamicMap(
+            self.plot_overlay, streams=[range_stream, size_stream]
+        )
+
+    def plot_overlay(self, x_range=None, width=None, **kwargs):
         """
         Generate curves for each selected waveform and combine them into a Holoviews
-        Overlay object, and update the plot pane.
+        Overlay object.
+
+        Args:
+            x_range: Tuple with the visible time range, or None to plot the full
+                waveforms.
+            width: Width of the plot in pixels.
+            kwargs: Other stream parameters, which are ignored.
+
+        Returns:
+            A Holoviews Overlay object.
         """
-        curves = []
-        for waveform in self.plotted_waveforms.values():
-            curve = self.plot_waveform(waveform)
-            curve = curve.opts(line_width=2, framewise=True, show_legend=True)
-            curves.append(curve)
+        num_points = SAMPLES_PER_PIXEL * (width or DEFAULT_PLOT_WIDTH)
+        if x_range is not None:
+            x_range = (float(x_range[0]), float(x_range[1]))
+        if self._is_plotted(x_range, num_points):
+            return self._plotted[2]
 
-        if not curves:
-            curves = [self.plot_waveform(None)]
+        time = None
+        if x_range is not None:
+            start, end = x_range
+            padding = 0.5 * (end - start)
+            time = np.linspace(start - padding, end + padding, 2 * num_points)
+
+        curves = []
+        # Evaluate all waveforms in a single session, such that dependencies which are
+        # shared between derived waveforms are only evaluated once
+        with self.config.evaluation_session():
+            for waveform in self.plotted_waveforms.values():
+                curve = self.plot_waveform(waveform, time, num_points)
+                curve = curve.opts(line_width=2, framewise=True, show_legend=True)
+                curves.append(curve)
 
         overlay = hv.Overlay(curves).opts(title="", show_legend=True)
-        self.pane.object = overlay
+        self._plotted = (x_range, num_points, overlay)
+        return overlay
+
+    def _is_plotted(self, x_range, num_points):
+        """Check whether the last plotted overlay covers the visible time range, at a
+        sufficient resolution."""
+        if self._plotted is None:
+            return False
+        plotted_range, plotted_points, _ = self._plotted
+        if plotted_points != num_points:
+            return False
+        if x_range is None or plotted_range is None:
+            return x_range == plotted_range
+        start, end = x_range
+        plotted_start, plotted_end = plotted_range
+        padding = 0.5 * (plotted_end - plotted_start)
+        return (
+            plotted_start - padding <= start
+            and end <= plotted_end + padding
+            and end - start >= padding
+        )
 
-    def plot_waveform(self, waveform):
+    def plot_waveform(self, waveform, time=None, num_points=DEFAULT_PLOT_WIDTH):
         """
         Store the tendencies of a waveform into a holoviews curve.
 
         Args:
             waveform: The waveform to convert to a holoviews curve.
+            time: The time array on which to evaluate the waveform. If None, the
+                default time array of the waveform is used.
+            num_points: Number of points on which to evaluate a derived waveform, when
+                no time array is provided.
 
         Returns:
             A Holoviews Curve object.
@@ -48,7 +131,9 @@ class PlotterView(Viewer):
 
         if waveform is None:
             return hv.Curve(([], []), xlabel, ylabel)
-        times, values = waveform.get_value()
+        if time is None and isinstance(waveform, DerivedWaveform):
+            time = np.linspace(self.config.start, self.config.end, num_points)
+        times, values = waveform.get_value(time)
 
         return hv.Curve((times, values), xlabel, ylabel, label=waveform.name)
 
@@ -8,7 +8,6 @@ from libmuscle import Instance, InstanceFlags, Message
 from ymmsl import Operator
 
 from waveform_editor.cli import load_config
-from waveform_editor.configuration import WaveformConfiguration
 from waveform_editor.exporter import ConfigurationExporter
 
 logger = logging.getLogger(__name__)
@@ -25,17 +24,18 @@ def waveform_actor():
 
     # Settings
     fname = None
-    config = WaveformConfiguration()
+    config = None
 
     while instance.reuse_instance():
         # Apply settings
         new_fname = Path(instance.get_setting("waveforms"))
+        workers = instance.get_setting("workers", "int", default=0) or None
 
         # Load (new) waveform configuration
         if new_fname != fname:
             fname = new_fname
             logger.info("Loading waveform configuration from %s", fname)
-            load_config(config, fname)
+            config = load_config(fname, workers)
 
         ports = instance.list_ports()
         if len(ports.get(Operator.F_INIT, [])) != 1:
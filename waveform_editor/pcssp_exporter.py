@@ -1,19 +1,35 @@
+import tempfile
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
+import numpy as np
+
+from waveform_editor.base_waveform import CHUNK_SIZE
+
+INDENT = "  "
+# Tag of the element which marks where the streamed elements are inserted
+PLACEHOLDER = "PLACEHOLDER"
+
 
 class PCSSPExporter:
     """Exports waveform configuration into PCSSP-compatible XML format. Information on
     the PCSSP can be found here: https://github.com/iterorganization/PCSSP
     """
 
-    def __init__(self, config, times):
+    def __init__(self, config, times, chunk_size=CHUNK_SIZE, names=None):
         self.config = config
         self.times = times
+        self.chunk_size = chunk_size
+        # Names of the waveforms to export, all waveforms are exported if None
+        self.names = config.waveform_names if names is None else names
 
     def export(self, file_path):
         """Export configuration as an PCSSP XML file.
 
+        The waveforms are evaluated together in chunks of the time array, such that
+        shared dependencies are evaluated only once, and the values of all waveforms
+        are never kept in memory at once.
+
         Args:
             file_path: Destination file path for the XML output.
         """
@@ -36,12 +52,34 @@ class PCSSPExporter:
                 "wd_target": "EHTerm1",
             },
         )
-        self._add_trajectories(segment)
+        trajectories = ET.SubElement(segment, "SIGNALS_TRAJECTORIES")
+        ET.SubElement(trajectories, PLACEHOLDER)
+        head, tail = self._split_at_placeholder(root, level=0)
 
-        tree = ET.ElementTree(root)
-        ET.indent(tree, space="  ", level=0)
         Path(file_path).parent.mkdir(parents=True, exist_ok=True)
-        tree.write(file_path, encoding="utf-8", xml_declaration=True)
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write("<?xml version='1.0' encoding='utf-8'?>\n")
+            file.write(head)
+            self._write_trajectories(file, level=4)
+            file.write(tail)
+
+    @staticmethod
+    def _split_at_placeholder(element, level):
+        """Serialize an indented XML element, and split it at its placeholder element.
+
+        Args:
+            element: XML element containing a placeholder element.
+            level: Indentation level of the element.
+
+        Returns:
+            Tuple containing the XML text before and after the line of the placeholder.
+        """
+        ET.indent(element, space=INDENT, level=level)
+        text = ET.tostring(element, encoding="unicode")
+        index = text.index(f"<{PLACEHOLDER} />")
+        start = text.rindex("\n", 0, index) + 1
+        end = text.index("\n", index) + 1
+        return INDENT * level + text[:start], text[end:]
 
     def _add_signals(self, parent):
         """Add signals from waveforms to the given XML parent element.
@@ -49,8 +87,8 @@ class PCSSPExporter:
         Args:
             parent: XML element to append the signal elements to.
         """
-        for wf_name, group in self.config.waveform_map.items():
-            waveform = group[wf_name]
+        for wf_name in self.names:
+            waveform = self.config[wf_name]
             desc = "" if not waveform.metadata else waveform.metadata.documentation
             signal = {
                 "name": waveform.name,
@@ -62,22 +100,60 @@ class PCSSPExporter:
             }
             ET.SubElement(parent, "SIGNAL", signal)
 
-    def _add_trajectories(self, segment):
-        """Add trajectories to a XML segment based on the values of the waveforms.
+    def _write_trajectories(self, file, level):
+        """Write the trajectories of all waveforms, based on their values.
+
+        The values of all waveforms are evaluated together in chunks, which are
+        buffered in a temporary binary file with the values of every waveform stored
+        contiguously. The trajectories are then written one by one from this buffer.
+        Waveforms without values get an empty trajectory.
 
         Args:
-            segment: XML trajectories element to append trajectories to.
+            file: File object to write the XML trajectories to.
+            level: Indentation level of the trajectory elements.
         """
-        trajectories = ET.SubElement(segment, "SIGNALS_TRAJECTORIES")
-        for wf_name, group in self.config.waveform_map.items():
-            waveform = group[wf_name]
-            trajectory = ET.SubElement(
-                trajectories, "SIGNAL_TRAJECTORY", {"name": waveform.name}
-            )
-            ET.SubElement(trajectory, "ENTRY_RULE", {"is": "None"})
-            ET.SubElement(trajectory, "EXECUTION_RULE", {"is": "Linear"})
-            ET.SubElement(trajectory, "EXIT_RULE", {"is": "Last"})
-            reference = ET.SubElement(trajectory, "REFERENCE")
-            values = waveform.get_value(self.times)[1]
-            for t, v in zip(self.times, values, strict=True):
-                ET.SubElement(reference, "POINT", {"time": str(t), "value": str(v)})
+        point_indent = INDENT * (level + 2)
+        num_times = len(self.times)
+        names = [name for name in self.names if self.config[name].has_values()]
+        if num_times == 0:
+            names = []
+        rows = {name: i for i, name in enumerate(names)}
+        itemsize = np.dtype(float).itemsize
+        with tempfile.TemporaryFile() as buffer:
+            start = 0
+            for chunk, values in self.config.iter_evaluate(
+                self.times, names, self.chunk_size, optimize=True
+            ):
+                # Store the values per waveform, with a row for every waveform
+                for row, row_values in enumerate(values):
+                    buffer.seek((row * num_times + start) * itemsize)
+                    np.ascontiguousarray(row_values, dtype=float).tofile(buffer)
+                start += len(chunk)
+            buffer.flush()
+            if names:
+                all_values = np.memmap(
+                    buffer, dtype=float, mode="r", shape=(len(names), num_times)
+                )
+
+            for wf_name in self.names:
+                waveform = self.config[wf_name]
+                trajectory = ET.Element("SIGNAL_TRAJECTORY", {"name": waveform.name})
+                ET.SubElement(trajectory, "ENTRY_RULE", {"is": "None"})
+                ET.SubElement(trajectory, "EXECUTION_RULE", {"is": "Linear"})
+                ET.SubElement(trajectory, "EXIT_RULE", {"is": "Last"})
+                reference = ET.SubElement(trajectory, "REFERENCE")
+                ET.SubElement(reference, PLACEHOLDER)
+                head, tail = self._split_at_placeholder(trajectory, level)
+
+                file.write(head)
+                if wf_name in rows:
+                    values = all_values[rows[wf_name]]
+                    for start in range(0, num_times, self.chunk_size):
+                        end = start + self.chunk_size
+                        file.writelines(
+                            f'{point_indent}<POINT time="{t}" value="{v}" />\n'
+                            for t, v in zip(
+                                self.times[start:end], values[start:end], strict=True
+                            )
+                        )
+                file.write(tail + "\n")
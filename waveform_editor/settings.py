@@ -7,6 +7,7 @@ import param
 import yaml
 
 from waveform_editor.gui.util import WarningIndicator
+from waveform_editor.tendencies.sampling import SamplingSettings, sampling_settings
 
 logger = logging.getLogger(__name__)
 
@@ -115,12 +116,15 @@ class UserSettings(param.Parameterized):
 
     nice = param.ClassSelector(class_=NiceSettings, default=NiceSettings())
 
+    sampling = param.ClassSelector(class_=SamplingSettings, default=sampling_settings)
+
     def __init__(self, **params):
         super().__init__(**params)
         self._load_settings()
         self._save_settings()
         self.param.watch(self._save_settings, list(self.param))
         self.nice.param.watch(self._save_settings, list(self.nice.param))
+        self.sampling.param.watch(self._save_settings, list(self.sampling.param))
 
     def _load_settings(self):
         """Load settings from disk and apply them to the current instance."""
@@ -133,9 +137,18 @@ class UserSettings(param.Parameterized):
         if "nice" in settings:
             self.nice.apply_settings(settings["nice"])
 
-        base_settings = {k: v for k, v in settings.items() if k != "nice"}
+        sampling = settings.get("sampling") or {}
+        for key in list(sampling):
+            if key not in self.sampling.param or key == "name":
+                logger.warning(f"Removing unknown sampling setting: {key}")
+                sampling.pop(key)
+        self.sampling.param.update(**sampling)
+
+        base_settings = {
+            k: v for k, v in settings.items() if k not in ("nice", "sampling")
+        }
         for key in list(base_settings):
-            if key not in self.param or key in ("name", "nice"):
+            if key not in self.param or key in ("name", "nice", "sampling"):
                 logger.warning(f"Removing unknown setting: {key}")
                 base_settings.pop(key)
         self.param.update(**base_settings)
@@ -143,11 +156,16 @@ class UserSettings(param.Parameterized):
     def _save_settings(self, event=None):
         """Serialize current configuration to disk in YAML format."""
         config = {
-            p: getattr(self, p) for p in self.param if p != "name" and p != "nice"
+            p: getattr(self, p)
+            for p in self.param
+            if p not in ("name", "nice", "sampling")
         }
 
         if self.gs_solver == "NICE":
             config["nice"] = self.nice.to_dict()
+        config["sampling"] = {
+            p: getattr(self.sampling, p) for p in self.sampling.param if p != "name"
+        }
 
         CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
         with open(CONFIG_FILE, "w") as f:
@@ -156,13 +174,16 @@ class UserSettings(param.Parameterized):
 
     @param.depends("gs_solver")
     def panel(self):
-        params_to_show = [p for p in self.param if p != "nice" and p != "name"]
+        params_to_show = [
+            p for p in self.param if p not in ("nice", "sampling", "name")
+        ]
         base_ui = pn.Param(self.param, parameters=params_to_show)
+        sampling_ui = pn.Param(self.sampling.param, show_name=False)
         if self.gs_solver == "NICE":
             nice_ui = pn.panel(self.nice.param, expand_button=False, expand=True)
-            return pn.Column(base_ui, pn.Spacer(height=10), nice_ui)
+            return pn.Column(base_ui, sampling_ui, pn.Spacer(height=10), nice_ui)
         else:
-            return base_ui
+            return pn.Column(base_ui, sampling_ui)
 
 
 settings = UserSettings()  # Global config object
@@ -94,7 +94,7 @@ class CoilCurrents(Viewer):
         """
         coil_currents = self._get_currents()
         config = self.main_gui.config
-        new_waveforms_created = False
+        new_waveforms = []
 
         if not self._has_valid_export_time():
             return
@@ -104,8 +104,8 @@ class CoilCurrents(Viewer):
             if name not in config.waveform_map:
                 if group_name not in config.groups:
                     config.add_group(group_name, [])
-                self._create_new_waveform(config, name, current, group_name)
-                new_waveforms_created = True
+                waveform = self._create_new_waveform(config, name, current)
+                new_waveforms.append((waveform, [group_name]))
             else:
                 waveform = config[name]
                 if isinstance(waveform, DerivedWaveform):
@@ -116,7 +116,8 @@ class CoilCurrents(Viewer):
                     continue
                 self._append_to_existing_waveform(config, name, current)
 
-        if new_waveforms_created:
+        if new_waveforms:
+            config.add_waveforms(new_waveforms)
             self.main_gui.selector.refresh()
             pn.state.notifications.success(
                 f"New waveform(s) were added in the {group_name!r} group"
@@ -142,7 +143,10 @@ class CoilCurrents(Viewer):
 
         # Either append to existing piecewise linear tendency, or create new
         # piecewise linear tendency
-        if isinstance(last_tendency, PiecewiseLinearTendency):
+        if (
+            isinstance(last_tendency, PiecewiseLinearTendency)
+            and last_tendency.file is None
+        ):
             waveform.yaml[-1]["time"].append(float(self.export_time))
             waveform.yaml[-1]["value"].append(float(current))
             yaml_str = f"{name}:\n{waveform.get_yaml_string()}"
@@ -157,20 +161,21 @@ class CoilCurrents(Viewer):
         new_waveform = config.parse_waveform(yaml_str)
         config.replace_waveform(new_waveform)
 
-    def _create_new_waveform(self, config, name, current, group_name):
+    def _create_new_waveform(self, config, name, current):
         """Create a new waveform for a coil current when none exists.
 
         Args:
             config: The waveform configuration.
             name: Name of the waveform.
             current: Coil current value to append.
-            group_name: Name of the group to place the new waveform in.
+
+        Returns:
+            The new waveform, which still has to be added to the configuration.
         """
         new_piecewise = (
             f"- {{type: piecewise, time: [{self.export_time}], value: [{current}]}}"
         )
-        waveform = config.parser.parse_waveform(f"{name}:\n{new_piecewise}")
-        config.add_waveform(waveform, [group_name])
+        return config.parser.parse_waveform(f"{name}:\n{new_piecewise}")
 
     def _has_valid_export_time(self):
         """Check whether the export time is later than the last tendency endpoint
@@ -176,6 +176,12 @@ class BaseTendency(param.Parameterized):
             prev_tendency: The tendency precedes the current tendency.
         """
         self.prev_tendency = prev_tendency
+        self._check_previous_tendency()
+        self.param.trigger("annotations")
+
+    def _check_previous_tendency(self):
+        """Add annotations when the previous tendency overlaps with this tendency, or
+        when there is a gap between them."""
         # If the tendency is the first tendency of a repeated tendency, it is linked to
         # the last tendency in the repeated tendency. In this case we can ignore this
         # error.
@@ -193,8 +199,6 @@ class BaseTendency(param.Parameterized):
                 )
                 self.annotations.add(self.line_number, error_msg, is_warning=True)
 
-        self.param.trigger("annotations")
-
     def set_next_tendency(self, next_tendency):
         """Sets the next tendency as a param.
 
@@ -203,7 +207,7 @@ class BaseTendency(param.Parameterized):
         """
         self.next_tendency = next_tendency
 
-    @depends("values_changed", watch=True)
+    @depends("values_changed", "times_changed", watch=True)
     def _calc_start_end_values(self):
         """Calculate the values, as well as the derivatives, at the start and end
         of the tendency.
@@ -219,12 +223,38 @@ class BaseTendency(param.Parameterized):
             self.end_value = new_end_value
             self.end_derivative = new_end_derivative
 
+    def _calc_values(self):
+        """Infer the values of the tendency from the user inputs and the neighbouring
+        tendencies. Tendencies whose values depend on their neighbours override this
+        method, and recalculate their values whenever the neighbours change.
+
+        Returns:
+            Whether the values changed.
+        """
+        return False
+
     def _get_value_and_derivative(self, time):
         """Get the value and derivative of the tendency at a given time."""
-        _, value_array = self.get_value(np.array([time]))
-        derivative_array = self.get_derivative(np.array([time]))
+        value_array, derivative_array = self.get_value_and_derivative(np.array([time]))
         return value_array[0], derivative_array[0]
 
+    def get_value_and_derivative(
+        self, time: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the values and the derivatives at the provided time array.
+
+        Subclasses override this when both can be computed at once more efficiently
+        than by calling :meth:`get_value` and :meth:`get_derivative`.
+
+        Args:
+            time: The time array on which to generate points.
+
+        Returns:
+            Tuple containing the values and the derivatives.
+        """
+        _, values = self.get_value(time)
+        return values, self.get_derivative(time)
+
     @abstractmethod
     def get_value(
         self, time: np.ndarray | None = None
@@ -237,6 +267,35 @@ class BaseTendency(param.Parameterized):
         """Get the values of the derivatives at the provided time array."""
         raise NotImplementedError()
 
+    def sample(self, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+        """Generate the time points and values to plot the tendency, as is done by
+        :meth:`get_value` when no time array is provided.
+
+        Subclasses which need many points to represent the tendency sample it
+        adaptively, using at most ``max_points`` points.
+
+        Args:
+            max_points: Maximum number of points to use.
+
+        Returns:
+            Tuple containing the time and its tendency values.
+        """
+        return self.get_value()
+
+    def value_at(self, time: float) -> float:
+        """Get the tendency value at a single time point.
+
+        Subclasses override this with a scalar evaluation, which avoids the overhead
+        of creating arrays when sampling the tendency one time point at a time.
+
+        Args:
+            time: The time point at which to evaluate the tendency.
+
+        Returns:
+            The value of the tendency.
+        """
+        return float(self.get_value(np.array([time]))[1][0])
+
     @depends(
         "prev_tendency.times_changed",
         "user_start",
@@ -250,6 +309,9 @@ class BaseTendency(param.Parameterized):
         are missing, they are calculated based on the given values, or by neighbouring
         tendencies. The calculated start, duration, and end values are stored in their
         respective params.
+
+        Returns:
+            Whether the start, duration or end changed.
         """
 
         inputs = [self.user_start, self.user_duration, self.user_end]
@@ -290,3 +352,5 @@ class BaseTendency(param.Parameterized):
                 self._handle_error(error)
             # Trigger timing event
             self.times_changed = True
+            return True
+        return False
@@ -36,6 +36,17 @@ class ConstantTendency(BaseTendency):
         values = self.value * np.ones(len(time))
         return time, values
 
+    def value_at(self, time: float) -> float:
+        """Get the tendency value at a single time point.
+
+        Args:
+            time: The time point at which to evaluate the tendency.
+
+        Returns:
+            The value of the tendency.
+        """
+        return float(self.value)
+
     def get_derivative(self, time: np.ndarray) -> np.ndarray:
         """Get the values of the derivatives at the provided time array.
 
@@ -57,7 +68,11 @@ class ConstantTendency(BaseTendency):
     def _calc_values(self):
         """Update the actual value. If the `value` keyword is given explicitly by the
         user, this will be used. Otherwise, if there exists a previous its last value
-        will be chosen. If neither one exists, it is set to the default value."""
+        will be chosen. If neither one exists, it is set to the default value.
+
+        Returns:
+            Whether the value changed.
+        """
         value = 0.0  # default
         if self.user_value is None:
             if self.prev_tendency is not None:
@@ -74,3 +89,4 @@ class ConstantTendency(BaseTendency):
             values_changed=values_changed,
             start_value_set=self.user_value is not None,
         )
+        return values_changed
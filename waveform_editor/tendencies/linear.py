@@ -51,6 +51,18 @@ class LinearTendency(BaseTendency):
         values = self.from_ + (self.to - self.from_) * normalized_time
         return time, values
 
+    def value_at(self, time: float) -> float:
+        """Get the tendency value at a single time point.
+
+        Args:
+            time: The time point at which to evaluate the tendency.
+
+        Returns:
+            The value of the tendency.
+        """
+        normalized_time = (time - self.start) / self.duration
+        return float(self.from_ + (self.to - self.from_) * normalized_time)
+
     def get_derivative(self, time: np.ndarray) -> np.ndarray:
         """Get the values of the derivatives at the provided time array.
 
@@ -92,7 +104,11 @@ class LinearTendency(BaseTendency):
         """Determines the from, to and rate values based on the provided user input.
         If values are missing, it will infer the values based on previous or next
         tendencies. If there are none, it will use the default values for that
-        param."""
+        param.
+
+        Returns:
+            Whether the values changed.
+        """
         inputs = [self.user_from, self.user_rate, self.user_to]
         duration = self.duration or 1e-300  # Prevent division by zero
         constraint_matrix = [[1, duration, -1]]  # from + duration * rate - end = 0
@@ -137,3 +153,4 @@ class LinearTendency(BaseTendency):
             values_changed=values_changed,
             start_value_set=start_value_set,
         )
+        return values_changed
@@ -63,7 +63,11 @@ class PeriodicBaseTendency(BaseTendency):
         on_init=True,
     )
     def _calc_values(self):
-        """Update all derived values in a single function"""
+        """Update all derived values in a single function.
+
+        Returns:
+            Whether the values changed.
+        """
 
         # Determine frequency
         frequency = 1.0
@@ -132,3 +136,30 @@ class PeriodicBaseTendency(BaseTendency):
             values_changed=values_changed,
             start_value_set=start_value_set,
         )
+        return values_changed
+
+    def _calc_envelope(self, num_points, func):
+        """Calculates time points and values which represent the envelope of the
+        periodic tendency, for when representing it fully would require too many
+        points.
+
+        The points are spread uniformly over the tendency, and alternate between the
+        minimum and maximum value of the tendency, such that a plot shows the band in
+        which the tendency oscillates.
+
+        Args:
+            num_points: Number of points to use.
+            func: Function which calculates the values of the tendency, which is used
+                for the values at the start and end.
+
+        Returns:
+            Tuple containing the time and the values of the envelope.
+        """
+        num_points = max(num_points, 2)
+        time = np.linspace(self.start, self.end, num_points)
+        low = self.base - abs(self.amplitude)
+        high = self.base + abs(self.amplitude)
+        values = np.where(np.arange(num_points) % 2 == 0, low, high)
+        values[0] = func(self.start)
+        values[-1] = func(self.end)
+        return time, values
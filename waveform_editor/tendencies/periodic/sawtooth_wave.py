@@ -1,6 +1,7 @@
 import numpy as np
 
 from waveform_editor.tendencies.periodic.periodic_base import PeriodicBaseTendency
+from waveform_editor.tendencies.sampling import sampling_settings
 
 
 class SawtoothWaveTendency(PeriodicBaseTendency):
@@ -12,7 +13,7 @@ class SawtoothWaveTendency(PeriodicBaseTendency):
         """Get the tendency values at the provided time array. If no time array is
         provided, a time array will be created from the start to the end of the
         tendency, where time points are defined for every peak and trough in the
-        tendency.
+        tendency, see :meth:`sample`.
 
         Args:
             time: The time array on which to generate points.
@@ -22,11 +23,34 @@ class SawtoothWaveTendency(PeriodicBaseTendency):
         """
 
         if time is None:
-            time, values = self._calc_minimal_sawtooth_wave()
-        else:
-            values = self._calc_sawtooth_wave(time)
+            return self.sample(sampling_settings.max_points)
+        values = self._calc_sawtooth_wave(time)
         return time, values
 
+    def sample(self, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+        """Generate the time points and values which are minimally required to
+        represent the sawtooth wave. If this requires more than the maximum number of
+        points, the envelope of the sawtooth wave is returned instead.
+
+        Args:
+            max_points: Maximum number of points to use.
+
+        Returns:
+            Tuple containing the time and its tendency values.
+        """
+        return self._calc_minimal_sawtooth_wave(max_points)
+
+    def value_at(self, time: float) -> float:
+        """Get the tendency value at a single time point.
+
+        Args:
+            time: The time point at which to evaluate the tendency.
+
+        Returns:
+            The value of the tendency.
+        """
+        return float(self._calc_sawtooth_wave(time))
+
     def get_derivative(self, time: np.ndarray) -> np.ndarray:
         """Get the values of the derivatives at the provided time array.
 
@@ -59,40 +83,46 @@ class SawtoothWaveTendency(PeriodicBaseTendency):
         sawtooth_wave = (t * self.frequency) * 2 - 1
         return self.base + self.amplitude * sawtooth_wave
 
-    def _calc_minimal_sawtooth_wave(self):
+    def _calc_minimal_sawtooth_wave(self, max_points=None):
         """Calculates the time points and values which are minimally required to
         represent the sawtooth wave fully.
 
+        Every drop of the sawtooth wave is represented by two points: the peak just
+        before the drop, and the trough at the drop. The points are generated in
+        sorted order.
+
+        Args:
+            max_points: Maximum number of points. If the sawtooth wave requires more
+                points, its envelope is returned instead. If None, the number of
+                points is not limited.
+
         Returns:
             Tuple containing the time and the sawtooth wave values
         """
-        time = []
-        values = []
         eps = 1e-8 * self.duration / self.frequency
 
-        time.append(self.start)
-        values.append(self._calc_sawtooth_wave(self.start))
-
-        current_time = (
+        # The sawtooth wave drops every period, starting from the first drop after the
+        # start of the tendency
+        first_drop = (
             self.start + self.period / 2 - self.phase / (2 * np.pi) * self.period
         )
-        if current_time < self.start:
-            current_time += self.period
-
-        time.extend(np.arange(current_time, self.end, self.period))
-        time.extend(np.arange(current_time - eps, self.end, self.period))
-        time.sort()
-
-        for i in range(1, len(time)):
-            if i % 2 == 0:
-                values.append(self.base - self.amplitude)
-            else:
-                values.append(self.base + self.amplitude)
-
-        if time[-1] != self.end:
-            time.append(self.end)
-            values.append(self._calc_sawtooth_wave(self.end))
-
-        time = np.array(time)
-        values = np.array(values)
+        if first_drop - eps <= self.start:
+            first_drop += self.period
+        drops = np.arange(first_drop, self.end, self.period)
+
+        num_points = 2 * len(drops) + 2
+        if max_points is not None and num_points > max_points:
+            return self._calc_envelope(max_points, self._calc_sawtooth_wave)
+
+        time = np.empty(num_points)
+        time[0] = self.start
+        time[1:-1:2] = drops - eps
+        time[2:-1:2] = drops
+        time[-1] = self.end
+
+        values = np.empty(num_points)
+        values[0] = self._calc_sawtooth_wave(self.start)
+        values[1:-1:2] = self.base + self.amplitude
+        values[2:-1:2] = self.base - self.amplitude
+        values[-1] = self._calc_sawtooth_wave(self.end)
         return time, values
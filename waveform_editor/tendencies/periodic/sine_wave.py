@@ -1,6 +1,11 @@
 import numpy as np
 
 from waveform_editor.tendencies.periodic.periodic_base import PeriodicBaseTendency
+from waveform_editor.tendencies.sampling import (
+    MIN_POINTS,
+    adaptive_sample,
+    sampling_settings,
+)
 
 
 class SineWaveTendency(PeriodicBaseTendency):
@@ -10,8 +15,8 @@ class SineWaveTendency(PeriodicBaseTendency):
         self, time: np.ndarray | None = None
     ) -> tuple[np.ndarray, np.ndarray]:
         """Get the tendency values at the provided time array. If no time array is
-        provided, a linearly spaced time array will be generated from the start to the
-        end of the tendency.
+        provided, the sine wave is sampled adaptively from the start to the end of the
+        tendency, see :meth:`sample`.
 
         Args:
             time: The time array on which to generate points.
@@ -20,14 +25,39 @@ class SineWaveTendency(PeriodicBaseTendency):
             Tuple containing the time and its tendency values.
         """
         if time is None:
-            sampling_rate = 32 * self.frequency
-            num_steps = int(self.duration * sampling_rate) + 1
-            # Choosing prime number instead of 100k to reduce aliasing artifacts
-            num_steps = min(num_steps, 100003)
-            time = np.linspace(float(self.start), float(self.end), num_steps)
+            return self.sample(sampling_settings.max_points)
         values = self._calc_sine(time)
         return time, values
 
+    def sample(self, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+        """Sample the sine wave adaptively, starting from four points per period.
+
+        The initial grid is capped at ``max_points``. A sine wave with more than
+        ``max_points / 4`` periods is therefore not resolved, and its samples only
+        show an aliased version of the sine wave.
+
+        Args:
+            max_points: Maximum number of points to use.
+
+        Returns:
+            Tuple containing the time and its tendency values.
+        """
+        num_initial = max(int(self.duration * self.frequency * 4) + 1, MIN_POINTS)
+        return adaptive_sample(
+            self._calc_sine, self.start, self.end, num_initial, max_points
+        )
+
+    def value_at(self, time: float) -> float:
+        """Get the tendency value at a single time point.
+
+        Args:
+            time: The time point at which to evaluate the tendency.
+
+        Returns:
+            The value of the tendency.
+        """
+        return float(self._calc_sine(time))
+
     def get_derivative(self, time: np.ndarray) -> np.ndarray:
         """Get the values of the derivatives at the provided time array.
 
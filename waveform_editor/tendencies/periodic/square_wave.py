@@ -1,6 +1,7 @@
 import numpy as np
 
 from waveform_editor.tendencies.periodic.periodic_base import PeriodicBaseTendency
+from waveform_editor.tendencies.sampling import sampling_settings
 
 
 class SquareWaveTendency(PeriodicBaseTendency):
@@ -12,7 +13,7 @@ class SquareWaveTendency(PeriodicBaseTendency):
         """Get the tendency values at the provided time array. If no time array is
         provided, a time array will be created from the start to the end of the
         tendency, where time points are defined for every peak and trough in the
-        tendency.
+        tendency, see :meth:`sample`.
 
         Args:
             time: The time array on which to generate points.
@@ -22,11 +23,34 @@ class SquareWaveTendency(PeriodicBaseTendency):
         """
 
         if time is None:
-            time, values = self._calc_minimal_square_wave()
-        else:
-            values = self._calc_square_wave(time)
+            return self.sample(sampling_settings.max_points)
+        values = self._calc_square_wave(time)
         return time, values
 
+    def sample(self, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+        """Generate the time points and values which are minimally required to
+        represent the square wave. If this requires more than the maximum number of
+        points, the envelope of the square wave is returned instead.
+
+        Args:
+            max_points: Maximum number of points to use.
+
+        Returns:
+            Tuple containing the time and its tendency values.
+        """
+        return self._calc_minimal_square_wave(max_points)
+
+    def value_at(self, time: float) -> float:
+        """Get the tendency value at a single time point.
+
+        Args:
+            time: The time point at which to evaluate the tendency.
+
+        Returns:
+            The value of the tendency.
+        """
+        return float(self._calc_square_wave(time))
+
     def get_derivative(self, time: np.ndarray) -> np.ndarray:
         """Get the values of the derivatives at the provided time array.
 
@@ -52,44 +76,50 @@ class SquareWaveTendency(PeriodicBaseTendency):
         square_wave = np.where(t < (1 / (2 * self.frequency)), 1, -1)
         return self.base + self.amplitude * square_wave
 
-    def _calc_minimal_square_wave(self):
+    def _calc_minimal_square_wave(self, max_points=None):
         """Calculates the time points and values which are minimally required to
         represent the square wave fully.
 
+        Every jump of the square wave is represented by two points: one just before
+        the jump, and one at the jump. The points are generated in sorted order.
+
+        Args:
+            max_points: Maximum number of points. If the square wave requires more
+                points, its envelope is returned instead. If None, the number of
+                points is not limited.
+
         Returns:
             Tuple containing the time and the square wave values
         """
-        time = []
+        half_period = self.period / 2
         eps = 1e-8 * self.duration / self.frequency
 
-        time.append(self.start)
-
-        current_time = (
+        # The square wave jumps every half period, starting from the first jump after
+        # the start of the tendency
+        first_jump = (
             self.start + self.period / 2 - self.phase / (2 * np.pi) * self.period
         )
-        while current_time < self.start:
-            current_time += self.period / 2
-
-        time.extend(np.arange(current_time, self.end, self.period / 2))
-        time.extend(np.arange(current_time - eps, self.end, self.period / 2))
-        time.sort()
-
-        values = [0] * len(time)
-        for i in range(len(time)):
-            if self.phase < np.pi:
-                if i % 4 in {0, 1}:
-                    values[i] = self.base + self.amplitude
-                elif i % 4 in {2, 3}:
-                    values[i] = self.base - self.amplitude
-            else:
-                if i % 4 in {0, 1}:
-                    values[i] = self.base - self.amplitude
-                elif i % 4 in {2, 3}:
-                    values[i] = self.base + self.amplitude
-
-        if time[-1] != self.end:
-            time.append(self.end)
-            values.append(self._calc_square_wave(self.end))
-        time = np.array(time)
-        values = np.array(values)
+        if first_jump - eps <= self.start:
+            first_jump += half_period
+        jumps = np.arange(first_jump, self.end, half_period)
+
+        num_points = 2 * len(jumps) + 2
+        if max_points is not None and num_points > max_points:
+            return self._calc_envelope(max_points, self._calc_square_wave)
+
+        time = np.empty(num_points)
+        time[0] = self.start
+        time[1:-1:2] = jumps - eps
+        time[2:-1:2] = jumps
+        time[-1] = self.end
+
+        # The value alternates between the start value and its mirror image
+        start_value = self._calc_square_wave(self.start)
+        levels = np.full(len(jumps) + 1, start_value, dtype=float)
+        levels[1::2] = 2 * self.base - start_value
+        values = np.empty(num_points)
+        values[0] = start_value
+        values[1:-1:2] = levels[:-1]
+        values[2:-1:2] = levels[1:]
+        values[-1] = self._calc_square_wave(self.end)
         return time, values
@@ -1,6 +1,7 @@
 import numpy as np
 
 from waveform_editor.tendencies.periodic.periodic_base import PeriodicBaseTendency
+from waveform_editor.tendencies.sampling import sampling_settings
 
 
 class TriangleWaveTendency(PeriodicBaseTendency):
@@ -12,7 +13,7 @@ class TriangleWaveTendency(PeriodicBaseTendency):
         """Get the tendency values at the provided time array. If no time array is
         provided, a time array will be created from the start to the end of the
         tendency, where time points are defined for every peak and trough in the
-        tendency.
+        tendency, see :meth:`sample`.
 
         Args:
             time: The time array on which to generate points.
@@ -21,10 +22,34 @@ class TriangleWaveTendency(PeriodicBaseTendency):
             Tuple containing the time and its tendency values.
         """
         if time is None:
-            time = self._calc_minimal_triangle_wave()
+            return self.sample(sampling_settings.max_points)
         values = self._calc_triangle_wave(time)
         return time, values
 
+    def sample(self, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+        """Generate the time points and values of the peaks and troughs of the
+        triangle wave. If there are more than the maximum number of points, the
+        envelope of the triangle wave is returned instead.
+
+        Args:
+            max_points: Maximum number of points to use.
+
+        Returns:
+            Tuple containing the time and its tendency values.
+        """
+        return self._calc_minimal_triangle_wave(max_points)
+
+    def value_at(self, time: float) -> float:
+        """Get the tendency value at a single time point.
+
+        Args:
+            time: The time point at which to evaluate the tendency.
+
+        Returns:
+            The value of the tendency.
+        """
+        return float(self._calc_triangle_wave(time))
+
     def get_derivative(self, time: np.ndarray) -> np.ndarray:
         """Get the values of the derivatives at the provided time array.
 
@@ -63,24 +88,38 @@ class TriangleWaveTendency(PeriodicBaseTendency):
         """
         return 2 * np.pi * self.frequency * (time - self.start) + self.phase - np.pi / 2
 
-    def _calc_minimal_triangle_wave(self):
+    def _calc_minimal_triangle_wave(self, max_points=None):
         """Calculates the time points at which the peaks and troughs of the triangle
         wave occur, which are minimally required to represent the triangle wave fully.
+        The points are generated in sorted order.
+
+        Args:
+            max_points: Maximum number of points. If the triangle wave requires more
+                points, its envelope is returned instead. If None, the number of
+                points is not limited.
 
         Returns:
-            Time array for the triangle wave
+            Tuple containing the time and the triangle wave values
         """
-        time = []
-        time.append(self.start)
-        # Only generate points for the peaks and troughs of the triangle wave
-        current_time = (
+        half_period = 0.5 * self.period
+        # Only generate points for the peaks and troughs of the triangle wave, starting
+        # from the first one after the start of the tendency
+        first_extremum = (
             self.start + 0.25 * self.period - self.phase * self.period / (2 * np.pi)
         )
-        while current_time < self.end:
-            if current_time > self.start:
-                time.append(current_time)
-            current_time += 0.5 * self.period
-        if time[-1] != self.end:
-            time.append(self.end)
-        time = np.array(time)
-        return time
+        first_extremum += np.ceil((self.start - first_extremum) / half_period) * (
+            half_period
+        )
+        if first_extremum - self.start < 1e-8 * half_period:
+            first_extremum += half_period
+        extrema = np.arange(first_extremum, self.end, half_period)
+
+        num_points = len(extrema) + 2
+        if max_points is not None and num_points > max_points:
+            return self._calc_envelope(max_points, self._calc_triangle_wave)
+
+        time = np.empty(num_points)
+        time[0] = self.start
+        time[1:-1] = extrema
+        time[-1] = self.end
+        return time, self._calc_triangle_wave(time)
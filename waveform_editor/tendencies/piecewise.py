@@ -1,9 +1,17 @@
+import os
+
 import numpy as np
 import param
 
 from waveform_editor.annotations import Annotations
 from waveform_editor.tendencies.base import BaseTendency
 
+# Validation results of external data files, keyed by the path, size and modification
+# time of the file. Maps to an error message, or None if the file is valid. Only the
+# results of the most recently validated files are kept.
+_file_validation_cache = {}
+_MAX_CACHED_FILES = 256
+
 
 class PiecewiseLinearTendency(BaseTendency):
     """
@@ -16,12 +24,22 @@ class PiecewiseLinearTendency(BaseTendency):
     value = param.Array(
         default=np.array([0, 1, 2]), doc="The values of the piecewise tendency."
     )
+    file = param.String(
+        default=None,
+        allow_None=True,
+        doc="Path of the .npy file containing the times and values, if they are not "
+        "provided in the YAML.",
+    )
     allow_zero_duration = True
 
-    def __init__(self, user_time=None, user_value=None, **kwargs):
+    def __init__(self, user_time=None, user_value=None, user_file=None, **kwargs):
         self.pre_check_annotations = Annotations()
         self.line_number = kwargs.get("line_number", 0)
-        time, value = self._validate_time_value(user_time, user_value)
+        self._slopes = None
+        if user_file is None:
+            time, value = self._validate_time_value(user_time, user_value)
+        else:
+            time, value = self._load_file(user_file, user_time, user_value)
         self._remove_user_time_params(kwargs)
         super().__init__(
             user_start=time[0],
@@ -30,6 +48,7 @@ class PiecewiseLinearTendency(BaseTendency):
             value=value,
             **kwargs,
         )
+        self.file = user_file
         self.annotations.add_annotations(self.pre_check_annotations)
 
         self.start_value_set = True
@@ -54,6 +73,18 @@ class PiecewiseLinearTendency(BaseTendency):
         interpolated_values = np.interp(time, self.time, self.value)
         return time, interpolated_values
 
+    def value_at(self, time: float) -> float:
+        """Get the tendency value at a single time point, linearly interpolated between
+        the piecewise linear points.
+
+        Args:
+            time: The time point at which to evaluate the tendency.
+
+        Returns:
+            The value of the tendency.
+        """
+        return float(np.interp(time, self.time, self.value))
+
     def get_derivative(self, time: np.ndarray) -> np.ndarray:
         """Get the values of the derivatives at the provided time array.
 
@@ -63,19 +94,52 @@ class PiecewiseLinearTendency(BaseTendency):
         Returns:
             numpy array containing the derivatives
         """
-        if len(self.time) == 1:
-            return np.zeros_like(time, dtype=float)
+        return self._get_slopes()[self._find_segments(time)]
 
-        # Compute piecewise derivatives
-        dv = np.diff(self.value)
-        dt = np.diff(self.time)
-        piecewise_derivatives = dv / dt
+    def get_value_and_derivative(
+        self, time: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the values and the derivatives at the provided time array. The time
+        points are located in the piecewise linear points with a single binary search,
+        which is used for both the values and the derivatives.
 
-        # Assign derivatives based on which interval each time point falls into
-        indices = np.searchsorted(self.time, time, side="right") - 1
-        indices = np.clip(indices, 0, len(piecewise_derivatives) - 1)
+        Args:
+            time: The time array on which to generate points.
+
+        Returns:
+            Tuple containing the values and the derivatives.
+        """
+        indices = self._find_segments(time)
+        derivatives = self._get_slopes()[indices]
+        clipped_time = np.clip(time, self.time[0], self.time[-1])
+        values = self.value[indices] + derivatives * (clipped_time - self.time[indices])
+        # Like np.interp, use the exact value at and after the last point
+        values[clipped_time == self.time[-1]] = self.value[-1]
+        return values, derivatives
+
+    def _get_slopes(self):
+        """Return the slopes of the line segments between the piecewise linear points.
+        The slopes are cached until the times or values change. A single point has a
+        slope of zero.
+        """
+        if self._slopes is None:
+            if len(self.time) == 1:
+                self._slopes = np.zeros(1)
+            else:
+                self._slopes = np.diff(self.value) / np.diff(self.time)
+        return self._slopes
 
-        return piecewise_derivatives[indices]
+    @param.depends("time", "value", watch=True)
+    def _clear_slopes(self):
+        """Invalidate the cached slopes when the times or values change."""
+        self._slopes = None
+
+    def _find_segments(self, time):
+        """Find the index of the line segment of every time point. Time points outside
+        of the piecewise linear points are assigned to the first or last segment.
+        """
+        indices = np.searchsorted(self.time, time, side="right") - 1
+        return np.clip(indices, 0, len(self._get_slopes()) - 1)
 
     def _validate_time_value(self, time, value):
         """Validates the provided time and value lists.
@@ -120,6 +184,33 @@ class PiecewiseLinearTendency(BaseTendency):
         else:
             return self.time, self.value
 
+    def _load_file(self, file, time, value):
+        """Loads the time and value arrays from an external data file.
+
+        Args:
+            file: Path of the data file, see :func:`load_piecewise_file`.
+            time: List of time values, which must not be provided with a file.
+            value: List of values, which must not be provided with a file.
+
+        Returns:
+            Tuple containing the time and value arrays. If any errors are encountered
+            while loading the file, the self.time and self.value defaults are returned
+            instead.
+        """
+        if time is not None or value is not None:
+            error_msg = (
+                "The `time` and `value` arrays cannot be combined with a `file`.\n"
+            )
+            self.pre_check_annotations.add(self.line_number, error_msg)
+            return self.time, self.value
+
+        try:
+            return load_piecewise_file(file)
+        except (OSError, TypeError, ValueError) as error:
+            error_msg = f"Could not load {file!r}: {error}\n"
+            self.pre_check_annotations.add(self.line_number, error_msg)
+            return self.time, self.value
+
     def _remove_user_time_params(self, kwargs):
         """Remove user_start, user_duration, and user_end if they are passed as kwargs,
         and add error messages as annotations. These variables will be set from the
@@ -137,3 +228,67 @@ class PiecewiseLinearTendency(BaseTendency):
                 self.pre_check_annotations.add(
                     line_number, f"'{key.replace('user_', '')}' {error_msg}"
                 )
+
+
+def load_piecewise_file(path):
+    """Load the times and values of a piecewise linear tendency from a ``.npy`` file.
+
+    The file must contain an array of shape (2, N), with the times in the first row and
+    the values in the second row. The file is memory-mapped, such that its data is only
+    read from disk when it is used. Since checking that the times are finite and
+    monotonically increasing requires reading the full file, the result of the
+    validation is cached for as long as the size and modification time of the file do
+    not change, for up to ``_MAX_CACHED_FILES`` files.
+
+    Args:
+        path: Path of the ``.npy`` file. Relative paths are resolved with respect to
+            the current working directory, the YAML parser resolves them against the
+            directory of the YAML file beforehand.
+
+    Returns:
+        Tuple containing the read-only time and value arrays.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file does not contain valid times and values.
+    """
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    data = np.load(path, mmap_mode="r")
+    if data.ndim != 2 or data.shape[0] != 2 or data.shape[1] < 1:
+        raise ValueError(
+            "The file must contain an array of shape (2, N), with N at least 1, "
+            f"but it has shape {data.shape}."
+        )
+    if data.dtype != float:
+        data = data.astype(float)
+        data.setflags(write=False)
+    time, value = data
+
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _file_validation_cache:
+        if len(_file_validation_cache) >= _MAX_CACHED_FILES:
+            # Evict the oldest entry, dictionaries preserve the insertion order
+            del _file_validation_cache[next(iter(_file_validation_cache))]
+        _file_validation_cache[key] = _validate_file_data(time, value)
+    error_msg = _file_validation_cache[key]
+    if error_msg is not None:
+        raise ValueError(error_msg)
+    return time, value
+
+
+def _validate_file_data(time, value):
+    """Validate the time and value arrays of a data file.
+
+    Args:
+        time: The time array.
+        value: The value array.
+
+    Returns:
+        An error message, or None if the arrays are valid.
+    """
+    if not np.all(np.isfinite(time)) or not np.all(np.isfinite(value)):
+        return "The file contains infinite or NaN values."
+    if np.any(np.diff(time) <= 0):
+        return "The time array is not monotonically increasing."
+    return None
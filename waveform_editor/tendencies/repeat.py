@@ -2,6 +2,14 @@ import numpy as np
 import param
 
 from waveform_editor.tendencies.base import BaseTendency
+from waveform_editor.tendencies.constant import ConstantTendency
+from waveform_editor.tendencies.linear import LinearTendency
+from waveform_editor.tendencies.piecewise import PiecewiseLinearTendency
+from waveform_editor.tendencies.sampling import (
+    MIN_POINTS,
+    adaptive_sample,
+    sampling_settings,
+)
 
 
 class RepeatTendency(BaseTendency):
@@ -28,6 +36,7 @@ class RepeatTendency(BaseTendency):
 
         self.waveform = Waveform(waveform=waveform, is_repeated=True)
         self.period = 1
+        self._period_table = None
         super().__init__(**kwargs)
         if not self.waveform.tendencies:
             error_msg = "There are no tendencies in the repeated waveform.\n"
@@ -46,6 +55,8 @@ class RepeatTendency(BaseTendency):
         self.waveform.tendencies[0].user_start = 0
         self.waveform.tendencies[0].set_previous_tendency(self.waveform.tendencies[-1])
         self.waveform.tendencies[-1].set_next_tendency(self.waveform.tendencies[0])
+        # Linking may change the repeated tendencies, after which they are fixed
+        self._period_table = None
 
         self._set_period()
         self.values_changed = True
@@ -85,8 +96,7 @@ class RepeatTendency(BaseTendency):
         self, time: np.ndarray | None = None
     ) -> tuple[np.ndarray, np.ndarray]:
         """Get the tendency values at the provided time array. If no time array is
-        provided, the individual tendencies are responsible for creating a time array,
-        and these are appended.
+        provided, the time array is generated by :meth:`sample`.
 
         Args:
             time: The time array on which to generate points.
@@ -96,39 +106,87 @@ class RepeatTendency(BaseTendency):
         """
         if not self.waveform.tendencies:
             return np.array([0]), np.array([0])
+        if time is None:
+            return self.sample(sampling_settings.max_points)
+
         length = self.waveform.calc_length()
         scaling_factor = self.period / length
+        relative_times = ((time - self.start) % self.period) / scaling_factor
+        table = self._get_period_table()
+        if table is not None:
+            return time, table.get_value(relative_times)
+        _, values = self.waveform.get_value(relative_times)
+        return time, values
 
-        if time is None:
-            time, values = self.waveform.get_value()
-
-            # Compute how many full cycles fit in duration
-            repeat = int(np.ceil(self.duration / self.period))
-            repetition_array = np.arange(repeat) * self.period
-
-            time = (
-                (time * scaling_factor) + repetition_array[:, np.newaxis]
-            ).flatten() + self.start
-            values = np.tile(values, repeat)
-
-            # cut off everything after self.end
-            if not np.isclose(time[-1], self.end):
-                assert time[-1] >= self.end
-                cut_index = np.argmax(time >= self.end)
-                time = time[: cut_index + 1]
-                values = values[: cut_index + 1]
-
-            if time[-1] != self.end:
-                time[-1] = self.end
-                _, end_array = self.waveform.get_value(
-                    np.array([((self.end - self.start) % self.period) / scaling_factor])
-                )
-                values[-1] = end_array[0]
-        else:
-            relative_times = ((time - self.start) % self.period) / scaling_factor
-            _, values = self.waveform.get_value(relative_times)
+    def sample(self, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+        """Generate the time points and values to plot the repeated waveform. The
+        samples of a single period of the repeated waveform are repeated for every
+        repetition. If this would exceed the maximum number of points, the tendency is
+        sampled adaptively instead.
+
+        Args:
+            max_points: Maximum number of points to use.
+
+        Returns:
+            Tuple containing the time and its tendency values.
+        """
+        if not self.waveform.tendencies:
+            return np.array([0]), np.array([0])
+
+        # Compute how many full cycles fit in duration
+        repeat = int(np.ceil(self.duration / self.period))
+        period_time, period_values = self.waveform.sample(
+            max(max_points // repeat, MIN_POINTS)
+        )
+        if len(period_time) * repeat > max_points:
+            return adaptive_sample(
+                lambda time: self.get_value(time)[1],
+                self.start,
+                self.end,
+                max_points // 2,
+                max_points,
+            )
+
+        scaling_factor = self.period / self.waveform.calc_length()
+        offsets = self.start + np.arange(repeat) * self.period
+        time = (period_time * scaling_factor + offsets[:, np.newaxis]).ravel()
+        values = np.tile(period_values, repeat)
+        # The last repetition may be cut off by the end of the tendency
+        num_inside = np.searchsorted(time, self.end, side="right")
+        time, values = time[:num_inside], values[:num_inside]
+        if time[0] != self.start:
+            time = np.concatenate([[self.start], time])
+            values = np.concatenate([self.get_value(time[:1])[1], values])
+        if time[-1] != self.end:
+            time = np.concatenate([time, [self.end]])
+            values = np.concatenate([values, self.get_value(time[-1:])[1]])
         return time, values
 
+    def _get_period_table(self):
+        """Returns the breakpoint table of the repeated waveform, or None if the
+        repeated waveform can't be represented by one, see :class:`PeriodTable`. The
+        table is created when it is first needed, the repeated waveform doesn't change
+        after construction of the tendency.
+        """
+        if self._period_table is None:
+            self._period_table = PeriodTable.from_waveform(self.waveform) or False
+        return self._period_table or None
+
+    def value_at(self, time: float) -> float:
+        """Get the tendency value at a single time point.
+
+        Args:
+            time: The time point at which to evaluate the tendency.
+
+        Returns:
+            The value of the tendency.
+        """
+        if not self.waveform.tendencies:
+            return 0.0
+        scaling_factor = self.period / self.waveform.calc_length()
+        relative_time = ((time - self.start) % self.period) / scaling_factor
+        return self.waveform.value_at(relative_time)
+
     def get_derivative(self, time: np.ndarray) -> np.ndarray:
         """Get the values of the derivatives at the provided time array.
 
@@ -145,6 +203,175 @@ class RepeatTendency(BaseTendency):
         repeat_factor = self.period / length
 
         relative_times = ((time - self.start) % self.period) / repeat_factor
+        table = self._get_period_table()
+        if table is not None:
+            return table.get_derivative(relative_times) / repeat_factor
         derivatives = self.waveform.get_derivative(relative_times) / repeat_factor
 
         return derivatives
+
+    def get_value_and_derivative(
+        self, time: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the values and the derivatives at the provided time array, mapping the
+        time array onto the repeated waveform only once.
+
+        Args:
+            time: The time array on which to generate points.
+
+        Returns:
+            Tuple containing the values and the derivatives.
+        """
+        if not self.waveform.tendencies:
+            return np.array([0]), np.array([0])
+
+        repeat_factor = self.period / self.waveform.calc_length()
+        relative_times = ((time - self.start) % self.period) / repeat_factor
+        table = self._get_period_table()
+        if table is not None:
+            values, derivatives = table.get_value_and_derivative(relative_times)
+        else:
+            values, derivatives = self.waveform.get_value_and_derivative(relative_times)
+        return values, derivatives / repeat_factor
+
+
+class PeriodTable:
+    """Breakpoint table of a single period of a piecewise linear waveform.
+
+    The table contains the breakpoints of all tendencies, and for every breakpoint the
+    value and slope of the line segment which starts there. A time array is evaluated
+    with a single binary search in the breakpoints, instead of evaluating every
+    tendency of the waveform.
+    """
+
+    def __init__(self, time, value, delta_time, delta_value, slope):
+        """Create a breakpoint table. Use :meth:`from_waveform` to create the table of
+        a waveform.
+
+        Args:
+            time: The breakpoints, in increasing order.
+            value: The value at every breakpoint.
+            delta_time: The length of the segment starting at every breakpoint.
+            delta_value: The change in value over the segment starting at every
+                breakpoint.
+            slope: The derivative on the segment starting at every breakpoint.
+        """
+        self.time = time
+        self.value = value
+        self.delta_time = delta_time
+        self.delta_value = delta_value
+        self.slope = slope
+
+    @classmethod
+    def from_waveform(cls, waveform):
+        """Create the breakpoint table of a waveform.
+
+        Only waveforms consisting of contiguous linear, constant and piecewise linear
+        tendencies, starting at 0, can be represented exactly by a breakpoint table.
+
+        Args:
+            waveform: The waveform to create the table for.
+
+        Returns:
+            The breakpoint table, or None if the waveform can't be represented by one.
+        """
+        tendencies = waveform.tendencies
+        if not tendencies or tendencies[0].start != 0:
+            return None
+        segments = []
+        for i, tendency in enumerate(tendencies):
+            if i and tendency.start != tendencies[i - 1].end:
+                return None  # Gaps and overlaps are not supported
+            if isinstance(tendency, LinearTendency):
+                segments.append(
+                    (
+                        [tendency.start, tendency.end],
+                        [tendency.from_, tendency.to],
+                        [tendency.duration],
+                        [tendency.rate],
+                    )
+                )
+            elif isinstance(tendency, ConstantTendency):
+                segments.append(
+                    (
+                        [tendency.start, tendency.end],
+                        [tendency.value, tendency.value],
+                        [tendency.duration],
+                        [0.0],
+                    )
+                )
+            elif isinstance(tendency, PiecewiseLinearTendency):
+                if len(tendency.time) < 2:
+                    return None
+                delta_time = np.diff(tendency.time)
+                slope = tendency._get_slopes()
+                segments.append((tendency.time, tendency.value, delta_time, slope))
+            else:
+                return None
+
+        time, value, delta_time, slope = [], [], [], []
+        for segment_time, segment_value, segment_dt, segment_slope in segments:
+            time.extend(segment_time)
+            value.extend(segment_value)
+            # The last breakpoint of every tendency coincides with the first
+            # breakpoint of the next tendency, and is never used to evaluate the table
+            delta_time.extend(segment_dt)
+            delta_time.append(1.0)
+            slope.extend(segment_slope)
+            slope.append(segment_slope[-1])
+        time = np.array(time, dtype=float)
+        value = np.array(value, dtype=float)
+        delta_value = np.zeros_like(value)
+        delta_value[:-1] = np.diff(value)
+        # Segments of zero length, between two tendencies, don't change the value
+        delta_value[np.cumsum([len(segment[0]) for segment in segments]) - 1] = 0.0
+        return cls(
+            time, value, np.array(delta_time, dtype=float), delta_value, np.array(slope)
+        )
+
+    def _find_segments(self, time):
+        """Find the segments which contain the time points. Time points on a
+        breakpoint belong to the segment starting at that breakpoint."""
+        indices = np.searchsorted(self.time, time, side="right") - 1
+        return np.clip(indices, 0, len(self.time) - 1)
+
+    def get_value(self, time):
+        """Evaluate the table at a time array.
+
+        Args:
+            time: The time array, relative to the start of the period.
+
+        Returns:
+            numpy array containing the values.
+        """
+        i = self._find_segments(time)
+        return self.value[i] + self.delta_value[i] * (
+            (time - self.time[i]) / self.delta_time[i]
+        )
+
+    def get_derivative(self, time):
+        """Evaluate the derivative of the table at a time array.
+
+        Args:
+            time: The time array, relative to the start of the period.
+
+        Returns:
+            numpy array containing the derivatives.
+        """
+        return self.slope[self._find_segments(time)]
+
+    def get_value_and_derivative(self, time):
+        """Evaluate the table and its derivative at a time array, with a single
+        binary search in the breakpoints.
+
+        Args:
+            time: The time array, relative to the start of the period.
+
+        Returns:
+            Tuple containing the values and the derivatives.
+        """
+        i = self._find_segments(time)
+        values = self.value[i] + self.delta_value[i] * (
+            (time - self.time[i]) / self.delta_time[i]
+        )
+        return values, self.slope[i]
@@ -0,0 +1,107 @@
+import numpy as np
+import param
+
+# Minimum number of points used to sample a single tendency
+MIN_POINTS = 17
+# Relative positions of the points within an interval at which the interpolation error
+# is estimated during adaptive sampling
+QUARTERS = np.array([0.25, 0.5, 0.75])
+# Fraction of the tolerance which the estimated interpolation error may not exceed
+ERROR_MARGIN = 0.75
+
+
+class SamplingSettings(param.Parameterized):
+    """Settings for the adaptive sampling of waveforms, which is used when waveforms
+    are evaluated without a time array (for example, when they are plotted)."""
+
+    atol = param.Number(
+        default=0.0,
+        bounds=(0.0, None),
+        label="Absolute sampling tolerance",
+        doc="Maximum absolute error of the linear interpolation between samples.",
+    )
+    rtol = param.Number(
+        default=1e-3,
+        bounds=(0.0, None),
+        label="Relative sampling tolerance",
+        doc="Maximum error of the linear interpolation between samples, relative to "
+        "the range of the sampled values.",
+    )
+    max_points = param.Integer(
+        default=20_000,
+        bounds=(2, None),
+        label="Maximum number of points per waveform",
+        doc="Maximum number of samples of a single waveform.",
+    )
+
+
+sampling_settings = SamplingSettings()  # Global sampling settings
+
+
+def adaptive_sample(func, start, end, num_initial=MIN_POINTS, max_points=None):
+    """Sample a function on an interval, such that linear interpolation between the
+    samples approximates the function within the tolerances of the sampling settings.
+
+    Starting from a uniform grid, the linear interpolation of every interval is
+    compared to the function at the quarter points of the interval. Checking only the
+    midpoint is not sufficient, since an interval which is centered on an inflection
+    point has no error at its midpoint. The quarter points of every interval where the
+    interpolation deviates too much from the function are added as samples. This is
+    repeated until all intervals meet the tolerance, or the maximum number of points is
+    reached. In the latter case, the intervals with the largest errors are refined
+    first.
+
+    Args:
+        func: Vectorized function which returns the values at an array of times.
+        start: Start of the interval.
+        end: End of the interval.
+        num_initial: Number of points of the initial uniform grid. This must be large
+            enough to resolve the features of the function, for example the periods of
+            a periodic function.
+        max_points: Maximum number of points. Defaults to the maximum number of points
+            in the sampling settings.
+
+    Returns:
+        Tuple containing the sampled times and the function values.
+    """
+    if max_points is None:
+        max_points = sampling_settings.max_points
+    max_points = max(max_points, 2)
+    num_initial = min(max(num_initial, 2), max_points)
+    time = np.linspace(float(start), float(end), num_initial)
+    values = func(time)
+    value_min, value_max = np.min(values), np.max(values)
+
+    while len(time) < max_points:
+        step = np.diff(time)
+        # Times and values at the quarter points of every interval, shape (3, N)
+        quarter_time = time[:-1] + QUARTERS[:, np.newaxis] * step
+        quarter_values = func(quarter_time.ravel()).reshape(quarter_time.shape)
+        value_min = min(value_min, np.min(quarter_values))
+        value_max = max(value_max, np.max(quarter_values))
+        tolerance = sampling_settings.atol + sampling_settings.rtol * (
+            value_max - value_min
+        )
+        # Don't refine intervals on rounding errors
+        scale = max(abs(value_min), abs(value_max))
+        tolerance = max(tolerance, 64 * np.finfo(float).eps * scale)
+
+        interpolated = values[:-1] + QUARTERS[:, np.newaxis] * np.diff(values)
+        error = np.max(np.abs(quarter_values - interpolated), axis=0)
+        # The maximum error of an interval may lie between its quarter points, and
+        # exceed the estimate by a few percent
+        refine = np.flatnonzero(error > ERROR_MARGIN * tolerance)
+        if refine.size == 0:
+            break
+        budget = max_points - len(time)
+        # Insert all quarter points, or only the midpoints if the budget is too small
+        rows = [0, 1, 2] if budget >= 3 else [1]
+        if len(rows) * refine.size > budget:
+            num = budget // len(rows)
+            largest = np.argpartition(error[refine], -num)[-num:]
+            refine = np.sort(refine[largest])
+        index = np.repeat(refine + 1, len(rows))
+        time = np.insert(time, index, quarter_time[rows][:, refine].T.ravel())
+        values = np.insert(values, index, quarter_values[rows][:, refine].T.ravel())
+
+    return time, values
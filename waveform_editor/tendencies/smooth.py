@@ -1,14 +1,15 @@
 import numpy as np
 import param
 from param import depends
-from scipy.interpolate import CubicSpline
 
 from waveform_editor.tendencies.base import BaseTendency
+from waveform_editor.tendencies.sampling import adaptive_sample, sampling_settings
 
 
 class SmoothTendency(BaseTendency):
     """
-    Smooth tendency class for a signal with a cubic spline interpolation.
+    Smooth tendency class for a signal with a cubic Hermite interpolation, which matches
+    the values and derivatives of the neighbouring tendencies.
     """
 
     user_from = param.Number(
@@ -29,8 +30,8 @@ class SmoothTendency(BaseTendency):
         self, time: np.ndarray | None = None
     ) -> tuple[np.ndarray, np.ndarray]:
         """Get the tendency values at the provided time array. If no time array is
-        provided, a linearly spaced time array will be generated from the start to the
-        end of the tendency.
+        provided, the spline is sampled adaptively from the start to the end of the
+        tendency, see :meth:`sample`.
 
         Args:
             time: The time array on which to generate points.
@@ -39,18 +40,34 @@ class SmoothTendency(BaseTendency):
             Tuple containing the time and its tendency values.
         """
         if time is None:
-            sampling_rate = 100
-            num_steps = int(self.duration * sampling_rate) + 1
-            time = np.linspace(float(self.start), float(self.end), num_steps)
+            return self.sample(sampling_settings.max_points)
+        return time, self.spline(time)
 
-        values = self.spline(time)
+    def sample(self, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+        """Sample the spline adaptively from the start to the end of the tendency.
 
-        if np.any(np.isnan(values)):
+        Args:
+            max_points: Maximum number of points to use.
+
+        Returns:
+            Tuple containing the time and its tendency values.
+        """
+        return adaptive_sample(self.spline, self.start, self.end, max_points=max_points)
+
+    def value_at(self, time: float) -> float:
+        """Get the tendency value at a single time point.
+
+        Args:
+            time: The time point at which to evaluate the tendency.
+
+        Returns:
+            The value of the tendency.
+        """
+        if not self.start <= time <= self.end:
             raise ValueError(
-                "A spline was generated at a time outside of its generated time range."
+                "A spline was evaluated at a time outside of its generated time range."
             )
-
-        return time, values
+        return float(self.spline(time))
 
     def get_derivative(self, time: np.ndarray) -> np.ndarray:
         """Get the values of the derivatives at the provided time array.
@@ -61,15 +78,38 @@ class SmoothTendency(BaseTendency):
         Returns:
             numpy array containing the derivatives
         """
+        return self.spline.derivative(time)
 
-        derivative_spline = self.spline.derivative()
-        derivatives = derivative_spline(time)
-        return derivatives
+    def get_value_and_derivative(
+        self, time: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the values and the derivatives at the provided time array.
+
+        Args:
+            time: The time array on which to generate points.
+
+        Returns:
+            Tuple containing the values and the derivatives.
+        """
+        return self.spline.value_and_derivative(time)
+
+    def _get_value_and_derivative(self, time):
+        """Get the value and derivative of the tendency at a given time.
+
+        At the start and end of the tendency, these are the boundary conditions of the
+        spline. They are returned directly, instead of evaluating the spline, such that
+        they don't depend on rounding errors of the spline coefficients.
+        """
+        if time == self.start:
+            return self.from_, self.start_derivative
+        if time == self.end:
+            return self.to, self.end_derivative
+        return super()._get_value_and_derivative(time)
 
     # Workaround: param doesn't like a @depends on both prev and next tendency
     _trigger = param.Event()
 
-    @depends("prev_tendency.end_value", watch=True)
+    @depends("prev_tendency.end_value", "prev_tendency.end_derivative", watch=True)
     def _trigger1(self):
         self._trigger = True
 
@@ -77,6 +117,7 @@ class SmoothTendency(BaseTendency):
         "next_tendency.start",
         "next_tendency.start_value",
         "next_tendency.start_value_set",
+        "next_tendency.start_derivative",
         watch=True,
     )
     def _trigger2(self):
@@ -91,8 +132,12 @@ class SmoothTendency(BaseTendency):
         watch=True,
         on_init=True,
     )
-    def _update_values(self):
-        """Updates from/to values."""
+    def _calc_values(self):
+        """Updates from/to values, and the derivatives at the start and end.
+
+        Returns:
+            Whether the values changed.
+        """
         from_ = to = 0.0
         if self.user_from is None:
             if self.prev_tendency is not None:
@@ -113,14 +158,9 @@ class SmoothTendency(BaseTendency):
             d_end = self.next_tendency.start_derivative
 
         if self.start >= self.end:
-            return
+            return False
 
-        self.spline = CubicSpline(
-            [self.start, self.end],
-            [from_, to],
-            bc_type=((1, d_start), (1, d_end)),
-            extrapolate=False,
-        )
+        self.spline = HermiteCubic(self.start, self.end, from_, to, d_start, d_end)
 
         values_changed = (
             self.from_,
@@ -139,3 +179,80 @@ class SmoothTendency(BaseTendency):
             values_changed=values_changed,
             start_value_set=self.user_from is not None,
         )
+        return values_changed
+
+
+class HermiteCubic:
+    """Cubic polynomial on an interval, defined by its values and derivatives at the
+    start and end of the interval.
+
+    The polynomial is stored as the four coefficients of the cubic in the normalized
+    time ``s = (t - start) / (end - start)``, such that evaluating the values or the
+    derivatives only takes a few vectorized multiplications. Times outside of the
+    interval are extrapolated.
+    """
+
+    __slots__ = ("start", "duration", "coefficients")
+
+    def __init__(self, start, end, from_, to, d_start, d_end):
+        """Create the cubic Hermite polynomial.
+
+        Args:
+            start: Start of the interval.
+            end: End of the interval, which must be larger than the start.
+            from_: Value at the start of the interval.
+            to: Value at the end of the interval.
+            d_start: Derivative at the start of the interval.
+            d_end: Derivative at the end of the interval.
+        """
+        duration = end - start
+        m0, m1 = d_start * duration, d_end * duration
+        self.start = start
+        self.duration = duration
+        self.coefficients = (
+            from_,
+            m0,
+            3 * (to - from_) - 2 * m0 - m1,
+            2 * (from_ - to) + m0 + m1,
+        )
+
+    def __call__(self, time):
+        """Evaluate the polynomial.
+
+        Args:
+            time: The time (array) on which to evaluate the polynomial.
+
+        Returns:
+            The values of the polynomial.
+        """
+        c0, c1, c2, c3 = self.coefficients
+        s = (time - self.start) / self.duration
+        return ((c3 * s + c2) * s + c1) * s + c0
+
+    def derivative(self, time):
+        """Evaluate the derivative of the polynomial.
+
+        Args:
+            time: The time (array) on which to evaluate the derivative.
+
+        Returns:
+            The derivatives of the polynomial.
+        """
+        _, c1, c2, c3 = self.coefficients
+        s = (time - self.start) / self.duration
+        return ((3 * c3 * s + 2 * c2) * s + c1) / self.duration
+
+    def value_and_derivative(self, time):
+        """Evaluate the polynomial and its derivative.
+
+        Args:
+            time: The time array on which to evaluate the polynomial.
+
+        Returns:
+            Tuple containing the values and the derivatives.
+        """
+        c0, c1, c2, c3 = self.coefficients
+        s = (time - self.start) / self.duration
+        values = ((c3 * s + c2) * s + c1) * s + c0
+        derivatives = ((3 * c3 * s + 2 * c2) * s + c1) / self.duration
+        return values, derivatives
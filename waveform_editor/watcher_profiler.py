@@ -0,0 +1,286 @@
+"""Opt-in profiler of the param watchers which are called for tendencies.
+
+The tendencies of a waveform watch the parameters of their neighbours, such that a
+single edit may cascade through many watchers. The :class:`WatcherProfiler` records
+every watcher call which involves a tendency, such that event storms (for example two
+neighbouring tendencies updating each other back and forth) can be found in real
+configurations.
+
+Example:
+    .. code-block:: python
+
+        with WatcherProfiler() as profiler:
+            config.load_yaml(yaml_str)
+        print(profiler.report())
+"""
+
+import threading
+import time
+import weakref
+from collections import defaultdict
+
+from param.parameterized import Parameters
+
+from waveform_editor.tendencies.base import BaseTendency
+from waveform_editor.waveform import Waveform
+
+# Name under which watcher calls are reported, when the tendency they belong to is not
+# part of a waveform that was processed while profiling
+UNKNOWN_WAVEFORM = "<unknown>"
+
+
+class WatcherStatistics:
+    """Statistics of the calls of a single watcher method, for a single trigger."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.max_depth = 0
+
+    def add(self, duration, depth):
+        """Add a single call of the watcher.
+
+        Args:
+            duration: Time spent in the call, including nested watcher calls.
+            depth: Number of watcher calls which were active when this watcher was
+                called, including this call.
+        """
+        self.count += 1
+        self.total_time += duration
+        self.max_depth = max(self.max_depth, depth)
+
+
+class WatcherProfiler:
+    """Record the param watcher calls of tendencies, and the time spent processing
+    waveforms.
+
+    While the profiler is active, every watcher call which is triggered by, or calls a
+    method of, a tendency is recorded. The calls are grouped per waveform, per watcher
+    method and per triggering parameter. The triggering parameter is given relative to
+    the tendency of the watcher, for example ``prev_tendency.end_value``.
+
+    Only a single profiler can be active at a time. Profiling adds overhead to every
+    param watcher call, so it should only be enabled to investigate performance.
+    """
+
+    _active = None
+
+    def __init__(self):
+        # Maps (waveform name, tendency type, method, trigger) to WatcherStatistics
+        self.records = defaultdict(WatcherStatistics)
+        # Maps waveform names to the number of times they were processed, and the
+        # total time spent processing them
+        self.load_counts = defaultdict(int)
+        self.load_times = defaultdict(float)
+        self._waveforms = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._original_execute_watcher = None
+        self._original_process_waveform = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+
+    @property
+    def is_active(self):
+        """Whether this profiler is currently recording."""
+        return WatcherProfiler._active is self
+
+    def start(self):
+        """Start recording watcher calls."""
+        if WatcherProfiler._active is not None:
+            raise RuntimeError("Another watcher profiler is already active.")
+        WatcherProfiler._active = self
+        self._original_execute_watcher = Parameters._execute_watcher
+        self._original_process_waveform = Waveform._process_waveform
+        profiler = self
+
+        def _execute_watcher(params, watcher, events):
+            profiler._execute_watcher(params, watcher, events)
+
+        def _process_waveform(waveform, *args, **kwargs):
+            profiler._process_waveform(waveform, *args, **kwargs)
+
+        Parameters._execute_watcher = _execute_watcher
+        Waveform._process_waveform = _process_waveform
+
+    def stop(self):
+        """Stop recording watcher calls. The recorded statistics are kept."""
+        if not self.is_active:
+            return
+        Parameters._execute_watcher = self._original_execute_watcher
+        Waveform._process_waveform = self._original_process_waveform
+        WatcherProfiler._active = None
+
+    def reset(self):
+        """Remove all recorded statistics."""
+        with self._lock:
+            self.records.clear()
+            self.load_counts.clear()
+            self.load_times.clear()
+
+    def _stack(self, name):
+        """Return a stack of the calling thread, which is created on first use."""
+        stack = getattr(self._local, name, None)
+        if stack is None:
+            stack = []
+            setattr(self._local, name, stack)
+        return stack
+
+    def _process_waveform(self, waveform, *args, **kwargs):
+        """Time the processing of a waveform, and register its tendencies."""
+        waveforms = self._stack("waveforms")
+        waveforms.append(waveform.name)
+        start = time.perf_counter()
+        try:
+            self._original_process_waveform(waveform, *args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            # The tendencies of repeated waveforms belong to the outermost waveform
+            name = waveforms[0]
+            for tendency in waveform.tendencies:
+                self._waveforms[tendency] = name
+            waveforms.pop()
+            if not waveforms:
+                with self._lock:
+                    self.load_counts[name] += 1
+                    self.load_times[name] += duration
+
+    def _execute_watcher(self, params, watcher, events):
+        """Call a watcher, and record the call if it involves a tendency."""
+        target, method = _watcher_target(watcher)
+        events = list(events)
+        source = events[0].obj if events else None
+        if not isinstance(target, BaseTendency) and not isinstance(
+            source, BaseTendency
+        ):
+            self._original_execute_watcher(params, watcher, events)
+            return
+
+        tendency = target if isinstance(target, BaseTendency) else source
+        trigger = ", ".join(_event_name(event, target) for event in events)
+        waveforms = self._stack("waveforms")
+        name = self._waveforms.get(tendency)
+        if name is None:
+            name = waveforms[0] if waveforms else UNKNOWN_WAVEFORM
+        if target is not tendency:
+            method = f"{type(target).__name__}.{method}"
+
+        depth = self._stack("depth")
+        depth.append(None)
+        start = time.perf_counter()
+        try:
+            self._original_execute_watcher(params, watcher, events)
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                key = (name, type(tendency).__name__, method, trigger)
+                self.records[key].add(duration, len(depth))
+            depth.pop()
+
+    def statistics(self, waveform=None):
+        """Return the recorded watcher statistics.
+
+        Args:
+            waveform: Name of the waveform to return the statistics for. If None, the
+                statistics of all waveforms are returned.
+
+        Returns:
+            List of dictionaries, sorted by decreasing total time, with the waveform
+            name, tendency type, watcher method, triggering parameter(s), number of
+            calls, total time (including nested watcher calls) and maximum call depth.
+        """
+        with self._lock:
+            items = list(self.records.items())
+        rows = [
+            {
+                "waveform": name,
+                "tendency": tendency,
+                "method": method,
+                "trigger": trigger,
+                "count": stats.count,
+                "total_time": stats.total_time,
+                "max_depth": stats.max_depth,
+            }
+            for (name, tendency, method, trigger), stats in items
+            if waveform is None or name == waveform
+        ]
+        rows.sort(key=lambda row: row["total_time"], reverse=True)
+        return rows
+
+    def report(self, waveform=None, limit=10):
+        """Create a text report of the recorded statistics, per waveform.
+
+        Args:
+            waveform: Name of the waveform to report. If None, all waveforms are
+                reported, in order of decreasing number of watcher calls.
+            limit: Maximum number of watchers to list per waveform, or None to list
+                all of them.
+
+        Returns:
+            The report.
+        """
+        rows_per_waveform = defaultdict(list)
+        for row in self.statistics(waveform):
+            rows_per_waveform[row["waveform"]].append(row)
+        names = set(rows_per_waveform)
+        names.update(name for name in self.load_counts if waveform in (None, name))
+        names = sorted(
+            names,
+            key=lambda name: (
+                -sum(row["count"] for row in rows_per_waveform[name]),
+                name,
+            ),
+        )
+
+        lines = []
+        for name in names:
+            rows = rows_per_waveform[name]
+            lines.append(f"Waveform {name!r}:")
+            if name in self.load_counts:
+                lines.append(
+                    f"  processed {self.load_counts[name]} time(s) in "
+                    f"{self.load_times[name] * 1e3:.2f} ms"
+                )
+            count = sum(row["count"] for row in rows)
+            max_depth = max((row["max_depth"] for row in rows), default=0)
+            lines.append(f"  {count} watcher call(s), maximum call depth {max_depth}")
+            for row in rows[:limit]:
+                lines.append(
+                    f"  {row['count']:>8} {row['total_time'] * 1e3:>10.2f} ms "
+                    f"depth {row['max_depth']:>3}  {row['tendency']}.{row['method']} "
+                    f"<- {row['trigger']}"
+                )
+            if limit is not None and len(rows) > limit:
+                lines.append(f"  ... and {len(rows) - limit} more watcher(s)")
+        if not lines:
+            return "No watcher calls were recorded."
+        return "\n".join(lines)
+
+
+def _watcher_target(watcher):
+    """Find the object and the name of the method which is called by a watcher."""
+    fn = watcher.fn
+    # Watchers of param.depends methods wrap the bound method
+    function = getattr(fn, "keywords", {}).get("function", fn)
+    name = getattr(fn, "_watcher_name", None) or getattr(
+        function, "__name__", repr(function)
+    )
+    return getattr(function, "__self__", None), name
+
+
+def _event_name(event, tendency):
+    """Name of the parameter which triggered an event, relative to a tendency."""
+    obj = event.obj
+    if obj is tendency:
+        return event.name
+    if isinstance(tendency, BaseTendency):
+        if obj is tendency.prev_tendency:
+            return f"prev_tendency.{event.name}"
+        if obj is tendency.next_tendency:
+            return f"next_tendency.{event.name}"
+    return f"{type(obj).__name__}.{event.name}"
@@ -1,6 +1,8 @@
 import io
+from bisect import bisect_right
 
 import numpy as np
+from param.parameterized import discard_events
 from ruamel.yaml import YAML
 from ruamel.yaml.comments import CommentedSeq
 
@@ -13,6 +15,7 @@ from waveform_editor.tendencies.periodic.square_wave import SquareWaveTendency
 from waveform_editor.tendencies.periodic.triangle_wave import TriangleWaveTendency
 from waveform_editor.tendencies.piecewise import PiecewiseLinearTendency
 from waveform_editor.tendencies.repeat import RepeatTendency
+from waveform_editor.tendencies.sampling import MIN_POINTS, sampling_settings
 from waveform_editor.tendencies.smooth import SmoothTendency
 
 tendency_map = {
@@ -42,19 +45,29 @@ class Waveform(BaseWaveform):
         is_repeated=False,
         name="waveform",
         dd_version=None,
+        previous=None,
+        yaml_node=None,
     ):
-        super().__init__(yaml_str, name, dd_version)
+        super().__init__(yaml_str, name, dd_version, yaml_node)
         self.line_number = line_number
         self.is_repeated = is_repeated
+        self._breakpoints = None
+        # Keys and line numbers of the YAML entries of the tendencies
+        self._entry_keys = []
+        self._line_numbers = []
+        # Watchers on the tendencies, by the id of the tendency
+        self._watchers = {}
+        # Waveform from which unchanged tendencies were reused
+        self._previous = None
         if waveform is not None:
-            self._process_waveform(waveform)
+            self._process_waveform(waveform, previous)
 
     def get_value(
         self, time: np.ndarray | None = None
     ) -> tuple[np.ndarray, np.ndarray]:
         """Get the tendency values at the provided time array. If no time array is
         provided, the individual tendencies are responsible for creating a time array,
-        and these are appended.
+        and these are appended, see :meth:`sample`.
 
         Args:
             time: The time array on which to generate points.
@@ -66,14 +79,43 @@ class Waveform(BaseWaveform):
             return np.array([]), np.array([])
 
         if time is None:
-            time, values = zip(*(t.get_value() for t in self.tendencies), strict=True)
-            time = np.concatenate(time)
-            values = np.concatenate(values)
-        else:
-            values = self._evaluate_tendencies(time)
-
+            return self.sample(sampling_settings.max_points)
+        values, _ = self._evaluate_tendencies(time)
         return time, values
 
+    def sample(self, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+        """Generate the time points and values to plot the waveform, by appending the
+        samples of the individual tendencies.
+
+        Every tendency gets an equal share of the minimum number of points, up to
+        ``MIN_POINTS``, and the rest of the budget is divided over the tendencies
+        proportional to their duration. The total number of points therefore stays
+        within ``max_points``, unless the tendencies need more points for their own
+        breakpoints (two points per tendency, or all points of a piecewise linear
+        tendency).
+
+        Args:
+            max_points: Maximum number of points to use.
+
+        Returns:
+            Tuple containing the time and its tendency values.
+        """
+        if not self.tendencies:
+            return np.array([]), np.array([])
+
+        num_tendencies = len(self.tendencies)
+        minimum = max(min(MIN_POINTS, max_points // num_tendencies), 2)
+        remaining = max(max_points - minimum * num_tendencies, 0)
+        total_duration = sum(tendency.duration for tendency in self.tendencies) or 1.0
+        samples = [
+            tendency.sample(
+                minimum + int(remaining * tendency.duration / total_duration)
+            )
+            for tendency in self.tendencies
+        ]
+        time, values = zip(*samples, strict=True)
+        return np.concatenate(time), np.concatenate(values)
+
     def get_derivative(self, time: np.ndarray) -> np.ndarray:
         """Get the values of the derivatives at the provided time array.
 
@@ -83,68 +125,235 @@ class Waveform(BaseWaveform):
         Returns:
             numpy array containing the derivatives
         """
+        _, derivatives = self._evaluate_tendencies(
+            time, eval_values=False, eval_derivatives=True
+        )
+        return derivatives
+
+    def get_value_and_derivative(
+        self, time: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the values and the derivatives at the provided time array, in a single
+        pass over the tendencies.
+
+        Args:
+            time: The time array on which to generate points.
+
+        Returns:
+            Tuple containing the values and the derivatives.
+        """
         return self._evaluate_tendencies(time, eval_derivatives=True)
 
-    def _evaluate_tendencies(self, time, eval_derivatives=False):
-        """Evaluates the values (or derivatives) of the tendencies at the provided
+    def has_values(self) -> bool:
+        """Whether the waveform has any values to export.
+
+        Returns:
+            True if the waveform has any tendencies.
+        """
+        return bool(self.tendencies)
+
+    def value_at(self, time: float) -> float:
+        """Get the value of the waveform at a single time point.
+
+        The tendency containing the time point is found with a binary search in the
+        cached tendency breakpoints, after which only that tendency is evaluated. The
+        result is the same as evaluating :meth:`get_value` on a single time point.
+
+        Args:
+            time: The time point at which to evaluate the waveform.
+
+        Returns:
+            The value of the waveform.
+        """
+        if not self.tendencies or time != time:  # NaN is not part of any tendency
+            return 0.0
+        self._get_breakpoints()
+        start_list, end_list, is_ordered = self._breakpoints[3:]
+        if not is_ordered:
+            # Overlapping tendencies, use the general implementation
+            return float(self._evaluate_tendencies(np.array([time]))[0][0])
+
+        if time < start_list[0]:
+            return float(self.tendencies[0].start_value)
+        if time > end_list[-1]:
+            return float(self.tendencies[-1].end_value)
+        # The last tendency which starts at or before the time point
+        i = bisect_right(start_list, time) - 1
+        if time <= end_list[i]:
+            return self.tendencies[i].value_at(time)
+        # The time point lies in a gap before the next tendency
+        prev_tendency, tendency = self.tendencies[i], self.tendencies[i + 1]
+        return float(
+            np.interp(
+                time,
+                [prev_tendency.end, tendency.start],
+                [prev_tendency.end_value, tendency.start_value],
+            )
+        )
+
+    def fill_values(self, time: np.ndarray, out: np.ndarray) -> None:
+        """Evaluate the waveform at a sorted time array and store the values in a
+        preallocated output array.
+
+        Args:
+            time: The time array on which to generate points, in increasing order.
+            out: Array with the same length as the time array to store the values in.
+        """
+        self._fill_tendencies(time, values=out)
+
+    def _evaluate_tendencies(self, time, eval_values=True, eval_derivatives=False):
+        """Evaluates the values and/or derivatives of the tendencies at the provided
         time array.
 
         Args:
             time: The time array on which to generate points.
+            eval_values: When this is True, the values will be evaluated.
             eval_derivatives: When this is True, the derivatives will be evaluated.
-                When it is False, the values will be evaluated.
 
         Returns:
-            numpy array containing the computed values.
+            Tuple containing numpy arrays with the computed values and derivatives.
+            Entries which are not evaluated are None.
         """
-        values = np.zeros_like(time, dtype=float)
+        time = np.asarray(time)
+        if time.ndim == 0:
+            results = self._evaluate_tendencies(
+                time.reshape(1), eval_values, eval_derivatives
+            )
+            return tuple(None if out is None else out[0] for out in results)
+
+        is_sorted = np.all(time[1:] >= time[:-1])
+        if not is_sorted:
+            order = np.argsort(time, kind="stable")
+            time = time[order]
+        values = np.empty_like(time, dtype=float) if eval_values else None
+        derivatives = np.empty_like(time, dtype=float) if eval_derivatives else None
+        self._fill_tendencies(time, values, derivatives)
+        if is_sorted:
+            return values, derivatives
+
+        results = []
+        for sorted_out in (values, derivatives):
+            out = None
+            if sorted_out is not None:
+                out = np.empty_like(sorted_out)
+                out[order] = sorted_out
+            results.append(out)
+        return tuple(results)
+
+    def _fill_tendencies(self, time, values=None, derivatives=None):
+        """Evaluates the values and/or derivatives of the tendencies at a sorted time
+        array, and stores them in the provided arrays.
+
+        The tendency breakpoints are located in the time array with a binary search.
+        Each tendency, gap and extrapolated region is then evaluated on its own
+        contiguous slice of the time array, instead of masking the full time array for
+        every tendency.
+
+        Args:
+            time: The time array on which to generate points, in increasing order.
+            values: Array to store the computed values in, or None if the values are
+                not evaluated.
+            derivatives: Array to store the computed derivatives in, or None if the
+                derivatives are not evaluated.
+        """
+        for out in (values, derivatives):
+            if out is not None:
+                out.fill(0)
+        if not self.tendencies or time.size == 0:
+            return
+
+        # NaN values are sorted to the end, these are not part of any tendency
+        num_valid = np.searchsorted(time, np.nan, side="left")
+        starts, ends = self._get_breakpoints()
+        lower = np.searchsorted(time[:num_valid], starts, side="left")
+        upper = np.searchsorted(time[:num_valid], ends, side="right")
 
         for i, tendency in enumerate(self.tendencies):
-            mask = (time >= tendency.start) & (time <= tendency.end)
-            if np.any(mask):
-                if eval_derivatives:
-                    values[mask] = tendency.get_derivative(time[mask])
+            # Later tendencies overwrite shared boundary points of earlier tendencies
+            if lower[i] < upper[i]:
+                segment = slice(lower[i], upper[i])
+                if values is None:
+                    derivatives[segment] = tendency.get_derivative(time[segment])
+                elif derivatives is None:
+                    _, values[segment] = tendency.get_value(time[segment])
                 else:
-                    _, values[mask] = tendency.get_value(time[mask])
+                    values[segment], derivatives[segment] = (
+                        tendency.get_value_and_derivative(time[segment])
+                    )
 
             # Handle gaps between tendencies, we linearly interpolate between the
             # gap values.
-            if i and tendency.prev_tendency.end < tendency.start:
-                prev_tendency = tendency.prev_tendency
-                mask = (time < tendency.start) & (time > prev_tendency.end)
+            if i and self.tendencies[i - 1].end < tendency.start:
+                prev_tendency = self.tendencies[i - 1]
+                gap = slice(upper[i - 1], lower[i])
                 slope = (tendency.start_value - prev_tendency.end_value) / (
                     tendency.start - prev_tendency.end
                 )
-                if np.any(mask):
-                    if eval_derivatives:
-                        values[mask] = slope
-                    else:
-                        values[mask] = np.interp(
-                            time[mask],
-                            [prev_tendency.end, tendency.start],
-                            [prev_tendency.end_value, tendency.start_value],
-                        )
+                if derivatives is not None:
+                    derivatives[gap] = slope
+                if values is not None:
+                    values[gap] = np.interp(
+                        time[gap],
+                        [prev_tendency.end, tendency.start],
+                        [prev_tendency.end_value, tendency.start_value],
+                    )
         # Handle extrapolation
-        if eval_derivatives:
-            values[time < self.tendencies[0].start] = 0
-            values[time > self.tendencies[-1].end] = 0
-        else:
-            first_tendency = self.tendencies[0]
-            values[time < first_tendency.start] = first_tendency.start_value
+        before = slice(0, np.searchsorted(time, starts[0], side="left"))
+        after = slice(upper[-1], num_valid)
+        if derivatives is not None:
+            derivatives[before] = 0
+            derivatives[after] = 0
+        if values is not None:
+            values[before] = self.tendencies[0].start_value
+            values[after] = self.tendencies[-1].end_value
+
+    def _get_breakpoints(self):
+        """Returns the start and end times of all tendencies as numpy arrays. The
+        arrays are cached until the timing of any of the tendencies changes.
+
+        Along with the arrays, the start and end times are cached as lists for
+        :meth:`value_at`, together with a flag which indicates whether no tendency
+        starts before the end of its previous tendency.
 
-            last_tendency = self.tendencies[-1]
-            values[time > last_tendency.end] = last_tendency.end_value
-        return values
+        Returns:
+            Tuple containing the start and end time arrays.
+        """
+        if self._breakpoints is None or self._breakpoints[0] is not self.tendencies:
+            self._breakpoints = compute_breakpoints(self.tendencies)
+        return self._breakpoints[1:3]
+
+    def _clear_breakpoints(self, event=None):
+        """Invalidates the cached tendency breakpoints."""
+        self._breakpoints = None
 
     def calc_length(self):
         """Returns the length of the waveform."""
         return self.tendencies[-1].end - self.tendencies[0].start
 
-    def _process_waveform(self, waveform):
+    def freeze(self):
+        """Create an immutable snapshot of this waveform, which evaluates to the same
+        values, but doesn't keep track of any changes. See
+        :class:`~waveform_editor.frozen.FrozenWaveform`.
+
+        Returns:
+            The frozen waveform.
+        """
+        from waveform_editor.frozen import FrozenWaveform
+
+        return FrozenWaveform(self)
+
+    def _process_waveform(self, waveform, previous=None):
         """Processes the waveform YAML and populates the tendencies list.
 
+        If a previous version of the waveform is provided, the tendencies of unchanged
+        leading and trailing entries are taken over from it, instead of creating them
+        again. Only the changed entries are turned into new tendencies, and only the
+        neighbours of those are linked again. The previous waveform can get its
+        tendencies back with :meth:`restore_previous`.
+
         Args:
             waveform_yaml: Parsed YAML data.
+            previous: Previous version of this waveform.
         """
         if not waveform:
             error_msg = (
@@ -154,6 +363,7 @@ class Waveform(BaseWaveform):
             self.annotations.add(0, error_msg)
             return
 
+        entries = []
         for i, entry in enumerate(waveform):
             if not isinstance(entry, dict):
                 error_msg = (
@@ -165,18 +375,184 @@ class Waveform(BaseWaveform):
             # Add key to notify the tendency is the first repeated tendency
             if i == 0:
                 entry["is_first_repeated"] = self.is_repeated
-            tendency = self._handle_tendency(entry)
-            if tendency is not None:
-                self.tendencies.append(tendency)
+            entries.append(entry)
+
+        keys = [_entry_key(entry) for entry in entries]
+        num_leading = num_trailing = 0
+        if previous is not None:
+            num_leading, num_trailing = previous._count_reusable(keys)
+            if num_leading or num_trailing:
+                self._previous = previous
+                previous._previous = None
+
+        num_changed = len(entries) - num_trailing
+        for i, (key, entry) in enumerate(zip(keys, entries, strict=True)):
+            if i < num_leading or i >= num_changed:
+                j = i if i < num_leading else i - len(keys) + len(previous.tendencies)
+                tendency = previous.tendencies[j]
+                previous._unwatch(tendency)
+                tendency.line_number = entry.get("line_number", 0)
+            else:
+                tendency = self._handle_tendency(entry)
+                if tendency is None:
+                    continue
+            self.tendencies.append(tendency)
+            self._entry_keys.append(key)
+            self._line_numbers.append(tendency.line_number)
+
+        reused = self._previous.tendencies if self._previous is not None else ()
+        self._resolve_tendencies(reused)
+        self.update_annotations()
+        for tendency in self.tendencies:
+            self._watch(tendency)
 
-        for i in range(1, len(self.tendencies)):
-            self.tendencies[i - 1].set_next_tendency(self.tendencies[i])
-            self.tendencies[i].set_previous_tendency(self.tendencies[i - 1])
+    def _count_reusable(self, keys):
+        """Count the leading and trailing tendencies which can be reused for a new
+        version of this waveform.
 
-        self.update_annotations()
+        Tendencies can be reused when their entry did not change, and they don't have
+        any annotations, as these might refer to other (changed) tendencies.
+
+        Args:
+            keys: Keys of the entries of the new version of the waveform.
+
+        Returns:
+            Tuple with the number of leading and trailing tendencies to reuse.
+        """
+        max_reusable = min(len(keys), len(self.tendencies))
+        num_leading = 0
+        while (
+            num_leading < max_reusable
+            and keys[num_leading] == self._entry_keys[num_leading]
+            and not self.tendencies[num_leading].annotations
+        ):
+            num_leading += 1
+        num_trailing = 0
+        while (
+            num_leading + num_trailing < max_reusable
+            and keys[-1 - num_trailing] == self._entry_keys[-1 - num_trailing]
+            and not self.tendencies[-1 - num_trailing].annotations
+        ):
+            num_trailing += 1
+        return num_leading, num_trailing
+
+    def _link_tendencies(self):
+        """Link consecutive tendencies to each other. Tendencies which are already
+        linked are left untouched."""
+        if not self.tendencies:
+            return
+        if self.tendencies[0].prev_tendency is not None:
+            self.tendencies[0].prev_tendency = None
+        if self.tendencies[-1].next_tendency is not None:
+            self.tendencies[-1].next_tendency = None
+        for i in range(1, len(self.tendencies)):
+            prev_tendency, tendency = self.tendencies[i - 1], self.tendencies[i]
+            # Reused tendencies are unlinked first: param only calls the methods which
+            # depend on a neighbour, when the neighbour changes from or to None
+            if prev_tendency.next_tendency is not tendency:
+                prev_tendency.next_tendency = None
+                prev_tendency.set_next_tendency(tendency)
+            if tendency.prev_tendency is not prev_tendency:
+                tendency.prev_tendency = None
+                tendency.set_previous_tendency(prev_tendency)
+
+    def _resolve_tendencies(self, reused=()):
+        """Link the tendencies to each other, and resolve their times and values in
+        batch.
+
+        Linking the tendencies one by one (see :meth:`_link_tendencies`) lets every
+        tendency react to its new neighbours, which cascades through all following
+        tendencies. Instead, the tendencies are linked without notifying any watchers,
+        and resolved in a single forward pass (times, values which depend on the
+        previous tendency, and the checks for gaps and overlaps), followed by a single
+        backward pass (values which depend on the next tendency). This results in the
+        same tendencies as linking them one by one. Afterwards the tendencies watch
+        their neighbours again, such that later edits are propagated as usual.
+
+        Tendencies which were already linked before, for example when they are reused
+        from a previous version of the waveform, are first reset to the state of a new
+        tendency without neighbours. Otherwise their results could depend on their
+        previous neighbours, for example when the derivatives of consecutive smooth
+        tendencies depend on each other.
 
+        Args:
+            reused: Tendencies which were linked before.
+        """
+        for tendency in reused:
+            with discard_events(tendency):
+                tendency.prev_tendency = None
+                tendency.next_tendency = None
+                tendency._calc_times()
+                tendency._calc_values()
+                tendency._calc_start_end_values()
+
+        tendencies = self.tendencies
+        last = len(tendencies) - 1
+        for i, tendency in enumerate(tendencies):
+            with discard_events(tendency):
+                tendency.prev_tendency = tendencies[i - 1] if i > 0 else None
+                tendency.next_tendency = tendencies[i + 1] if i < last else None
+
+        for i, tendency in enumerate(tendencies):
+            with discard_events(tendency):
+                times_changed = i > 0 and tendency._calc_times()
+                if tendency._calc_values() or times_changed:
+                    tendency._calc_start_end_values()
+                if i > 0:
+                    tendency._check_previous_tendency()
+        for tendency in reversed(tendencies):
+            with discard_events(tendency):
+                if tendency._calc_values():
+                    tendency._calc_start_end_values()
+
+        # Assigning the neighbours again makes param watch the new neighbours. The
+        # tendencies are already resolved, so this does not change them any further.
+        for tendency in tendencies:
+            for name in ("prev_tendency", "next_tendency"):
+                neighbour = getattr(tendency, name)
+                if neighbour is not None:
+                    with discard_events(tendency):
+                        setattr(tendency, name, None)
+                    setattr(tendency, name, neighbour)
+
+    def _watch(self, tendency):
+        """Watch a tendency for changes in its annotations and timing."""
+        if id(tendency) not in self._watchers:
+            self._watchers[id(tendency)] = [
+                tendency.param.watch(self.update_annotations, "annotations"),
+                tendency.param.watch(self._clear_breakpoints, "times_changed"),
+            ]
+
+    def _unwatch(self, tendency):
+        """Stop watching a tendency, for example when it is taken over by another
+        waveform."""
+        for watcher in self._watchers.pop(id(tendency), []):
+            tendency.param.unwatch(watcher)
+
+    def restore_previous(self):
+        """Give the reused tendencies back to the previous version of this waveform,
+        for example when this version is discarded because it contains errors. The
+        tendencies of the previous waveform are resolved again, and their line numbers
+        are restored.
+        """
+        previous = self._previous
+        if previous is None:
+            return
+        self._previous = None
         for tendency in self.tendencies:
-            tendency.param.watch(self.update_annotations, "annotations")
+            self._unwatch(tendency)
+        reused = {id(tendency) for tendency in self.tendencies}
+        for tendency, line_number in zip(
+            previous.tendencies, previous._line_numbers, strict=True
+        ):
+            tendency.line_number = line_number
+            # Reused tendencies had no annotations, see _count_reusable
+            if id(tendency) in reused:
+                tendency.annotations.clear()
+        previous._resolve_tendencies(previous.tendencies)
+        for tendency in previous.tendencies:
+            previous._watch(tendency)
+        previous._breakpoints = None
 
     def update_annotations(self, event=None):
         """Merges the annotations of the individual tendencies into the annotations
@@ -258,3 +634,53 @@ class Waveform(BaseWaveform):
             tendency_class = tendency_map[tendency_type]
             tendency = tendency_class(**entry)
             return tendency
+
+
+def compute_breakpoints(tendencies):
+    """Compute the breakpoints of a sequence of tendencies.
+
+    Args:
+        tendencies: The tendencies of a waveform.
+
+    Returns:
+        Tuple containing the tendencies, the start and end times as numpy arrays, the
+        start and end times as lists, and a flag which indicates whether no tendency
+        starts before the end of its previous tendency.
+    """
+    start_list = [tendency.start for tendency in tendencies]
+    end_list = [tendency.end for tendency in tendencies]
+    is_ordered = all(
+        end <= start for end, start in zip(end_list, start_list[1:], strict=False)
+    )
+    return (
+        tendencies,
+        np.array(start_list),
+        np.array(end_list),
+        start_list,
+        end_list,
+        is_ordered,
+    )
+
+
+def _entry_key(entry):
+    """Return a hashable key of a YAML entry, which is equal for equal entries.
+
+    The line number of the entry is left out of the key, such that entries which only
+    moved within the YAML are still considered equal.
+    """
+    return tuple(
+        sorted(
+            (key, _freeze(value))
+            for key, value in entry.items()
+            if key != "line_number"
+        )
+    )
+
+
+def _freeze(value):
+    """Convert nested dictionaries and lists into hashable tuples."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
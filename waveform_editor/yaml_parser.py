@@ -1,17 +1,71 @@
 import logging
-import re
-from io import StringIO
+import os
+from concurrent.futures import ProcessPoolExecutor
 
 import yaml
 from ruamel.yaml import YAML
+from ruamel.yaml.resolver import implicit_resolvers as ruamel_resolvers
 
+from waveform_editor.dependency_graph import DependencyGraph
 from waveform_editor.derived_waveform import DerivedWaveform
 from waveform_editor.waveform import Waveform
 
 logger = logging.getLogger(__name__)
 
 
-class LineNumberYamlLoader(yaml.SafeLoader):
+# Tags of the plain scalars which PyYAML resolves according to YAML 1.1, but ruamel
+# according to YAML 1.2. For example, ``yes`` is a boolean and ``017`` an octal number
+# in YAML 1.1, but a string and a decimal number in YAML 1.2.
+YAML_1_2_TAGS = {
+    "tag:yaml.org,2002:bool",
+    "tag:yaml.org,2002:int",
+    "tag:yaml.org,2002:float",
+}
+
+
+def _construct_int(loader, node):
+    """Construct an integer according to YAML 1.2, in which numbers with leading zeros
+    are decimal numbers and octal numbers are prefixed with ``0o``.
+
+    Args:
+        loader: The PyYAML loader which constructs the integer.
+        node: The scalar node of the integer.
+
+    Returns:
+        The constructed integer.
+    """
+    value = loader.construct_scalar(node).replace("_", "")
+    sign = -1 if value[0] == "-" else 1
+    value = value.lstrip("+-")
+    for prefix, base in (("0b", 2), ("0o", 8), ("0x", 16)):
+        if value.startswith(prefix):
+            return sign * int(value[2:], base)
+    return sign * int(value)
+
+
+def _use_yaml_1_2_scalars(loader):
+    """Configure a PyYAML loader to resolve bools, integers and floats with the same
+    YAML 1.2 rules as ruamel, which loads the configuration files. This ensures that a
+    waveform has the same values when it is parsed again in the editor.
+
+    Args:
+        loader: The PyYAML loader class to configure.
+    """
+    loader.yaml_implicit_resolvers = {
+        first: [(tag, regexp) for tag, regexp in resolvers if tag not in YAML_1_2_TAGS]
+        for first, resolvers in loader.yaml_implicit_resolvers.items()
+    }
+    for versions, tag, regexp, first in ruamel_resolvers:
+        if (1, 2) in versions and tag in YAML_1_2_TAGS:
+            loader.add_implicit_resolver(tag, regexp, first)
+    loader.add_constructor("tag:yaml.org,2002:int", _construct_int)
+
+
+class LineNumberMixin:
+    """Constructor methods which prefix all keys of mappings with ``user_``, store the
+    line numbers of the mappings and check for duplicate keys. This is mixed into the
+    pure Python and the C-accelerated YAML loaders."""
+
     def _check_for_duplicates(self, node, deep):
         seen = set()
 
@@ -43,6 +97,24 @@ class LineNumberYamlLoader(yaml.SafeLoader):
         return mapping
 
 
+class LineNumberYamlLoader(LineNumberMixin, yaml.SafeLoader):
+    pass
+
+
+_use_yaml_1_2_scalars(LineNumberYamlLoader)
+
+if yaml.__with_libyaml__:
+
+    class CLineNumberYamlLoader(LineNumberMixin, yaml.CSafeLoader):
+        pass
+
+    _use_yaml_1_2_scalars(CLineNumberYamlLoader)
+    # Loader used to parse waveforms, which uses the libyaml parser when available
+    WaveformYamlLoader = CLineNumberYamlLoader
+else:
+    WaveformYamlLoader = LineNumberYamlLoader
+
+
 class YamlParser:
     def __init__(self, config):
         self.yaml = YAML()
@@ -55,6 +127,23 @@ class YamlParser:
         Args:
             yaml_str: The YAML string to load YAML for.
         """
+        pending = self._load_document(yaml_str)
+        waveforms = [
+            (self.load_waveform(name, value, key_line), path)
+            for path, name, value, key_line in pending
+        ]
+        self.config.add_waveforms(waveforms)
+
+    def _load_document(self, yaml_str):
+        """Parses a YAML string, sets the globals and creates the groups of the
+        WaveformConfiguration.
+
+        Args:
+            yaml_str: The YAML string to load YAML for.
+
+        Returns:
+            List of the waveforms to create, as collected by :meth:`_recursive_load`.
+        """
         self.parse_errors = []
 
         yaml_data = self.yaml.load(yaml_str) if yaml_str else {}
@@ -64,6 +153,7 @@ class YamlParser:
         if not isinstance(yaml_data, dict):
             raise ValueError("Input yaml_data must be a dictionary.")
 
+        pending = []
         for group_name, group_content in yaml_data.items():
             if group_name == "globals":
                 continue
@@ -71,9 +161,10 @@ class YamlParser:
             if not isinstance(group_content, dict):
                 raise ValueError("Waveforms must belong to a group.")
 
-            self._recursive_load(group_content, group_name, [])
+            self._recursive_load(group_content, group_name, [], pending)
+        return pending
 
-    def _recursive_load(self, data_dict, group_name, path):
+    def _recursive_load(self, data_dict, group_name, path, pending):
         """Recursively builds a hierarchy of WaveformGroup objects from a nested
         dictionary.
 
@@ -81,58 +172,122 @@ class YamlParser:
             data_dict: Input data containing waveform groups and waveforms.
             group_name: Name of the current group.
             path: The list of parent group names representing the current path.
+            pending: List to which the waveforms are appended, as tuples of their
+                group path, name, YAML node and key line.
 
         Returns:
-            The populated waveform group.
+            The created waveform group.
         """
         current_group = self.config.add_group(group_name, path)
 
         for key, value in data_dict.items():
             if isinstance(value, dict):
-                self._recursive_load(value, key, path + [group_name])
+                self._recursive_load(value, key, path + [group_name], pending)
             else:
-                yaml_str = self.generate_yaml_str(key, value)
-                waveform = self.parse_waveform(yaml_str)
-                self.config.add_waveform(waveform, path + [group_name])
+                key_line = data_dict.lc.key(key)[0]
+                pending.append((path + [group_name], key, value, key_line))
 
         return current_group
 
-    def generate_yaml_str(self, key, value):
-        """Generate YAML string for a key-value pair, ensuring comments are retained.
+    def load_frozen(self, yaml_str, max_workers=None):
+        """Parses a YAML string into a frozen configuration.
+
+        Every waveform with tendencies is created and frozen on its own, after which
+        only its frozen tendencies and annotations are kept. These waveforms are
+        independent of each other, so they can be created in a pool of worker
+        processes. Derived waveforms depend on the configuration, so they are created
+        in this process. Only the globals and groups are stored in the
+        WaveformConfiguration of this parser, the waveforms are not added to it.
+
+        Args:
+            yaml_str: The YAML string to load YAML for.
+            max_workers: Maximum number of worker processes, or None to create the
+                waveforms in this process.
+
+        Returns:
+            The frozen configuration.
+        """
+        from waveform_editor.frozen import FrozenConfiguration, FrozenWaveform
+
+        pending = self._load_document(yaml_str)
+        base_path = self.config.base_path
+        jobs = {
+            i: (
+                name,
+                _resolve_file_paths(_to_tendency_entries(value, key_line), base_path),
+            )
+            for i, (_, name, value, key_line) in enumerate(pending)
+            if isinstance(value, list)
+        }
+        results = {}
+        if jobs and max_workers is None:
+            # Only a single waveform with tendencies exists at any time
+            frozen = map(_freeze_waveform, *zip(*jobs.values(), strict=True))
+            results = dict(zip(jobs, frozen, strict=True))
+        elif jobs:
+            # Send the waveforms in chunks, to limit the communication overhead
+            chunksize = max(len(jobs) // (4 * max_workers), 1)
+            names, entries = zip(*jobs.values(), strict=True)
+            with ProcessPoolExecutor(max_workers) as executor:
+                frozen = executor.map(
+                    _freeze_waveform, names, entries, chunksize=chunksize
+                )
+                results = dict(zip(jobs, frozen, strict=True))
+
+        dd_version = self.config.globals.dd_version
+        waveforms = {}
+        dependencies = {}
+        for i, (_, name, value, key_line) in enumerate(pending):
+            if name in waveforms:
+                raise ValueError("The waveform already exists in this configuration.")
+            if i in results:
+                tendencies, annotations = results[i]
+                waveform = FrozenWaveform.from_tendencies(
+                    name, tendencies, dd_version, annotations
+                )
+            else:
+                waveform = self.load_waveform(name, value, key_line)
+                if isinstance(waveform, DerivedWaveform):
+                    dependencies[name] = waveform.dependencies
+            waveforms[name] = waveform
+        dependency_graph = DependencyGraph()
+        dependency_graph.add_nodes(dependencies)
+        return FrozenConfiguration.from_waveforms(
+            self.config.globals, waveforms, dependency_graph
+        )
+
+    def load_waveform(self, name, waveform_yaml, key_line=0):
+        """Creates a waveform from its YAML node, as loaded by ruamel.
+
+        The tendencies are taken directly from the ruamel node, instead of dumping it
+        to a string and parsing that again. The line numbers of the tendencies are
+        relative to the line of the waveform name, which is how they appear in the
+        YAML string of the waveform.
 
         Args:
-            key: Key of the yaml string.
-            value: Corresponding value for the key.
+            name: Name of the waveform.
+            waveform_yaml: The YAML node of the waveform.
+            key_line: Line of the waveform name in the YAML document.
         """
-        stream = StringIO()
-        self.yaml.dump({key: value}, stream)
-        return stream.getvalue()
+        try:
+            waveform = _to_tendency_entries(waveform_yaml, key_line)
+            return self._create_waveform(name, waveform, yaml_node=waveform_yaml)
+        except yaml.YAMLError as e:
+            self.parse_errors.append(str(e))
+            empty_waveform = Waveform()
+            empty_waveform.annotations.add_yaml_error(e)
+            return empty_waveform
 
-    def parse_waveform(self, yaml_str):
+    def parse_waveform(self, yaml_str, previous=None):
         """Loads a YAML structure from a string and stores its tendencies into a list.
 
         Args:
             yaml_str: YAML content as a string.
+            previous: Previous version of the waveform. Tendencies of unchanged
+                entries are reused from this waveform, see :class:`Waveform`.
         """
         try:
-            loader = LineNumberYamlLoader
-            # Parse scientific notation as a float, instead of a string. For
-            # more information see: https://stackoverflow.com/a/30462009/8196245
-            loader.add_implicit_resolver(
-                "tag:yaml.org,2002:float",
-                re.compile(
-                    """^(?:
-                     [-+]?(?:[0-9][0-9_]*)\\.[0-9_]*(?:[eE][-+]?[0-9]+)?
-                    |[-+]?(?:[0-9][0-9_]*)(?:[eE][-+]?[0-9]+)
-                    |\\.[0-9_]+(?:[eE][-+][0-9]+)?
-                    |[-+]?[0-9][0-9_]*(?::[0-5]?[0-9])+\\.[0-9_]*
-                    |[-+]?\\.(?:inf|Inf|INF)
-                    |\\.(?:nan|NaN|NAN))$""",
-                    re.X,
-                ),
-                list("-+0123456789."),
-            )
-            waveform_yaml = yaml.load(yaml_str, Loader=loader)
+            waveform_yaml = yaml.load(yaml_str, Loader=WaveformYamlLoader)
 
             if not isinstance(waveform_yaml, dict):
                 raise yaml.YAMLError(
@@ -148,30 +303,143 @@ class YamlParser:
 
             name = waveform_key.removeprefix("user_")
             waveform = waveform_yaml[waveform_key]
-            if waveform is None:
-                raise yaml.YAMLError("Cannot have an empty waveform.")
-            if not isinstance(waveform, (list, int, float, str)):
-                raise yaml.YAMLError(
-                    "Waveform must either be a list of tendencies, "
-                    "a single constant value (int/float), or a derived waveform (str)."
-                )
             line_number = waveform_yaml.get("line_number", 0)
-            dd_version = self.config.globals.dd_version
-            if isinstance(waveform, list):
-                waveform = Waveform(
-                    waveform=waveform,
-                    yaml_str=yaml_str,
-                    line_number=line_number,
-                    name=name,
-                    dd_version=dd_version,
-                )
-            else:
-                waveform = DerivedWaveform(
-                    yaml_str, name, self.config, dd_version=dd_version
-                )
-            return waveform
+            return self._create_waveform(
+                name,
+                waveform,
+                yaml_str=yaml_str,
+                line_number=line_number,
+                previous=previous,
+            )
         except yaml.YAMLError as e:
             self.parse_errors.append(str(e))
             empty_waveform = Waveform()
             empty_waveform.annotations.add_yaml_error(e)
             return empty_waveform
+
+    def _create_waveform(
+        self, name, waveform, yaml_str="", yaml_node=None, line_number=0, previous=None
+    ):
+        """Creates a waveform, or a derived waveform, from its parsed YAML.
+
+        Args:
+            name: Name of the waveform.
+            waveform: The list of tendency entries, or the value of a derived waveform.
+            yaml_str: YAML string of the waveform, which is used when the YAML node is
+                not provided.
+            yaml_node: The YAML node of the waveform, as loaded by ruamel.
+            line_number: Line number of the waveform.
+            previous: Previous version of the waveform, see :meth:`parse_waveform`.
+
+        Returns:
+            The created waveform.
+        """
+        if waveform is None:
+            raise yaml.YAMLError("Cannot have an empty waveform.")
+        if not isinstance(waveform, (list, int, float, str)):
+            raise yaml.YAMLError(
+                "Waveform must either be a list of tendencies, "
+                "a single constant value (int/float), or a derived waveform (str)."
+            )
+        dd_version = self.config.globals.dd_version
+        if isinstance(waveform, list):
+            if not isinstance(previous, Waveform) or previous.name != name:
+                previous = None
+            _resolve_file_paths(waveform, self.config.base_path)
+            return Waveform(
+                waveform=waveform,
+                yaml_str=yaml_str,
+                yaml_node=yaml_node,
+                line_number=line_number,
+                name=name,
+                dd_version=dd_version,
+                previous=previous,
+            )
+        return DerivedWaveform(
+            yaml_str, name, self.config, dd_version=dd_version, yaml_node=yaml_node
+        )
+
+
+class _WorkerWaveform(Waveform):
+    """Waveform which is only created to be frozen, see :meth:`YamlParser.load_frozen`.
+    Its metadata is only looked up once the frozen waveform is created, so it skips
+    looking it up."""
+
+    def get_metadata(self, dd_version):
+        return None
+
+
+def _freeze_waveform(name, entries):
+    """Creates a waveform from its tendency entries and freezes its tendencies. This
+    may run in a worker process, see :meth:`YamlParser.load_frozen`.
+
+    Args:
+        name: Name of the waveform.
+        entries: The list of tendency entries of the waveform.
+
+    Returns:
+        Tuple containing the frozen tendencies and the annotations of the waveform.
+    """
+    from waveform_editor.frozen import freeze_tendency
+
+    waveform = _WorkerWaveform(waveform=entries, name=name)
+    tendencies = tuple(freeze_tendency(tendency) for tendency in waveform.tendencies)
+    return tendencies, list(waveform.annotations)
+
+
+def _to_tendency_entries(node, key_line):
+    """Convert a ruamel YAML node into plain Python objects, in the same way as
+    :class:`LineNumberYamlLoader` does: all keys of mappings are prefixed with
+    ``user_``, and their line numbers are stored as ``line_number``.
+
+    Args:
+        node: The ruamel YAML node to convert.
+        key_line: Line of the waveform name, which the line numbers are relative to.
+
+    Returns:
+        The converted node.
+    """
+    if isinstance(node, dict):
+        entry = {
+            f"user_{key}": _to_tendency_entries(value, key_line)
+            for key, value in node.items()
+        }
+        entry["line_number"] = node.lc.line - key_line
+        return entry
+    if isinstance(node, list):
+        return [_to_tendency_entries(item, key_line) for item in node]
+    # Convert the ruamel scalar types, which keep track of their formatting
+    if isinstance(node, bool):
+        return bool(node)
+    if isinstance(node, int):
+        return int(node)
+    if isinstance(node, float):
+        return float(node)
+    if isinstance(node, str):
+        return str(node)
+    return node
+
+
+def _resolve_file_paths(entries, base_path):
+    """Resolve the relative paths of the data files of piecewise tendencies against the
+    directory of the YAML file. This includes the tendencies of repeated waveforms.
+
+    Args:
+        entries: The list of tendency entries, which is updated in place.
+        base_path: Directory of the YAML file, or None to keep the paths relative to
+            the current working directory.
+
+    Returns:
+        The list of tendency entries.
+    """
+    if base_path is None:
+        return entries
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        file = entry.get("user_file")
+        if isinstance(file, str) and not os.path.isabs(file):
+            entry["user_file"] = os.path.join(base_path, file)
+        if isinstance(entry.get("user_waveform"), list):
+            _resolve_file_paths(entry["user_waveform"], base_path)
+    return entries